@@ -0,0 +1,202 @@
+from collections import deque
+from typing import Callable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from constants import _get_pace_zones
+from history import History
+from metrics import get_metric
+from run import Run
+from utils import get_run_id
+
+
+class AnomalyDetector:
+    """
+    A class to flag runs whose heart rate, cadence or energy is far off the usual values of runs at a similar pace.
+
+    The runs are grouped into the pace zones. For every value and zone the last runs are kept in a window, and a run is
+    anomalous if its robust z-score 0.6745 * (value - median) / MAD against the window exceeds the threshold. The
+    median and the median absolute deviation are not pulled by earlier glitches like the mean and standard deviation.
+
+    Attributes:
+        window (int): The number of runs per value and pace zone the statistics are calculated from.
+        threshold (float): The robust z-score above which a value is anomalous.
+        minimum_runs (int): The number of runs a window needs before values are flagged.
+        windows (dict[tuple[str, int], deque[float]]): The last values per value name and pace zone.
+    """
+
+    def __init__(self, window: int = 100, threshold: float = 3.5, minimum_runs: int = 10) -> None:
+        """
+        Initialize an empty AnomalyDetector object.
+
+        Args:
+            window (int, optional): The number of runs per value and pace zone the statistics are calculated from.
+            Defaults to 100.
+            threshold (float, optional): The robust z-score above which a value is anomalous. Defaults to 3.5.
+            minimum_runs (int, optional): The number of runs a window needs before values are flagged. Defaults to 10.
+        """
+        self.window: int = window
+        self.threshold: float = threshold
+        self.minimum_runs: int = minimum_runs
+        self.windows: dict[tuple[str, int], deque[float]] = {}
+
+    def check(self, run: Run, run_id: str | None = None) -> list[tuple[str, str, float, float, float]]:
+        """
+        Check a run against the current windows without adding it.
+
+        Args:
+            run (Run): The run.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            list[tuple[str, str, float, float, float]]: The run id, the value name, the value, the median and the
+            robust z-score of every anomalous value.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        anomalies: list[tuple[str, str, float, float, float]] = []
+        for (name, value, zone) in _get_run_values(run):
+            values: deque[float] | None = self.windows.get((name, zone))
+            if values is None or len(values) < self.minimum_runs:
+                continue
+            median: float = float(np.median(values))
+            score: float = _get_score(np.array(value), np.array(median),
+                                      np.array(np.median(np.abs(np.array(values) - median)))).item()
+            if abs(score) > self.threshold:
+                anomalies.append((run_id, name, value, median, score))
+        return anomalies
+
+    def add(self, run: Run) -> None:
+        """
+        Add the values of a run to the windows. Runs have to be added in the order of their dates.
+
+        Args:
+            run (Run): The run.
+        """
+        for (name, value, zone) in _get_run_values(run):
+            self.windows.setdefault((name, zone), deque(maxlen=self.window)).append(value)
+
+    def scan(self, history: History) -> list[tuple[str, str, float, float, float]]:
+        """
+        Check every run of a history against the window of the runs before it and fill the windows with the last runs.
+
+        All windows of a value and zone are one strided view of the values, so the medians of all runs are calculated
+        at once instead of run by run.
+
+        Args:
+            history (History): The runs sorted by date.
+
+        Returns:
+            list[tuple[str, str, float, float, float]]: The run id, the value name, the value, the median and the
+            robust z-score of every anomalous value, ordered like the runs.
+        """
+        self.windows.clear()
+        zones: np.ndarray = _get_zones(history.pace())
+        anomalies: list[tuple[int, str, float, float, float]] = []
+        for (name, function) in _get_values().items():
+            values: np.ndarray = function(history)
+            for zone in np.unique(zones[zones >= 0]).tolist():
+                indices: np.ndarray = np.flatnonzero((zones == zone) & np.isfinite(values))
+                zone_values: np.ndarray = values[indices]
+                if not len(zone_values):
+                    continue
+                self.windows[(name, zone)] = deque(zone_values[-self.window:].tolist(), maxlen=self.window)
+                if len(zone_values) <= self.minimum_runs:
+                    continue
+                padded: np.ndarray = np.concatenate([np.full(self.window, np.nan), zone_values[:-1]])
+                windows: np.ndarray = sliding_window_view(padded, self.window)[self.minimum_runs:]
+                medians: np.ndarray = np.nanmedian(windows, axis=1)
+                deviations: np.ndarray = np.nanmedian(np.abs(windows - medians[:, None]), axis=1)
+                scores: np.ndarray = _get_score(zone_values[self.minimum_runs:], medians, deviations)
+                for position in np.flatnonzero(np.abs(scores) > self.threshold).tolist():
+                    anomalies.append((int(indices[self.minimum_runs + position]), name,
+                                      float(zone_values[self.minimum_runs + position]),
+                                      float(medians[position]), float(scores[position])))
+        anomalies.sort(key=lambda anomaly: anomaly[0])
+        return [(history.run_ids[index], name, value, median, score)
+                for (index, name, value, median, score) in anomalies]
+
+
+def _get_values() -> dict[str, Callable[[History], np.ndarray]]:
+    """
+    Get the values that are checked for anomalies.
+
+    Returns:
+        dict[str, Callable[[History], np.ndarray]]: The names of the values mapped to functions calculating the values
+        of all runs of a history.
+    """
+    values: dict[str, Callable[[History], np.ndarray]] = {'heartbeats': lambda history: history.heartbeats,
+                                                          'cadence': lambda history: history.cadence,
+                                                          'kcal_per_kilometer': _get_kcal_per_kilometer}
+    return values
+
+
+def _get_kcal_per_kilometer(history: History) -> np.ndarray:
+    """
+    Calculate the energy per kilometer of every run, like the metric 'kcal_per_kilometer' but for all runs at once.
+
+    Args:
+        history (History): The runs.
+
+    Returns:
+        np.ndarray: The kilocalories per kilometer. NaN for runs without energy or distance.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kcal_per_kilometer: np.ndarray = history.kcal / (history.meters / 1000)
+    kcal_per_kilometer[~np.isfinite(kcal_per_kilometer)] = np.nan
+    return kcal_per_kilometer
+
+
+def _get_run_values(run: Run) -> list[tuple[str, float, int]]:
+    """
+    Get the values of a run that are checked for anomalies, like _get_values.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        list[tuple[str, float, int]]: The name, the value and the pace zone of every available value. Empty if the run
+        has no pace.
+    """
+    if not run.distance.to_meters() or not run.duration.to_seconds():
+        return []
+    zone: int = int(_get_zones(np.array([get_metric(run, 'pace').to_seconds()], dtype=float))[0])
+    values: list[tuple[str, float | None]] = [('heartbeats', run.avg_heartbeats_per_minute.integer),
+                                              ('cadence', run.cadence.integer),
+                                              ('kcal_per_kilometer', get_metric(run, 'kcal_per_kilometer'))]
+    run_values: list[tuple[str, float, int]] = [(name, float(value), zone)
+                                                for (name, value) in values if value is not None]
+    return run_values
+
+
+def _get_zones(pace: np.ndarray) -> np.ndarray:
+    """
+    Get the pace zone of every run.
+
+    Args:
+        pace (np.ndarray): The paces in seconds per kilometer.
+
+    Returns:
+        np.ndarray: The indices of the pace zones, -1 for runs without pace.
+    """
+    zones: np.ndarray = np.digitize(pace, _get_pace_zones()) - 1
+    zones[~np.isfinite(pace)] = -1
+    return zones
+
+
+def _get_score(values: np.ndarray, medians: np.ndarray, deviations: np.ndarray) -> np.ndarray:
+    """
+    Calculate the robust z-scores of values.
+
+    Args:
+        values (np.ndarray): The values.
+        medians (np.ndarray): The medians of the windows.
+        deviations (np.ndarray): The median absolute deviations of the windows.
+
+    Returns:
+        np.ndarray: The robust z-scores. The deviations are at least 1 % of the medians, so windows of equal integer
+        values like the cadence do not flag every small difference.
+    """
+    scores: np.ndarray = 0.6745 * (values - medians) / np.maximum(deviations, 0.01 * np.abs(medians))
+    return scores
@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from date import Date
+from distance import Distance
+from duration import Duration
+from generator import generate_runs, with_file_locations
+from records import get_records_location, _get_keys
+from run import Run
+from utils import get_run_id, to_string, _decimal_separator
+
+
+def _time(function: Callable[[Any], Any], arguments: list[Any]) -> dict[str, float]:
+    """
+    Time a function called once for every argument.
+
+    Args:
+        function (Callable[[Any], Any]): The function to time.
+        arguments (list[Any]): The arguments.
+
+    Returns:
+        dict[str, float]: The total seconds, the number of calls and the microseconds per call.
+    """
+    start: float = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    seconds: float = time.perf_counter() - start
+    result: dict[str, float] = {'seconds': seconds,
+                                'calls': len(arguments),
+                                'us_per_call': seconds / max(len(arguments), 1) * 1e6}
+    return result
+
+
+def _write_records(runs: list[Run], directory: str) -> str:
+    """
+    Write the personal records journal of runs to a temporary diary, so the LaTeX text does not read the real diary.
+
+    Args:
+        runs (list[Run]): The runs.
+        directory (str): The folder of the temporary diary.
+
+    Returns:
+        str: The location of the journal file.
+    """
+    records_location: str = get_records_location(directory)
+    with open(records_location, 'w') as file:
+        file.writelines(json.dumps({'run': get_run_id(run), 'keys': _get_keys(run)}) + '\n' for run in runs)
+    return records_location
+
+
+def _benchmark_files(runs: list[Run]) -> dict[str, dict[str, float]]:
+    """
+    Time exporting and importing runs in a temporary diary.
+
+    Args:
+        runs (list[Run]): The runs.
+
+    Returns:
+        dict[str, dict[str, float]]: The results per benchmark.
+    """
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        pairs: list[tuple[Run, str]] = list(with_file_locations(runs, directory))
+        for folder in set(os.path.dirname(file_location) for (_, file_location) in pairs):
+            os.makedirs(folder)
+        results['Run.export_to_file'] = _time(lambda pair: pair[0].export_to_file(update_records=False,
+                                                                                  file_location=pair[1]), pairs)
+        results['Run.import_from_file'] = _time(Run.import_from_file, [file_location for (_, file_location) in pairs])
+    return results
+
+
+def _benchmark_pdf(runs: list[Run], records_location: str, number_of_runs: int = 3) -> dict[str, dict[str, float]]:
+    """
+    Time compiling runs to pdf files, if pdflatex is installed.
+
+    Args:
+        runs (list[Run]): The runs.
+        records_location (str): The location of the personal records journal of the runs.
+        number_of_runs (int, optional): The number of runs to compile. Defaults to 3.
+
+    Returns:
+        dict[str, dict[str, float]]: The results per benchmark. Empty if pdflatex is not installed.
+    """
+    if shutil.which('pdflatex') is None:
+        return {}
+    from latex import _get_text, _make_pdf
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file_locations: list[str] = []
+        for (index, run) in enumerate(runs[:number_of_runs]):
+            file_location: str = os.path.join(directory, f'{index}.tex')
+            with open(file_location, 'w') as file:
+                file.write(_get_text(run, records_location=records_location))
+            file_locations.append(file_location)
+        results['latex._make_pdf'] = _time(lambda file_location: _make_pdf(directory, file_location), file_locations)
+    return results
+
+
+def run_benchmarks(size: int, pdf: bool = True) -> dict[str, dict[str, float]]:
+    """
+    Run all benchmarks for an archive size.
+
+    Args:
+        size (int): The number of runs.
+        pdf (bool, optional): If True, compiling pdf files is timed as well. Defaults to True.
+
+    Returns:
+        dict[str, dict[str, float]]: The results per benchmark.
+    """
+    from latex import _get_text
+    runs: list[Run] = list(generate_runs(size, years=20))
+    dates: list[str] = [run.date.__str__() for run in runs]
+    durations: list[str] = [run.duration.__str__() for run in runs]
+    distances: list[str] = [run.distance.__str__() for run in runs]
+    numbers: list[int | float] = [run.distance.to_meters() * (1 + index % 2 / 3) for (index, run) in enumerate(runs)]
+    results: dict[str, dict[str, float]] = {}
+    results['Date.from_string'] = _time(Date.from_string, dates)
+    results['Duration.from_string'] = _time(Duration.from_string, durations)
+    results['Distance.from_string'] = _time(Distance.from_string, distances)
+    results['Run.__dict__'] = _time(lambda run: run.__dict__(), runs)
+    results['Speed.to_kmh'] = _time(lambda run: run.speed().to_kmh(), runs)
+    results['Speed.to_pace'] = _time(lambda run: run.speed().to_pace(), runs)
+    results['to_string'] = _time(to_string, numbers)
+    results['_decimal_separator'] = _time(_decimal_separator, numbers)
+    results.update(_benchmark_files(runs))
+    with tempfile.TemporaryDirectory() as directory:
+        records_location: str = _write_records(runs, directory)
+        results['latex._get_text'] = _time(lambda run: _get_text(run, records_location=records_location), runs)
+        if pdf:
+            results.update(_benchmark_pdf(runs, records_location))
+    return results
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict[str, Any]): The results of this run.
+        baseline (dict[str, Any]): The saved results of an earlier run.
+        threshold (float): The relative slowdown from which a benchmark counts as regression, e.g. 0.1 for 10 %.
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    regressions: list[str] = []
+    for (size, benchmarks) in results['sizes'].items():
+        for (name, result) in benchmarks.items():
+            old_result: dict[str, float] | None = baseline['sizes'].get(size, {}).get(name)
+            if old_result is None:
+                continue
+            ratio: float = result['us_per_call'] / old_result['us_per_call']
+            if ratio > 1 + threshold:
+                regressions.append(f"{name} ({size} runs): {old_result['us_per_call']:.2f} us -> "
+                                   f"{result['us_per_call']:.2f} us per call ({ratio - 1:+.0%})")
+    return regressions
+
+
+def main(arguments: list[str] | None = None) -> int:
+    """
+    Run the benchmarks from the command line.
+
+    Args:
+        arguments (list[str] | None, optional): The command line arguments. Defaults to None, which uses sys.argv.
+
+    Returns:
+        int: The exit code, 1 if a regression against the baseline was found.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark the hot paths of the diary.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="The archive sizes in runs.")
+    parser.add_argument('--output', help="The json file to write the results to.")
+    parser.add_argument('--compare', help="The json file of a baseline to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="The relative slowdown from which a benchmark counts as regression.")
+    parser.add_argument('--no-pdf', action='store_true', help="Do not time compiling pdf files.")
+    namespace: argparse.Namespace = parser.parse_args(arguments)
+    results: dict[str, Any] = {'python': platform.python_version(),
+                               'platform': platform.platform(),
+                               'sizes': {}}
+    for size in namespace.sizes:
+        print(f"Benchmarking {size} runs.", file=sys.stderr)
+        results['sizes'][str(size)] = run_benchmarks(size, pdf=not namespace.no_pdf)
+    data: str = json.dumps(results, indent=2)
+    if namespace.output is None:
+        print(data)
+    else:
+        with open(namespace.output, 'w') as file:
+            file.write(data)
+    if namespace.compare is not None:
+        with open(namespace.compare, 'r') as file:
+            baseline: dict[str, Any] = json.load(file)
+        regressions: list[str] = compare(results, baseline, namespace.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import math
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from anomalies import AnomalyDetector
+from constants import _get_duplicate_tolerances, _get_history_string_columns
+from distance import Distance
+from duration import Duration
+from fingerprints import FingerprintIndex, _get_fingerprint
+from generator import generate_runs, with_file_locations
+from history import History, _get_cache_columns
+from numerics import Integer
+from routes import RouteIndex, get_signature
+from run import Run
+from schema import dumps, loads
+from trackpoints import Trackpoints
+
+
+def _get_loop(latitude: float, longitude: float, noise: float, seed: int, radius: float = 800) -> Trackpoints:
+    """
+    Generate the trackpoints of a circular loop with GPS noise.
+
+    Args:
+        latitude (float): The latitude of the center in degrees.
+        longitude (float): The longitude of the center in degrees.
+        noise (float): The standard deviation of the GPS noise in meters.
+        seed (int): The seed of the random number generator.
+        radius (float, optional): The radius of the loop in meters. Defaults to 800.
+
+    Returns:
+        Trackpoints: One sample every 3 m.
+    """
+    generator: np.random.Generator = np.random.default_rng(seed)
+    distance: np.ndarray = np.arange(0, 2 * math.pi * radius, 3.0)
+    angle: np.ndarray = distance / radius
+    north: np.ndarray = radius * np.sin(angle) + generator.normal(0, noise, len(angle))
+    east: np.ndarray = radius * np.cos(angle) + generator.normal(0, noise, len(angle))
+    trackpoints: Trackpoints = Trackpoints(timestamp=distance / 3,
+                                           distance=distance,
+                                           latitude=latitude + north / 111320,
+                                           longitude=longitude + east / (111320 * math.cos(math.radians(latitude))))
+    return trackpoints
+
+
+def check_routes() -> None:
+    """
+    Check that two noisy runs of the same loop share a route and a loop far away gets a new route.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        index: RouteIndex = RouteIndex(os.path.join(directory, 'routes.jsonl'))
+        runs: list[Run] = list(generate_runs(3, seed=1))
+        for (run, (latitude, longitude, seed)) in zip(runs, [(48.1, 11.5, 1), (48.1, 11.5, 2), (48.2, 11.7, 3)]):
+            run.trackpoints = _get_loop(latitude, longitude, 5, seed)
+        routes: list[str] = [index.add(run, str(number)) for (number, run) in enumerate(runs)]
+        assert routes == ['R1', 'R1', 'R2'], routes
+        similarity: float = float(np.mean(get_signature(runs[0].trackpoints) == get_signature(runs[1].trackpoints)))
+        assert similarity > 0.5, similarity
+        reloaded: RouteIndex = RouteIndex.import_from_file(index.file_location)
+        assert reloaded.routes == index.routes and reloaded._new_route() == 'R3'
+
+
+def check_anomalies() -> None:
+    """
+    Check that scanning a history flags the same values as checking and adding its runs one after another.
+    """
+    runs: list[Run] = list(generate_runs(600, seed=2))
+    for run in runs[200::37]:
+        if run.avg_heartbeats_per_minute.integer is not None:
+            run.avg_heartbeats_per_minute = Integer(run.avg_heartbeats_per_minute.integer + 40)
+    run_ids: list[str] = [str(number) for number in range(len(runs))]
+    history: History = History.from_runs(runs, run_ids)
+    scanned: AnomalyDetector = AnomalyDetector(window=50, minimum_runs=10)
+    scan: list[tuple[str, str, float, float, float]] = scanned.scan(history)
+    added: AnomalyDetector = AnomalyDetector(window=50, minimum_runs=10)
+    checks: list[tuple[str, str, float, float, float]] = []
+    for (run_id, run) in zip(run_ids, runs):
+        checks.extend(added.check(run, run_id))
+        added.add(run)
+    assert scan, "No anomalies were flagged."
+    assert [anomaly[:2] for anomaly in scan] == [anomaly[:2] for anomaly in checks]
+    assert np.allclose([anomaly[2:] for anomaly in scan], [anomaly[2:] for anomaly in checks])
+    assert {key: list(values) for (key, values) in scanned.windows.items()} == \
+        {key: list(values) for (key, values) in added.windows.items()}
+
+
+def _is_duplicate(fingerprint: tuple[int, float, float, float], other: tuple[int, float, float, float]) -> bool:
+    """
+    Compare two fingerprints against the tolerances, like FingerprintIndex.find but without buckets.
+
+    Args:
+        fingerprint (tuple[int, float, float, float]): The date, meters, seconds and heartbeats of a run.
+        other (tuple[int, float, float, float]): The date, meters, seconds and heartbeats of another run.
+
+    Returns:
+        bool: True if the runs count as duplicates.
+    """
+    tolerances: dict[str, float] = _get_duplicate_tolerances()
+    if fingerprint[0] != other[0] or math.isnan(fingerprint[1]) != math.isnan(other[1]):
+        return False
+    is_duplicate: bool = ((math.isnan(fingerprint[1]) or abs(fingerprint[1] - other[1]) <= tolerances['meters'])
+                          and abs(fingerprint[2] - other[2]) <= tolerances['seconds']
+                          and not abs(fingerprint[3] - other[3]) > tolerances['heartbeats'])
+    return is_duplicate
+
+
+def check_fingerprints() -> None:
+    """
+    Check that the buckets of the fingerprint index find exactly the duplicates a comparison with every run finds.
+    """
+    runs: list[Run] = list(generate_runs(500, seed=3, years=1))
+    index: FingerprintIndex = FingerprintIndex.from_history(History.from_runs(runs))
+    tolerances: dict[str, float] = _get_duplicate_tolerances()
+    generator: random.Random = random.Random(3)
+    fingerprints: list[tuple[int, float, float, float]] = [_get_fingerprint(run) for run in runs]
+    found: int = 0
+    for (run, candidate) in zip(runs, generate_runs(500, seed=3, years=1)):
+        if run.distance.distance_meters is not None:
+            candidate.distance = Distance(run.distance.distance_meters
+                                          + int(generator.uniform(-2, 2) * tolerances['meters']))
+        candidate.duration = Duration.from_seconds(max(run.duration.to_seconds()
+                                                       + int(generator.uniform(-2, 2) * tolerances['seconds']), 1))
+        expected: bool = any(_is_duplicate(_get_fingerprint(candidate), fingerprint) for fingerprint in fingerprints)
+        duplicate: str | None = index.find(candidate)
+        assert (duplicate is not None) == expected, (run.date, duplicate, expected)
+        found += expected
+    assert 0 < found < len(runs), found
+
+
+def _assert_history_current(root: str) -> None:
+    """
+    Assert that the updated history cache of a diary equals the history of all its runs imported anew.
+
+    Args:
+        root (str): The folder of the diary.
+    """
+    cached: History = History.update_cache(root)
+    rebuilt: History = History.import_from_folder(root)
+    assert cached.run_ids == rebuilt.run_ids
+    for column in _get_cache_columns():
+        if column in _get_history_string_columns():
+            assert cached.get_strings(column) == rebuilt.get_strings(column), column
+        else:
+            assert np.array_equal(getattr(cached, column), getattr(rebuilt, column), equal_nan=True), column
+
+
+def check_history_cache() -> None:
+    """
+    Check that updating the history cache incrementally gives the same history as importing all runs anew, after
+    appending runs, adding earlier runs, changing a run and deleting a run.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        pairs: list[tuple[Run, str]] = list(with_file_locations(generate_runs(120, seed=4), root))
+        for (start, end) in [(20, 80), (80, 120), (0, 20)]:
+            for (run, file_location) in pairs[start:end]:
+                os.makedirs(os.path.dirname(file_location), exist_ok=True)
+                run.export_to_file(update_records=False, file_location=file_location)
+            _assert_history_current(root)
+        file_location: str = pairs[50][1]
+        with open(file_location, 'rb') as file:
+            data: dict = loads(file.read())
+        (data['distance'], data['location'], data['date']) = (12345, 'Changed', '01.01.1999')
+        with open(file_location, 'w') as file:
+            file.write(dumps(data))
+        os.utime(file_location, ns=(0, os.stat(file_location).st_mtime_ns + 1))
+        _assert_history_current(root)
+        os.remove(pairs[60][1])
+        _assert_history_current(root)
+
+
+def main() -> None:
+    """
+    Run all checks and print their names.
+    """
+    for check in [check_routes, check_anomalies, check_fingerprints, check_history_cache]:
+        check()
+        print(f"{check.__name__}: ok")
+
+
+if __name__ == '__main__':
+    main()
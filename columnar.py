@@ -0,0 +1,189 @@
+import datetime
+import os
+from typing import Any, Iterable
+
+from date import Date
+from distance import Distance
+from duration import Duration
+from energy import Energy
+from numerics import Integer, Floating
+from run import Run
+from utils import get_run_id
+
+
+def _import_pyarrow() -> Any:
+    """
+    Import pyarrow, which is an optional dependency.
+
+    Returns:
+        Any: The pyarrow module.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError("Exporting to Arrow or Parquet needs pyarrow. Install it with 'pip install pyarrow'.") \
+            from error
+    return pyarrow
+
+
+def get_schema() -> Any:
+    """
+    Get the Arrow schema of a run collection.
+
+    Distances are in meters, durations are of the Arrow duration type in seconds, and missing values are nulls. The
+    text fields that repeat a lot are dictionary encoded.
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+    pa = _import_pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema([pa.field('run_id', pa.string(), nullable=False),
+                        pa.field('date', pa.date32(), nullable=False),
+                        pa.field('distance', pa.int32(), metadata={'unit': 'm'}),
+                        pa.field('duration', pa.duration('s'), nullable=False),
+                        pa.field('energy', pa.int32(), metadata={'unit': 'kcal'}),
+                        pa.field('ascent', pa.int32(), metadata={'unit': 'm'}),
+                        pa.field('descent', pa.int32(), metadata={'unit': 'm'}),
+                        pa.field('sweat', pa.int32(), metadata={'unit': 'ml'}),
+                        pa.field('avg_heartbeats_per_minute', pa.int32(), metadata={'unit': '1/min'}),
+                        pa.field('avg_power', pa.int32(), metadata={'unit': 'W'}),
+                        pa.field('cadence', pa.int32(), metadata={'unit': '1/min'}),
+                        pa.field('avg_temperature', pa.int32(), metadata={'unit': 'C'}),
+                        pa.field('aerob', pa.float64()),
+                        pa.field('anaerob', pa.float64()),
+                        pa.field('effect', text),
+                        pa.field('training', text),
+                        pa.field('location', text),
+                        pa.field('route', text),
+                        pa.field('notes', pa.string())])
+    return schema
+
+
+def to_table(runs: Iterable[Run], run_ids: Iterable[str] | None = None) -> Any:
+    """
+    Convert runs to an Arrow table in one pass, one row per run.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        run_ids (Iterable[str] | None, optional): The identifiers of the runs. Defaults to None, which uses
+        'yy.mm.dd Run'.
+
+    Returns:
+        pyarrow.Table: The table with the schema of get_schema.
+    """
+    pa = _import_pyarrow()
+    schema = get_schema()
+    values: dict[str, list] = {name: [] for name in schema.names}
+    run_ids_iterator = iter(run_ids) if run_ids is not None else None
+    for run in runs:
+        values['run_id'].append(next(run_ids_iterator) if run_ids_iterator is not None else get_run_id(run))
+        values['date'].append(datetime.date(run.date.year, run.date.month, run.date.day))
+        values['distance'].append(run.distance.distance_meters)
+        values['duration'].append(run.duration.to_seconds())
+        values['energy'].append(run.energy.kcal)
+        values['ascent'].append(run.ascent.distance_meters)
+        values['descent'].append(run.descent.distance_meters)
+        values['sweat'].append(run.sweat.integer)
+        values['avg_heartbeats_per_minute'].append(run.avg_heartbeats_per_minute.integer)
+        values['avg_power'].append(run.avg_power.integer)
+        values['cadence'].append(run.cadence.integer)
+        values['avg_temperature'].append(run.avg_temperature.integer)
+        values['aerob'].append(run.aerob.floating)
+        values['anaerob'].append(run.anaerob.floating)
+        values['effect'].append(run.effect)
+        values['training'].append(run.training)
+        values['location'].append(run.location)
+        values['route'].append(run.route)
+        values['notes'].append(run.notes)
+    table = pa.Table.from_pydict(values, schema=schema)
+    return table
+
+
+def from_table(table: Any) -> tuple[list[Run], list[str]]:
+    """
+    Convert an Arrow table back to runs.
+
+    The table may come from another tool, so only the columns of the schema are read and missing optional columns
+    become missing values.
+
+    Args:
+        table (pyarrow.Table): The table with the columns of get_schema.
+
+    Returns:
+        tuple[list[Run], list[str]]: The runs and their identifiers.
+    """
+    columns: dict[str, list] = {name: table.column(name).to_pylist() for name in get_schema().names
+                                if name in table.column_names}
+    number_of_rows: int = table.num_rows
+    for name in get_schema().names:
+        columns.setdefault(name, [None] * number_of_rows)
+    runs: list[Run] = []
+    for row in range(number_of_rows):
+        date: datetime.date = columns['date'][row]
+        duration: datetime.timedelta | int = columns['duration'][row]
+        if isinstance(duration, datetime.timedelta):
+            duration: int = int(duration.total_seconds())
+        runs.append(Run(date=Date(date.day, date.month, date.year),
+                        distance=Distance(columns['distance'][row]),
+                        duration=Duration.from_seconds(duration),
+                        energy=Energy(columns['energy'][row]),
+                        ascent=Distance(columns['ascent'][row]),
+                        descent=Distance(columns['descent'][row]),
+                        sweat=Integer(columns['sweat'][row]),
+                        avg_heartbeats_per_minute=Integer(columns['avg_heartbeats_per_minute'][row]),
+                        avg_power=Integer(columns['avg_power'][row]),
+                        cadence=Integer(columns['cadence'][row]),
+                        avg_temperature=Integer(columns['avg_temperature'][row]),
+                        aerob=Floating(columns['aerob'][row]),
+                        anaerob=Floating(columns['anaerob'][row]),
+                        effect=columns['effect'][row] or '',
+                        training=columns['training'][row] or '',
+                        location=columns['location'][row] or '',
+                        route=columns['route'][row] or '',
+                        notes=columns['notes'][row] or ''))
+    run_ids: list[str] = [run_id if run_id is not None else get_run_id(run)
+                          for (run_id, run) in zip(columns['run_id'], runs)]
+    return runs, run_ids
+
+
+def export_to_file(runs: Iterable[Run], file_location: str, run_ids: Iterable[str] | None = None) -> None:
+    """
+    Write runs to a Parquet file if the file ends with '.parquet', else to an Arrow IPC (Feather) file.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        file_location (str): The location of the file.
+        run_ids (Iterable[str] | None, optional): The identifiers of the runs. Defaults to None, which uses
+        'yy.mm.dd Run'.
+    """
+    table = to_table(runs, run_ids)
+    if os.path.splitext(file_location)[1] == '.parquet':
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, file_location)
+    else:
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, file_location)
+
+
+def import_from_file(file_location: str) -> tuple[list[Run], list[str]]:
+    """
+    Read runs from a Parquet file if the file ends with '.parquet', else from an Arrow IPC (Feather) file.
+
+    Args:
+        file_location (str): The location of the file.
+
+    Returns:
+        tuple[list[Run], list[str]]: The runs and their identifiers.
+    """
+    _import_pyarrow()
+    if os.path.splitext(file_location)[1] == '.parquet':
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(file_location)
+    else:
+        import pyarrow.feather
+        table = pyarrow.feather.read_table(file_location)
+    return from_table(table)
@@ -19,3 +19,281 @@ def _get_max_tries() -> int:
     """
     max_tries: int = 100
     return max_tries
+
+
+def _get_trackpoint_columns() -> dict[str, str]:
+    """
+    Get the columns of a trackpoint series and their binary data types.
+
+    Returns:
+        dict[str, str]: The column names mapped to their numpy data types.
+    """
+    columns: dict[str, str] = {'timestamp': 'float64',
+                               'distance': 'float64',
+                               'elevation': 'float32',
+                               'heartbeats': 'float32',
+                               'cadence': 'float32',
+                               'power': 'float32',
+                               'latitude': 'float64',
+                               'longitude': 'float64'}
+    return columns
+
+
+def _get_best_effort_distances() -> list[int]:
+    """
+    Get the distances for which best efforts are searched.
+
+    Returns:
+        list[int]: The distances in meters (400 m, 1 km, 5 km, 10 km and half marathon).
+    """
+    distances: list[int] = [400, 1000, 5000, 10000, 21098]
+    return distances
+
+
+def _get_distance_bands() -> list[int]:
+    """
+    Get the lower bounds of the distance bands used for personal records.
+
+    Returns:
+        list[int]: The lower bounds of the distance bands in meters.
+    """
+    bands: list[int] = [0, 5000, 10000, 21097, 42195]
+    return bands
+
+
+def _get_heart_rate_zones() -> list[int]:
+    """
+    Get the lower bounds of the heart rate zones.
+
+    Returns:
+        list[int]: The lower bounds of the heart rate zones in beats per minute.
+    """
+    zones: list[int] = [0, 120, 140, 155, 170, 185]
+    return zones
+
+
+def _get_pace_zones() -> list[int]:
+    """
+    Get the lower bounds of the pace zones.
+
+    Returns:
+        list[int]: The lower bounds of the pace zones in seconds per kilometer.
+    """
+    zones: list[int] = [0, 240, 270, 300, 330, 360, 420]
+    return zones
+
+
+def _get_history_columns() -> dict[str, str]:
+    """
+    Get the numeric columns of the run history and their binary data types.
+
+    Returns:
+        dict[str, str]: The column names mapped to their numpy data types.
+    """
+    columns: dict[str, str] = {'date': 'int32',
+                               'meters': 'float64',
+                               'flat_meters': 'float64',
+                               'seconds': 'float64',
+                               'kcal': 'float64',
+                               'ascent': 'float64',
+                               'descent': 'float64',
+                               'sweat': 'float64',
+                               'heartbeats': 'float64',
+                               'power': 'float64',
+                               'cadence': 'float64',
+                               'temperature': 'float64',
+                               'aerob': 'float64',
+                               'anaerob': 'float64'}
+    return columns
+
+
+def _get_history_string_columns() -> list[str]:
+    """
+    Get the text columns of the run history, which are stored as codes into a shared string table.
+
+    Returns:
+        list[str]: The column names.
+    """
+    columns: list[str] = ['effect', 'training', 'location', 'route']
+    return columns
+
+
+def _get_journal_compaction() -> float:
+    """
+    Get the ratio of lines to runs of a journal file above which the file is rewritten with one line per run.
+
+    Returns:
+        float: The ratio.
+    """
+    ratio: float = 2.0
+    return ratio
+
+
+def _get_history_version() -> int:
+    """
+    Get the version of the values of the history cache, raised whenever a column is calculated differently.
+
+    Returns:
+        int: The version. Caches of another version are rebuilt.
+    """
+    version: int = 3
+    return version
+
+
+def _get_race_distances() -> dict[str, int]:
+    """
+    Get the race distances for which times are predicted.
+
+    Returns:
+        dict[str, int]: The names of the races mapped to their distances in meters.
+    """
+    distances: dict[str, int] = {'5 km': 5000,
+                                 '10 km': 10000,
+                                 'Half marathon': 21097,
+                                 'Marathon': 42195}
+    return distances
+
+
+def _get_heart_rate_range() -> tuple[int, int]:
+    """
+    Get the resting and the maximal heart rate used for the training load.
+
+    Returns:
+        tuple[int, int]: The resting and the maximal heart rate in beats per minute (default is 60 and 190).
+    """
+    heart_rate_range: tuple[int, int] = (60, 190)
+    return heart_rate_range
+
+
+def _get_schema_version() -> int:
+    """
+    Get the version of the json schema runs are written with.
+
+    Version 1 stores every field as string with '-' for missing values. Version 2 stores native numbers, null for
+    missing values and the duration in seconds.
+
+    Returns:
+        int: The schema version (default is 2).
+    """
+    schema_version: int = 2
+    return schema_version
+
+
+def _get_earth_radius() -> int:
+    """
+    Get the mean radius of the earth for distances between coordinates.
+
+    Returns:
+        int: The radius in meters (default is 6371000).
+    """
+    earth_radius: int = 6371000
+    return earth_radius
+
+
+def _get_page_size() -> tuple[float, float]:
+    """
+    Get the size of an A5 page for the built-in pdf writer.
+
+    Returns:
+        tuple[float, float]: The width and height in points (default is 419.53 x 595.28).
+    """
+    page_size: tuple[float, float] = (419.53, 595.28)
+    return page_size
+
+
+def _get_page_margins() -> tuple[float, float, float]:
+    """
+    Get the page margins of the built-in pdf writer, like the geometry of the LaTeX preamble.
+
+    Returns:
+        tuple[float, float, float]: The top, bottom and side margins in points (default is 15 mm, 20 mm and 15 mm).
+    """
+    page_margins: tuple[float, float, float] = (42.52, 56.69, 42.52)
+    return page_margins
+
+
+def _get_duplicate_tolerances() -> dict[str, float]:
+    """
+    Get the largest differences at which two runs of the same date still count as duplicates.
+
+    Returns:
+        dict[str, float]: The tolerances of the distance in meters, the duration in seconds and the average heartbeats
+        per minute.
+    """
+    duplicate_tolerances: dict[str, float] = {'meters': 100, 'seconds': 60, 'heartbeats': 5}
+    return duplicate_tolerances
+
+
+def _get_plausible_ranges() -> dict[str, tuple[float, float]]:
+    """
+    Get the plausible ranges of the values of a run, used to validate many runs at once.
+
+    Returns:
+        dict[str, tuple[float, float]]: The names of the values mapped to their lowest and highest plausible value. The
+        pace is in seconds per kilometer, the heartbeats in beats per minute and the step length in meters.
+    """
+    plausible_ranges: dict[str, tuple[float, float]] = {'pace': (120, 1200),
+                                                        'heartbeats': (30, 230),
+                                                        'step_length': (0.3, 2.5)}
+    return plausible_ranges
+
+
+def _get_route_hashing() -> dict[str, int | float]:
+    """
+    Get the parameters of the route matching.
+
+    Returns:
+        dict[str, int | float]: The geohash precision in characters, the spacing of the resampled track in meters, the
+        number of MinHash functions, the number of locality sensitive hashing bands and the estimated Jaccard
+        similarity from which two runs share a route.
+    """
+    route_hashing: dict[str, int | float] = {'precision': 7, 'spacing': 50, 'hashes': 64, 'bands': 16, 'threshold': 0.5}
+    return route_hashing
+
+
+def _get_grade_costs() -> list[float]:
+    """
+    Get the coefficients of the energy cost of running on a grade by Minetti et al. (2002), highest power first.
+
+    Returns:
+        list[float]: The coefficients of the polynomial in the grade, giving the cost in J/(kg m). The grade is valid
+        between -0.45 and 0.45.
+    """
+    grade_costs: list[float] = [155.4, -30.4, -43.3, 46.3, 19.5, 3.6]
+    return grade_costs
+
+
+def _get_grade_smoothing() -> dict[str, float]:
+    """
+    Get the resampling of the elevation series before grades are calculated, so elevation noise does not add costs.
+
+    Returns:
+        dict[str, float]: The spacing of the resampled elevation in meters and the length of the windows in meters
+        whose mean elevations give the grades.
+    """
+    grade_smoothing: dict[str, float] = {'spacing': 2, 'window': 50}
+    return grade_smoothing
+
+
+def _get_grade_adjustment() -> dict[str, float]:
+    """
+    Get the flat meters one meter of ascent or descent is worth, for runs without an elevation series.
+
+    Returns:
+        dict[str, float]: The flat meters added per meter of ascent and removed per meter of descent, following the
+        grade costs at a grade of 10 %.
+    """
+    grade_adjustment: dict[str, float] = {'ascent': 6.7, 'descent': 4.1}
+    return grade_adjustment
+
+
+def _get_temperature_adjustment() -> tuple[float, float]:
+    """
+    Get the temperature above which runs are slowed down and by how much.
+
+    Returns:
+        tuple[float, float]: The temperature in degrees Celsius and the relative slowdown per degree above it (default
+        is 15 and 0.4 %).
+    """
+    temperature_adjustment: tuple[float, float] = (15, 0.004)
+    return temperature_adjustment
@@ -1,3 +1,6 @@
+import datetime
+
+from profiling import timed
 from utils import string_to_int, is_between
 
 
@@ -39,6 +42,7 @@ class Date:
         self.year: int = year
 
     @staticmethod
+    @timed('Date.from_string')
     def from_string(string: str) -> 'Date':
         """
         Create a Date object from a string in the format 'dd.mm.yyyy'.
@@ -57,6 +61,31 @@ class Date:
         date: Date = Date(day, month, year)
         return date
 
+    @staticmethod
+    def from_ordinal(ordinal: int) -> 'Date':
+        """
+        Create a Date object from a proleptic Gregorian ordinal, where January 1 of year 1 has ordinal 1.
+
+        Args:
+            ordinal (int): The ordinal of the date.
+
+        Returns:
+            Date: A Date object created from the given ordinal.
+        """
+        python_date: datetime.date = datetime.date.fromordinal(int(ordinal))
+        date: Date = Date(python_date.day, python_date.month, python_date.year)
+        return date
+
+    def to_ordinal(self) -> int:
+        """
+        Convert the date to a proleptic Gregorian ordinal, where January 1 of year 1 has ordinal 1.
+
+        Returns:
+            int: The ordinal of the date.
+        """
+        ordinal: int = datetime.date(self.year, self.month, self.day).toordinal()
+        return ordinal
+
     def __str__(self, reversed: bool = False, short: bool = False) -> str:
         """
         Return the string representation of the date.
@@ -0,0 +1,72 @@
+import glob
+import os
+from typing import Iterator
+
+from run import Run
+from utils import get_run_id
+
+
+def get_run_files(root: str = './LaTeX/') -> list[str]:
+    """
+    Get the locations of all run json files of the diary, sorted by name.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        list[str]: The locations of the json files in the format './LaTeX/yy.mm.dd Run/yy.mm.dd Run.json'.
+    """
+    pattern: str = os.path.join(glob.escape(root), '*', '*.json')
+    file_locations: list[str] = sorted(glob.glob(pattern))
+    return file_locations
+
+
+def get_run_id_from_file(file_location: str) -> str:
+    """
+    Get the identifier of a run from the location of its json file.
+
+    Args:
+        file_location (str): The location of the json file.
+
+    Returns:
+        str: The identifier in the format 'yy.mm.dd Run'.
+    """
+    string: str = os.path.splitext(os.path.basename(file_location))[0]
+    return string
+
+
+def get_new_file_location(run: Run, root: str = './LaTeX/') -> str:
+    """
+    Generate a json file location for a new run that does not overwrite an existing run of the same day.
+
+    Args:
+        run (Run): The run.
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location in the format './LaTeX/yy.mm.dd Run/yy.mm.dd Run.json', or
+        './LaTeX/yy.mm.dd Run/yy.mm.dd Run 2.json' if the day already has a run.
+    """
+    run_id: str = get_run_id(run)
+    file_location: str = os.path.join(root, run_id, f'{run_id}.json')
+    session: int = 1
+    while os.path.exists(file_location):
+        session += 1
+        file_location: str = os.path.join(root, run_id, f'{run_id} {session}.json')
+    return file_location
+
+
+def import_runs(root: str = './LaTeX/', lazy: bool = False) -> Iterator[Run]:
+    """
+    Import all runs of the diary one after another.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        lazy (bool, optional): If True, LazyRun objects are returned, which parse every field only on first access.
+        Defaults to False.
+
+    Yields:
+        Run: The runs sorted by the names of their files.
+    """
+    for file_location in get_run_files(root):
+        yield Run.import_from_file(file_location, lazy)
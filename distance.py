@@ -1,3 +1,4 @@
+from profiling import timed
 from utils import _round, is_between
 
 
@@ -37,6 +38,7 @@ class Distance:
         return '-'
 
     @staticmethod
+    @timed('Distance.from_string')
     def from_string(string: str) -> 'Distance':
         """
         Create a Distance object from a string representing the distance in meters.
@@ -1,3 +1,4 @@
+from profiling import timed
 from utils import string_to_int, _round, is_between
 
 
@@ -37,6 +38,7 @@ class Duration:
         self.seconds: int = seconds
 
     @staticmethod
+    @timed('Duration.from_string')
     def from_string(string: str) -> 'Duration':
         """
         Create a Duration object from a string in the format 'hh:mm:ss' or 'mm:ss'.
@@ -1,3 +1,4 @@
+from profiling import timed
 from utils import _round, is_between
 
 
@@ -25,6 +26,7 @@ class Energy:
         self.kcal: int | None = kcal
 
     @staticmethod
+    @timed('Energy.from_string')
     def from_string(string: str) -> 'Energy':
         """
         Create an Energy object from a string representation of kilocalories.
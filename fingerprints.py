@@ -0,0 +1,137 @@
+import math
+from itertools import product
+
+from constants import _get_duplicate_tolerances
+from history import History
+from run import Run
+from utils import get_run_id
+
+
+class FingerprintIndex:
+    """
+    A class to find runs that duplicate a run already in the diary.
+
+    Every run gets a fingerprint of its date, distance, duration and average heart rate. The distance and duration are
+    divided into buckets as wide as their tolerances, so a near duplicate lies in the same or a neighbouring bucket.
+    Checking a run looks up the nine neighbouring buckets of its date instead of comparing it against every run, and
+    compares the few runs found against the tolerances. The heart rate is only compared if both runs have one.
+
+    Attributes:
+        buckets (dict[tuple[int, int, int], list[tuple[str, float, float, float]]]): The run id, meters, seconds and
+        heartbeats of the runs per date, distance bucket and duration bucket.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty FingerprintIndex object.
+        """
+        self.buckets: dict[tuple[int, int, int], list[tuple[str, float, float, float]]] = {}
+
+    @staticmethod
+    def from_history(history: History) -> 'FingerprintIndex':
+        """
+        Create a FingerprintIndex object of all runs of a history.
+
+        Args:
+            history (History): The runs.
+
+        Returns:
+            FingerprintIndex: The index.
+        """
+        index: FingerprintIndex = FingerprintIndex()
+        for (run_id, date, meters, seconds, heartbeats) in zip(history.run_ids, history.date.tolist(),
+                                                              history.meters.tolist(), history.seconds.tolist(),
+                                                              history.heartbeats.tolist()):
+            index._insert(run_id, int(date), meters, seconds, heartbeats)
+        return index
+
+    def _insert(self, run_id: str, date: int, meters: float, seconds: float, heartbeats: float) -> None:
+        """
+        Insert the fingerprint of a run.
+
+        Args:
+            run_id (str): The identifier of the run.
+            date (int): The date as ordinal.
+            meters (float): The distance in meters, NaN if missing.
+            seconds (float): The duration in seconds.
+            heartbeats (float): The average heartbeats per minute, NaN if missing.
+        """
+        self.buckets.setdefault(_get_bucket(date, meters, seconds), []).append((run_id, meters, seconds, heartbeats))
+
+    def add(self, run: Run, run_id: str | None = None) -> None:
+        """
+        Add a run to the index.
+
+        Args:
+            run (Run): The run.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        self._insert(run_id, *_get_fingerprint(run))
+
+    def find(self, run: Run) -> str | None:
+        """
+        Find a run of the index that duplicates a run.
+
+        Args:
+            run (Run): The run.
+
+        Returns:
+            str | None: The identifier of the duplicate, or None if the run is new.
+        """
+        (date, meters, seconds, heartbeats) = _get_fingerprint(run)
+        tolerances: dict[str, float] = _get_duplicate_tolerances()
+        (_, meters_bucket, seconds_bucket) = _get_bucket(date, meters, seconds)
+        for (meters_offset, seconds_offset) in product((0, -1, 1), repeat=2):
+            for (run_id, other_meters, other_seconds, other_heartbeats) in self.buckets.get(
+                    (date, meters_bucket + meters_offset, seconds_bucket + seconds_offset), []):
+                if math.isnan(meters) != math.isnan(other_meters):
+                    continue
+                if not math.isnan(meters) and abs(meters - other_meters) > tolerances['meters']:
+                    continue
+                if abs(seconds - other_seconds) > tolerances['seconds']:
+                    continue
+                if abs(heartbeats - other_heartbeats) > tolerances['heartbeats']:
+                    continue
+                return run_id
+        return None
+
+
+def _get_fingerprint(run: Run) -> tuple[int, float, float, float]:
+    """
+    Get the normalized key fields of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        tuple[int, float, float, float]: The date as ordinal, the meters, the seconds and the heartbeats per minute.
+        Missing values are NaN.
+    """
+    meters: int | None = run.distance.distance_meters
+    heartbeats: int | None = run.avg_heartbeats_per_minute.integer
+    fingerprint: tuple[int, float, float, float] = (run.date.to_ordinal(),
+                                                    float(meters) if meters is not None else math.nan,
+                                                    float(run.duration.to_seconds()),
+                                                    float(heartbeats) if heartbeats is not None else math.nan)
+    return fingerprint
+
+
+def _get_bucket(date: int, meters: float, seconds: float) -> tuple[int, int, int]:
+    """
+    Get the bucket of a fingerprint.
+
+    Args:
+        date (int): The date as ordinal.
+        meters (float): The distance in meters, NaN if missing.
+        seconds (float): The duration in seconds.
+
+    Returns:
+        tuple[int, int, int]: The date, the distance bucket and the duration bucket. The distance bucket of a missing
+        distance is -1.
+    """
+    tolerances: dict[str, float] = _get_duplicate_tolerances()
+    meters_bucket: int = -1 if math.isnan(meters) else int(meters // tolerances['meters'])
+    bucket: tuple[int, int, int] = (date, meters_bucket, int(seconds // tolerances['seconds']))
+    return bucket
@@ -0,0 +1,152 @@
+import argparse
+import math
+import os
+import random
+from typing import Iterable, Iterator
+
+from date import Date
+from distance import Distance
+from duration import Duration
+from energy import Energy
+from numerics import Integer, Floating
+from run import Run
+from utils import get_run_id
+
+
+def generate_runs(number_of_runs: int,
+                  seed: int = 0,
+                  start: Date | None = None,
+                  years: int = 5) -> Iterator[Run]:
+    """
+    Generate runs with realistic random values, sorted by date.
+
+    Distances are log-normal around 8 km, paces normal around 5:30 min/km and the heart rate, cadence, power and
+    energy follow from the pace and distance with noise. Optional fields are missing with realistic probabilities and
+    several runs can fall on the same day. The same seed always generates the same runs.
+
+    Args:
+        number_of_runs (int): The number of runs.
+        seed (int, optional): The seed of the random number generator. Defaults to 0.
+        start (Date | None, optional): The first possible date. Defaults to None, which uses 01.01.2000.
+        years (int, optional): The number of years the dates span, at most 99. Defaults to 5.
+
+    Yields:
+        Run: The generated runs.
+    """
+    generator: random.Random = random.Random(seed)
+    if start is None:
+        start: Date = Date(day=1, month=1, year=2000)
+    first_day: int = start.to_ordinal()
+    days: list[int] = sorted(generator.randrange(365 * min(years, 99)) for _ in range(number_of_runs))
+    for day in days:
+        yield _generate_run(generator, Date.from_ordinal(first_day + day))
+
+
+def _maybe(generator: random.Random, probability: float, value: int | float) -> int | float | None:
+    """
+    Return a value or None with a given probability.
+
+    Args:
+        generator (random.Random): The random number generator.
+        probability (float): The probability of None.
+        value (int | float): The value.
+
+    Returns:
+        int | float | None: The value or None.
+    """
+    if generator.random() < probability:
+        return None
+    return value
+
+
+def _generate_run(generator: random.Random, date: Date) -> Run:
+    """
+    Generate one run with realistic random values.
+
+    Args:
+        generator (random.Random): The random number generator.
+        date (Date): The date of the run.
+
+    Returns:
+        Run: The generated run.
+    """
+    meters: int = int(min(max(generator.lognormvariate(math.log(8000), 0.45), 1000), 42195))
+    pace: float = min(max(generator.gauss(330, 40), 180), 600)
+    seconds: int = int(pace * meters / 1000)
+    heartbeats: int = int(min(max(generator.gauss(205 - pace / 6, 8), 90), 200))
+    cadence: int = int(min(max(generator.gauss(200 - pace / 10, 5), 140), 200))
+    power: int = int(min(max(generator.gauss(90000 / pace, 20), 100), 500))
+    kcal: int = int(generator.gauss(meters * 0.07, meters * 0.005))
+    ascent: int = int(generator.expovariate(1 / 60))
+    descent: int = int(min(max(generator.gauss(ascent, 5), 0), 2000))
+    temperature: int = int(generator.gauss(12, 8))
+    aerob: float = round(min(max(generator.gauss(3, 0.8), 0.0), 5.0), 1)
+    anaerob: float = round(min(max(generator.gauss(0.8, 0.8), 0.0), 5.0), 1)
+    run: Run = Run(date=date,
+                   distance=Distance(meters),
+                   duration=Duration.from_seconds(seconds),
+                   energy=Energy(_maybe(generator, 0.1, kcal)),
+                   ascent=Distance(_maybe(generator, 0.2, ascent)),
+                   descent=Distance(_maybe(generator, 0.2, descent)),
+                   sweat=Integer(_maybe(generator, 0.6, int(seconds / 3600 * generator.uniform(400, 1200)))),
+                   avg_heartbeats_per_minute=Integer(_maybe(generator, 0.15, heartbeats)),
+                   avg_power=Integer(_maybe(generator, 0.4, power)),
+                   cadence=Integer(_maybe(generator, 0.2, cadence)),
+                   avg_temperature=Integer(_maybe(generator, 0.3, temperature)),
+                   aerob=Floating(_maybe(generator, 0.25, aerob)),
+                   anaerob=Floating(_maybe(generator, 0.25, anaerob)),
+                   effect=generator.choice(['', 'Recovery', 'Basic', 'Tempo', 'Threshold', 'VO2 Max']),
+                   training=generator.choice(['', 'Basic', 'Long Run', 'Intervals', 'Tempo Run', 'Race']),
+                   location=generator.choice(['', 'City', 'Track', 'Forest', 'Lake Loop', 'Treadmill']),
+                   notes=generator.choice(['', '', 'Good Run', 'Heavy legs', 'Knee hurts', 'Windy', 'New shoes']))
+    return run
+
+
+def with_file_locations(runs: Iterable[Run], root: str = './LaTeX/') -> Iterator[tuple[Run, str]]:
+    """
+    Pair runs with their json file locations, numbering further runs on the same day.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Yields:
+        tuple[Run, str]: The run and its location in the format './LaTeX/yy.mm.dd Run/yy.mm.dd Run.json', or
+        './LaTeX/yy.mm.dd Run/yy.mm.dd Run 2.json' for the second run of a day.
+    """
+    sessions: dict[str, int] = {}
+    for run in runs:
+        run_id: str = get_run_id(run)
+        sessions[run_id] = sessions.get(run_id, 0) + 1
+        suffix: str = '' if sessions[run_id] == 1 else f' {sessions[run_id]}'
+        yield run, os.path.join(root, run_id, f'{run_id}{suffix}.json')
+
+
+def write_runs(runs: Iterable[Run], root: str = './LaTeX/', update_records: bool = False) -> list[str]:
+    """
+    Write runs into the folder layout of the diary.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        update_records (bool, optional): If True, the runs are added to the personal records. Defaults to False.
+
+    Returns:
+        list[str]: The locations of the written json files.
+    """
+    file_locations: list[str] = []
+    for (run, file_location) in with_file_locations(runs, root):
+        os.makedirs(os.path.dirname(file_location), exist_ok=True)
+        run.export_to_file(update_records=update_records, file_location=file_location)
+        file_locations.append(file_location)
+    return file_locations
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Generate a synthetic diary.")
+    parser.add_argument('number_of_runs', type=int, help="The number of runs.")
+    parser.add_argument('--seed', type=int, default=0, help="The seed of the random number generator.")
+    parser.add_argument('--years', type=int, default=5, help="The number of years the dates span.")
+    parser.add_argument('--root', default='./LaTeX/', help="The folder of the diary.")
+    namespace: argparse.Namespace = parser.parse_args()
+    write_runs(generate_runs(namespace.number_of_runs, namespace.seed, years=namespace.years), namespace.root)
@@ -0,0 +1,491 @@
+import json
+import os
+from typing import Any, Iterable
+
+import numpy as np
+
+from constants import (_get_history_columns, _get_history_string_columns, _get_history_version,
+                       _get_temperature_adjustment)
+from date import Date
+from diary import get_run_files, get_run_id_from_file
+from metrics import get_metric
+from profiling import count
+from run import Run
+from utils import get_run_id
+
+
+class History:
+    """
+    A class to represent many runs as columns, one array per field, sorted by date.
+
+    Numeric fields are stored as float64 arrays with NaN for missing values, the date as proleptic Gregorian ordinal.
+    Text fields are stored as int32 codes into a shared string table, so analyses over the whole diary are single
+    array operations instead of calls on every Run object.
+
+    Attributes:
+        run_ids (list[str]): The identifiers of the runs.
+        strings (list[str]): The string table of the text fields.
+        date (np.ndarray): The dates as ordinals.
+        meters (np.ndarray): The distances in meters.
+        flat_meters (np.ndarray): The distances on flat ground that cost as much energy as the runs in meters.
+        seconds (np.ndarray): The durations in seconds.
+        kcal (np.ndarray): The energies in kilocalories.
+        ascent (np.ndarray): The ascents in meters.
+        descent (np.ndarray): The descents in meters.
+        sweat (np.ndarray): The sweat in milliliters.
+        heartbeats (np.ndarray): The average heartbeats per minute.
+        power (np.ndarray): The average power in watts.
+        cadence (np.ndarray): The cadences in steps per minute.
+        temperature (np.ndarray): The average temperatures in degrees Celsius.
+        aerob (np.ndarray): The aerobic effects.
+        anaerob (np.ndarray): The anaerobic effects.
+        effect (np.ndarray): The codes of the training effects.
+        training (np.ndarray): The codes of the trainings.
+        location (np.ndarray): The codes of the locations.
+        route (np.ndarray): The codes of the routes.
+    """
+
+    def __init__(self, run_ids: list[str], strings: list[str], **columns: np.ndarray) -> None:
+        """
+        Initialize the History object with its columns.
+
+        Args:
+            run_ids (list[str]): The identifiers of the runs.
+            strings (list[str]): The string table of the text fields.
+            **columns (np.ndarray): One array for every numeric and text column.
+        """
+        self.run_ids: list[str] = run_ids
+        self.strings: list[str] = strings
+        for (column, dtype) in _get_history_columns().items():
+            setattr(self, column, np.asarray(columns[column], dtype=dtype))
+        for column in _get_history_string_columns():
+            setattr(self, column, np.asarray(columns[column], dtype='int32'))
+
+    def __len__(self) -> int:
+        """
+        Return the number of runs.
+
+        Returns:
+            int: The number of runs.
+        """
+        return len(self.run_ids)
+
+    @staticmethod
+    def from_runs(runs: Iterable[Run], run_ids: Iterable[str] | None = None) -> 'History':
+        """
+        Create a History object from runs in one pass.
+
+        Args:
+            runs (Iterable[Run]): The runs.
+            run_ids (Iterable[str] | None, optional): The identifiers of the runs. Defaults to None, which uses
+            'yy.mm.dd Run'.
+
+        Returns:
+            History: A History object sorted by date.
+        """
+        values: dict[str, list] = {column: [] for column in _get_history_columns()}
+        values.update({column: [] for column in _get_history_string_columns()})
+        string_codes: dict[str, int] = {}
+        ids: list[str] = []
+        run_ids_iterator = iter(run_ids) if run_ids is not None else None
+        for run in runs:
+            ids.append(next(run_ids_iterator) if run_ids_iterator is not None else get_run_id(run))
+            values['date'].append(run.date.to_ordinal())
+            values['meters'].append(_to_float(run.distance.distance_meters))
+            values['flat_meters'].append(_to_float(get_metric(run, 'flat_meters')))
+            values['seconds'].append(_to_float(run.duration.to_seconds()))
+            values['kcal'].append(_to_float(run.energy.kcal))
+            values['ascent'].append(_to_float(run.ascent.distance_meters))
+            values['descent'].append(_to_float(run.descent.distance_meters))
+            values['sweat'].append(_to_float(run.sweat.integer))
+            values['heartbeats'].append(_to_float(run.avg_heartbeats_per_minute.integer))
+            values['power'].append(_to_float(run.avg_power.integer))
+            values['cadence'].append(_to_float(run.cadence.integer))
+            values['temperature'].append(_to_float(run.avg_temperature.integer))
+            values['aerob'].append(_to_float(run.aerob.floating))
+            values['anaerob'].append(_to_float(run.anaerob.floating))
+            for column in _get_history_string_columns():
+                string: str = getattr(run, column)
+                values[column].append(string_codes.setdefault(string, len(string_codes)))
+        history: History = History(ids, list(string_codes), **values)
+        return history.sort()
+
+    @staticmethod
+    def import_from_folder(root: str = './LaTeX/') -> 'History':
+        """
+        Create a History object from all runs of the diary.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+        Returns:
+            History: A History object sorted by date.
+        """
+        file_locations: list[str] = get_run_files(root)
+        runs: Iterable[Run] = (Run.import_from_file(file_location) for file_location in file_locations)
+        run_ids: list[str] = [get_run_id_from_file(file_location) for file_location in file_locations]
+        history: History = History.from_runs(runs, run_ids)
+        return history
+
+    @staticmethod
+    def import_from_cache(folder: str, memory_map: bool = True) -> 'History':
+        """
+        Open a History object from a cache folder with one binary file per column.
+
+        The column files are memory mapped, so opening does not read them and analyses only touch the pages of the
+        columns they use. The runs are not sorted on opening, update_cache keeps the cache sorted by date.
+
+        Args:
+            folder (str): The cache folder.
+            memory_map (bool, optional): If True, the columns are memory mapped instead of read. Defaults to True.
+
+        Returns:
+            History: A History object sorted by date.
+        """
+        manifest: dict[str, Any] = _load_manifest(folder)
+        number_of_runs: int = len(manifest['run_ids'])
+        columns: dict[str, np.ndarray] = {}
+        for (column, dtype) in _get_cache_columns().items():
+            file_location: str = os.path.join(folder, f'{column}.bin')
+            if number_of_runs == 0:
+                columns[column] = np.empty(0, dtype=dtype)
+            elif memory_map:
+                columns[column] = np.memmap(file_location, dtype=dtype, mode='r', shape=(number_of_runs,))
+            else:
+                columns[column] = np.fromfile(file_location, dtype=dtype, count=number_of_runs)
+        history: History = History(manifest['run_ids'], manifest['strings'], **columns)
+        return history
+
+    @staticmethod
+    def update_cache(root: str = './LaTeX/', folder: str | None = None) -> 'History':
+        """
+        Bring the cache folder of a diary up to date and open it.
+
+        New runs are appended to the column files and changed runs are overwritten in place, so only the json files
+        that changed since the last update are parsed. The column files are cut to the runs of the manifest before
+        appending, so the rows written by an update that was interrupted before saving the manifest are dropped. If
+        the runs would no longer be sorted by date, the cache is rewritten sorted, and if runs were deleted or the
+        columns or their version changed, the cache is rebuilt.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+            folder (str | None, optional): The cache folder. Defaults to None, which uses '<root>/.history'.
+
+        Returns:
+            History: A History object sorted by date.
+        """
+        if folder is None:
+            folder: str = get_cache_location(root)
+        file_locations: dict[str, str] = {get_run_id_from_file(file_location): file_location
+                                          for file_location in get_run_files(root)}
+        modified: dict[str, int] = {run_id: os.stat(file_location).st_mtime_ns
+                                    for (run_id, file_location) in file_locations.items()}
+        if not os.path.exists(os.path.join(folder, 'manifest.json')):
+            manifest: dict[str, Any] | None = None
+        else:
+            manifest: dict[str, Any] | None = _load_manifest(folder)
+        if (manifest is None or manifest.get('columns') != list(_get_cache_columns()) or not manifest.get('sorted')
+                or manifest.get('version') != _get_history_version()
+                or any(run_id not in modified for run_id in manifest['modified'])):
+            history: History = History.from_runs((Run.import_from_file(file_locations[run_id])
+                                                  for run_id in modified), list(modified))
+            history._export_to_cache(folder, modified)
+            count('history_cache_rebuilds')
+            return History.import_from_cache(folder)
+        changed: list[str] = [run_id for (run_id, time) in modified.items()
+                              if run_id in manifest['modified'] and manifest['modified'][run_id] != time]
+        new: list[str] = [run_id for run_id in modified if run_id not in manifest['modified']]
+        if not changed and not new:
+            count('history_cache_hits')
+            return History.import_from_cache(folder)
+        count('history_cache_updates')
+        rows: dict[str, int] = {run_id: row for (row, run_id) in enumerate(manifest['run_ids'])}
+        strings: list[str] = manifest['strings']
+        string_codes: dict[str, int] = {string: code for (code, string) in enumerate(strings)}
+        columns: dict[str, np.ndarray] | None = None
+        for (run_ids, append) in [(changed, False), (new, True)]:
+            if not run_ids:
+                continue
+            update: History = History.from_runs((Run.import_from_file(file_locations[run_id]) for run_id in run_ids),
+                                                run_ids)
+            code_map: np.ndarray = np.array([string_codes.setdefault(string, len(string_codes))
+                                             for string in update.strings], dtype='int32')
+            values: dict[str, np.ndarray] = {}
+            for (column, dtype) in _get_cache_columns().items():
+                column_values: np.ndarray = getattr(update, column)
+                if column in _get_history_string_columns():
+                    column_values: np.ndarray = code_map[column_values]
+                values[column] = np.ascontiguousarray(column_values, dtype=dtype)
+            number_of_runs: int = len(manifest['run_ids'])
+            indices: list[int] = [] if append else [rows[run_id] for run_id in update.run_ids]
+            if columns is None:
+                dates: np.ndarray = _read_column(folder, 'date', number_of_runs)
+                if append:
+                    dates: np.ndarray = np.concatenate([dates, values['date']])
+                else:
+                    dates[indices] = values['date']
+                if bool(np.any(dates[1:] < dates[:-1])):
+                    columns: dict[str, np.ndarray] | None = {column: _read_column(folder, column, number_of_runs)
+                                                             for column in _get_cache_columns()}
+            for (column, dtype) in _get_cache_columns().items():
+                if columns is not None:
+                    if append:
+                        columns[column] = np.concatenate([columns[column], values[column]])
+                    else:
+                        columns[column][indices] = values[column]
+                    continue
+                file_location: str = os.path.join(folder, f'{column}.bin')
+                if append:
+                    with open(file_location, 'r+b') as file:
+                        file.truncate(number_of_runs * np.dtype(dtype).itemsize)
+                        file.seek(0, os.SEEK_END)
+                        file.write(values[column].tobytes())
+                else:
+                    column_map: np.memmap = np.memmap(file_location, dtype=dtype, mode='r+', shape=(number_of_runs,))
+                    column_map[indices] = values[column]
+                    column_map.flush()
+                    del column_map
+            if append:
+                manifest['run_ids'].extend(update.run_ids)
+        manifest['strings'] = list(string_codes)
+        manifest['modified'] = modified
+        if columns is not None:
+            history: History = History(manifest['run_ids'], manifest['strings'], **columns).sort()
+            history._export_to_cache(folder, modified)
+        else:
+            _save_manifest(folder, manifest)
+        return History.import_from_cache(folder)
+
+    def _export_to_cache(self, folder: str, modified: dict[str, int]) -> None:
+        """
+        Write the History object to a cache folder with one binary file per column.
+
+        The manifest is removed first and saved last, so an interrupted write leaves no manifest and the next update
+        rebuilds the cache.
+
+        Args:
+            folder (str): The cache folder.
+            modified (dict[str, int]): The modification times of the json files per run identifier.
+        """
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(os.path.join(folder, 'manifest.json')):
+            os.remove(os.path.join(folder, 'manifest.json'))
+        for (column, dtype) in _get_cache_columns().items():
+            with open(os.path.join(folder, f'{column}.bin'), 'wb') as file:
+                file.write(np.ascontiguousarray(getattr(self, column), dtype=dtype).tobytes())
+        manifest: dict[str, Any] = {'run_ids': self.run_ids, 'strings': self.strings, 'modified': modified,
+                                    'columns': list(_get_cache_columns()), 'sorted': True,
+                                    'version': _get_history_version()}
+        _save_manifest(folder, manifest)
+
+    def _columns(self) -> dict[str, np.ndarray]:
+        """
+        Get all numeric and text columns.
+
+        Returns:
+            dict[str, np.ndarray]: The column names mapped to their arrays.
+        """
+        names: list[str] = list(_get_history_columns()) + _get_history_string_columns()
+        columns: dict[str, np.ndarray] = {column: getattr(self, column) for column in names}
+        return columns
+
+    def select(self, indices: np.ndarray | slice) -> 'History':
+        """
+        Select runs by indices, a boolean mask or a slice.
+
+        Args:
+            indices (np.ndarray | slice): The runs to select.
+
+        Returns:
+            History: A History object with the selected runs.
+        """
+        run_ids: list[str] = np.asarray(self.run_ids, dtype=object)[indices].tolist()
+        columns: dict[str, np.ndarray] = {column: array[indices] for (column, array) in self._columns().items()}
+        history: History = History(run_ids, self.strings, **columns)
+        return history
+
+    def sort(self) -> 'History':
+        """
+        Sort the runs by date, keeping the order of runs on the same date.
+
+        Returns:
+            History: A History object sorted by date.
+        """
+        order: np.ndarray = np.argsort(self.date, kind='stable')
+        return self.select(order)
+
+    def between(self, start: Date, end: Date) -> 'History':
+        """
+        Select the runs between two dates, both included.
+
+        Args:
+            start (Date): The first date.
+            end (Date): The last date.
+
+        Returns:
+            History: A History object with the selected runs.
+        """
+        lower: int = int(np.searchsorted(self.date, start.to_ordinal(), side='left'))
+        upper: int = int(np.searchsorted(self.date, end.to_ordinal(), side='right'))
+        return self.select(slice(lower, upper))
+
+    def get_strings(self, column: str) -> list[str]:
+        """
+        Get the texts of a text column.
+
+        Args:
+            column (str): The name of the text column, e.g. 'training'.
+
+        Returns:
+            list[str]: The texts of every run.
+        """
+        strings: np.ndarray = np.asarray(self.strings, dtype=object)
+        texts: list[str] = strings[getattr(self, column)].tolist()
+        return texts
+
+    def pace(self) -> np.ndarray:
+        """
+        Calculate the pace of every run, like Speed.to_pace but for all runs at once.
+
+        Returns:
+            np.ndarray: The paces in seconds per kilometer. NaN for runs without distance.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pace: np.ndarray = self.seconds / (self.meters / 1000)
+        pace[~np.isfinite(pace)] = np.nan
+        return pace
+
+    def grade_adjusted_pace(self) -> np.ndarray:
+        """
+        Calculate the grade adjusted pace of every run, like the metric 'grade_adjusted_pace' but for all runs at once.
+
+        Returns:
+            np.ndarray: The paces on flat ground in seconds per kilometer. NaN for runs without distance or elevation.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pace: np.ndarray = self.seconds / (self.flat_meters / 1000)
+        pace[~np.isfinite(pace) | (pace <= 0)] = np.nan
+        return pace
+
+    def temperature_adjusted_pace(self) -> np.ndarray:
+        """
+        Calculate the temperature adjusted pace of every run, like the metric 'temperature_adjusted_pace' but for all
+        runs at once.
+
+        Returns:
+            np.ndarray: The paces in seconds per kilometer. NaN for runs without distance or temperature.
+        """
+        (temperature, slowdown) = _get_temperature_adjustment()
+        pace: np.ndarray = self.pace() / (1 + slowdown * np.maximum(self.temperature - temperature, 0))
+        return pace
+
+    def step_length(self) -> np.ndarray:
+        """
+        Calculate the average step length of every run, like Run.step_length but for all runs at once.
+
+        Returns:
+            np.ndarray: The step lengths in meters. NaN for runs without distance or cadence.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step_length: np.ndarray = self.meters / (self.cadence * self.seconds / 60)
+        step_length[~np.isfinite(step_length)] = np.nan
+        return step_length
+
+    def week(self) -> np.ndarray:
+        """
+        Get the Monday of the week of every run.
+
+        Returns:
+            np.ndarray: The ordinals of the Mondays.
+        """
+        monday: np.ndarray = self.date - (self.date - 1) % 7
+        return monday
+
+
+def get_cache_location(root: str = './LaTeX/') -> str:
+    """
+    Generate the location of the cache folder of a diary.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location of the cache folder.
+    """
+    string: str = os.path.join(root, '.history')
+    return string
+
+
+def _get_cache_columns() -> dict[str, str]:
+    """
+    Get all columns of the cache and their binary data types.
+
+    Returns:
+        dict[str, str]: The column names mapped to their numpy data types.
+    """
+    columns: dict[str, str] = dict(_get_history_columns())
+    columns.update({column: 'int32' for column in _get_history_string_columns()})
+    return columns
+
+
+def _read_column(folder: str, column: str, number_of_runs: int) -> np.ndarray:
+    """
+    Read the first rows of a column file of a cache folder into memory.
+
+    Args:
+        folder (str): The cache folder.
+        column (str): The name of the column.
+        number_of_runs (int): The number of rows to read.
+
+    Returns:
+        np.ndarray: The writable values.
+    """
+    values: np.ndarray = np.fromfile(os.path.join(folder, f'{column}.bin'), dtype=_get_cache_columns()[column],
+                                     count=number_of_runs)
+    return values
+
+
+def _load_manifest(folder: str) -> dict[str, Any]:
+    """
+    Load the manifest of a cache folder.
+
+    Args:
+        folder (str): The cache folder.
+
+    Returns:
+        dict[str, Any]: The run identifiers, the string table, the modification times of the json files, the names
+        of the columns, whether the runs are sorted by date and the version of the values.
+    """
+    with open(os.path.join(folder, 'manifest.json'), 'r') as file:
+        manifest: dict[str, Any] = json.load(file)
+    return manifest
+
+
+def _save_manifest(folder: str, manifest: dict[str, Any]) -> None:
+    """
+    Save the manifest of a cache folder, replacing the old manifest only once the new one is written.
+
+    Args:
+        folder (str): The cache folder.
+        manifest (dict[str, Any]): The run identifiers, the string table, the modification times of the json
+        files, the names of the columns, whether the runs are sorted by date and the version of the values.
+    """
+    file_location: str = os.path.join(folder, 'manifest.json')
+    with open(file_location + '.tmp', 'w') as file:
+        json.dump(manifest, file)
+    os.replace(file_location + '.tmp', file_location)
+
+
+def _to_float(value: int | float | None) -> float:
+    """
+    Convert a value to a float, using NaN for missing values.
+
+    Args:
+        value (int | float | None): The value to convert.
+
+    Returns:
+        float: The value as float or NaN if the value is None.
+    """
+    if value is None:
+        return float('nan')
+    return float(value)
@@ -0,0 +1,149 @@
+import os
+from html import escape
+from string import Template
+from typing import Iterable
+
+from diary import get_run_files, get_run_id_from_file
+from metrics import get_metric
+from profiling import timed
+from records import get_records_location
+from report import get_rows, get_split_rows, get_records, format_value
+from run import Run
+
+_STYLE: str = ('body{font-family:sans-serif;max-width:40em;margin:2em auto;color:#222}'
+               'table{border-collapse:collapse;margin:1em auto}'
+               'td,th{padding:.3em .8em;text-align:left;border-bottom:1px solid #ddd}'
+               'td.number{text-align:right}'
+               'p.records{text-align:center;font-weight:bold}')
+
+_PAGE: Template = Template('<!DOCTYPE html>\n'
+                           '<html lang="en">\n'
+                           '<head><meta charset="utf-8"><title>$title</title><style>$style</style></head>\n'
+                           '<body>\n'
+                           '<h1>$title</h1>\n'
+                           '$body'
+                           '</body>\n'
+                           '</html>\n')
+
+_ROW: Template = Template('<tr><th>$label</th><td>$value</td></tr>\n')
+
+_SPLIT_ROW: Template = Template('<tr><td class="number">$number</td><td>$duration</td><td>$pace min/km</td></tr>\n')
+
+_INDEX_ROW: Template = Template('<tr><td><a href="$link">$date</a></td><td class="number">$distance km</td>'
+                                '<td>$duration</td><td>$pace min/km</td><td>$training</td></tr>\n')
+
+
+def _get_table(run: Run) -> str:
+    """
+    Generate the table of a run and, if it has trackpoints, the table of its splits.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        str: The tables as html.
+    """
+    rows: str = ''.join(_ROW.substitute(label=label, value=escape(format_value(value, unit, separator='\u202f')))
+                        for (label, value, unit) in get_rows(run))
+    table: str = f'<table>\n{rows}</table>\n'
+    split_rows: list[tuple[str, str, str]] = get_split_rows(run)
+    if split_rows:
+        table += ('<table>\n<tr><th>Split</th><th>Duration</th><th>Pace</th></tr>\n'
+                  + ''.join(_SPLIT_ROW.substitute(number=number, duration=duration, pace=pace)
+                            for (number, duration, pace) in split_rows)
+                  + '</table>\n')
+    return table
+
+
+@timed('html_report.get_run_html')
+def get_run_html(run: Run, run_id: str | None = None, records_location: str | None = None) -> str:
+    """
+    Generate the html page of a run with the same content as the pdf file.
+
+    Args:
+        run (Run): The run.
+        run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        './LaTeX/records.jsonl'.
+
+    Returns:
+        str: The html page.
+    """
+    records: list[str] = get_records(run, run_id, records_location)
+    body: str = ''
+    if records:
+        body += f'<p class="records">Personal record: {escape(", ".join(records))}</p>\n'
+    body += _get_table(run)
+    html: str = _PAGE.substitute(title=f'Run of {run.date}', style=_STYLE, body=body)
+    return html
+
+
+def get_index_html(runs: Iterable[tuple[Run, str]], root: str = './LaTeX/') -> str:
+    """
+    Generate the html page listing runs with links to their pages.
+
+    Args:
+        runs (Iterable[tuple[Run, str]]): The runs and the locations of their html pages.
+        root (str, optional): The folder of the index page, the links are relative to it. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The html page.
+    """
+    rows: list[str] = []
+    for (run, file_location) in runs:
+        rows.append(_INDEX_ROW.substitute(link=escape(os.path.relpath(file_location, root).replace(os.sep, '/')),
+                                          date=run.date,
+                                          distance=format_value(run.distance.to_kilometers(), separator='\u202f'),
+                                          duration=run.duration,
+                                          pace=get_metric(run, 'pace').__str__(short=True),
+                                          training=escape(run.training)))
+    body: str = ('<table>\n<tr><th>Date</th><th>Distance</th><th>Duration</th><th>Pace</th><th>Training</th></tr>\n'
+                 + ''.join(rows)
+                 + '</table>\n')
+    html: str = _PAGE.substitute(title="Runner's diary", style=_STYLE, body=body)
+    return html
+
+
+def safe_to_file(run: Run, file_location: str, records_location: str | None = None) -> None:
+    """
+    Save the html page of a run to a file.
+
+    Args:
+        run (Run): The run.
+        file_location (str): The location of the html file.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        the journal of the diary two folders above the file.
+    """
+    if records_location is None:
+        records_location: str = get_records_location(os.path.dirname(os.path.dirname(file_location)))
+    run_id: str = os.path.splitext(os.path.basename(file_location))[0]
+    with open(file_location, 'w', encoding='utf-8') as file:
+        file.write(get_run_html(run, run_id, records_location))
+
+
+@timed('html_report.export_diary')
+def export_diary(root: str = './LaTeX/', file_locations: list[str] | None = None) -> int:
+    """
+    Save the html page of every run next to its json file and an index page 'index.html' in the folder of the diary.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        file_locations (list[str] | None, optional): The json files of the runs. Defaults to None, which uses all runs
+        of the diary.
+
+    Returns:
+        int: The number of saved run pages.
+    """
+    if file_locations is None:
+        file_locations: list[str] = get_run_files(root)
+    records_location: str = get_records_location(root)
+    pages: list[tuple[Run, str]] = []
+    for file_location in file_locations:
+        run: Run = Run.import_from_file(file_location)
+        html_location: str = os.path.splitext(file_location)[0] + '.html'
+        with open(html_location, 'w', encoding='utf-8') as file:
+            file.write(get_run_html(run, get_run_id_from_file(file_location), records_location))
+        pages.append((run, html_location))
+    with open(os.path.join(root, 'index.html'), 'w', encoding='utf-8') as file:
+        file.write(get_index_html(pages, root))
+    return len(pages)
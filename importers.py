@@ -0,0 +1,221 @@
+import csv
+import datetime
+import os
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+from constants import _get_earth_radius
+from date import Date
+from distance import Distance
+from duration import Duration
+from energy import Energy
+from numerics import Integer, Floating
+from run import Run, _get_parsers
+from trackpoints import Trackpoints
+
+
+def get_supported_endings() -> list[str]:
+    """
+    Get the file endings that can be imported.
+
+    Returns:
+        list[str]: The file endings.
+    """
+    endings: list[str] = ['.json', '.csv', '.gpx', '.ndjson', '.ndjson.gz']
+    return endings
+
+
+def is_supported(file_location: str) -> bool:
+    """
+    Check whether a file can be imported by its ending.
+
+    Args:
+        file_location (str): The location of the file.
+
+    Returns:
+        bool: True if the file can be imported.
+    """
+    return any(file_location.lower().endswith(ending) for ending in get_supported_endings())
+
+
+def import_file(file_location: str) -> list[Run]:
+    """
+    Import all runs of a json, csv, gpx or newline-delimited json file.
+
+    Args:
+        file_location (str): The location of the file.
+
+    Returns:
+        list[Run]: The runs of the file.
+
+    Raises:
+        ValueError: If the file ending is not supported.
+    """
+    lower_location: str = file_location.lower()
+    if lower_location.endswith('.ndjson') or lower_location.endswith('.ndjson.gz'):
+        from ndjson import import_ndjson
+        return list(import_ndjson(file_location))
+    ending: str = os.path.splitext(lower_location)[1]
+    if ending == '.json':
+        return [Run.import_from_file(file_location)]
+    if ending == '.csv':
+        return import_csv(file_location)
+    if ending == '.gpx':
+        return [import_gpx(file_location)]
+    raise ValueError(f"File ending of '{file_location}' is not supported. Use one of {get_supported_endings()}.")
+
+
+def import_csv(file_location: str) -> list[Run]:
+    """
+    Import runs from a csv file with one run per row.
+
+    The header holds the names of the fields of Run.__dict__ and the values are written like in version 1 run files,
+    e.g. '01.05.2024' for the date and '01:09:42' for the duration. Missing columns and empty cells are missing values.
+
+    Args:
+        file_location (str): The location of the csv file.
+
+    Returns:
+        list[Run]: The runs of the file.
+    """
+    runs: list[Run] = []
+    with open(file_location, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            data: dict[str, str] = {field: (row.get(field) or '').strip() for field in _get_parsers()}
+            runs.append(Run.from_dict(data))
+    return runs
+
+
+def _get_local_name(tag: str) -> str:
+    """
+    Remove the namespace from the tag of an xml element.
+
+    Args:
+        tag (str): The tag, e.g. '{http://www.topografix.com/GPX/1/1}trkpt'.
+
+    Returns:
+        str: The tag without namespace, e.g. 'trkpt'.
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def _get_distances(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Calculate the cumulative great circle distance along coordinates with the haversine formula.
+
+    Args:
+        latitudes (np.ndarray): The latitudes in degrees.
+        longitudes (np.ndarray): The longitudes in degrees.
+
+    Returns:
+        np.ndarray: The cumulative distance in meters, starting at 0.
+    """
+    latitudes: np.ndarray = np.radians(latitudes)
+    longitudes: np.ndarray = np.radians(longitudes)
+    haversine: np.ndarray = (np.sin(np.diff(latitudes) / 2) ** 2
+                             + np.cos(latitudes[:-1]) * np.cos(latitudes[1:]) * np.sin(np.diff(longitudes) / 2) ** 2)
+    steps: np.ndarray = 2 * _get_earth_radius() * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+    distances: np.ndarray = np.concatenate([[0.0], np.cumsum(steps)])
+    return distances
+
+
+def _nanmean(values: np.ndarray | None) -> int | None:
+    """
+    Get the rounded mean of a column, ignoring missing values.
+
+    Args:
+        values (np.ndarray | None): The column.
+
+    Returns:
+        int | None: The rounded mean, or None if the column is missing or has no values.
+    """
+    if values is None or not np.any(np.isfinite(values)):
+        return None
+    return int(round(float(np.nanmean(values))))
+
+
+def import_gpx(file_location: str) -> Run:
+    """
+    Import a run from a gpx track.
+
+    The distance is the great circle distance between the track points, the ascent and descent are the summed up and
+    down steps of the elevation. Heart rate, cadence and power are read from the Garmin track point extensions if
+    present. Garmin stores the cadence of one foot, so it is doubled to steps per minute. The name of the track is used
+    as notes.
+
+    Args:
+        file_location (str): The location of the gpx file.
+
+    Returns:
+        Run: The run with its trackpoints.
+
+    Raises:
+        ValueError: If the file has no track points with time.
+    """
+    root: ElementTree.Element = ElementTree.parse(file_location).getroot()
+    name: str = ''
+    points: dict[str, list[float]] = {'latitude': [], 'longitude': [], 'elevation': [], 'time': [],
+                                      'heartbeats': [], 'cadence': [], 'power': []}
+    for element in root.iter():
+        local_name: str = _get_local_name(element.tag)
+        if local_name == 'name' and not name and element.text:
+            name: str = element.text.strip()
+        if local_name != 'trkpt':
+            continue
+        values: dict[str, float] = {'latitude': float(element.get('lat')), 'longitude': float(element.get('lon'))}
+        for child in element.iter():
+            child_name: str = _get_local_name(child.tag)
+            if child.text is None:
+                continue
+            if child_name == 'ele':
+                values['elevation'] = float(child.text)
+            elif child_name == 'time':
+                values['time'] = datetime.datetime.fromisoformat(child.text.strip()).timestamp()
+            elif child_name == 'hr':
+                values['heartbeats'] = float(child.text)
+            elif child_name == 'cad':
+                values['cadence'] = 2 * float(child.text)
+            elif child_name == 'power':
+                values['power'] = float(child.text)
+        if 'time' not in values:
+            continue
+        for column in points:
+            points[column].append(values.get(column, np.nan))
+    if not points['time']:
+        raise ValueError(f"File '{file_location}' has no track points with time.")
+    columns: dict[str, np.ndarray] = {column: np.array(values) for (column, values) in points.items()}
+    optional: dict[str, np.ndarray | None] = {column: columns[column] if np.any(np.isfinite(columns[column])) else None
+                                              for column in ['elevation', 'heartbeats', 'cadence', 'power']}
+    distances: np.ndarray = _get_distances(columns['latitude'], columns['longitude'])
+    trackpoints: Trackpoints = Trackpoints(timestamp=columns['time'] - columns['time'][0],
+                                           distance=distances,
+                                           latitude=columns['latitude'],
+                                           longitude=columns['longitude'],
+                                           **optional)
+    ascent: int | None = None
+    descent: int | None = None
+    if optional['elevation'] is not None:
+        steps: np.ndarray = np.diff(optional['elevation'][np.isfinite(optional['elevation'])])
+        ascent: int = int(round(float(steps[steps > 0].sum())))
+        descent: int = int(round(float(-steps[steps < 0].sum())))
+    start: datetime.datetime = datetime.datetime.fromtimestamp(columns['time'][0])
+    run: Run = Run(date=Date(start.day, start.month, start.year),
+                   distance=Distance(int(round(float(distances[-1])))),
+                   duration=Duration.from_seconds(int(round(float(columns['time'][-1] - columns['time'][0])))),
+                   energy=Energy(None),
+                   ascent=Distance(ascent),
+                   descent=Distance(descent),
+                   sweat=Integer(None),
+                   avg_heartbeats_per_minute=Integer(_nanmean(optional['heartbeats'])),
+                   avg_power=Integer(_nanmean(optional['power'])),
+                   cadence=Integer(_nanmean(optional['cadence'])),
+                   avg_temperature=Integer(None),
+                   aerob=Floating(None),
+                   anaerob=Floating(None),
+                   effect='',
+                   training='',
+                   location='',
+                   notes=name,
+                   trackpoints=trackpoints)
+    return run
@@ -1,7 +1,11 @@
+import os
 import subprocess
 
+from profiling import count, span, timed
+from records import PersonalRecords, get_records_location
+from report import get_rows, get_split_rows, format_value
 from run import Run
-from utils import to_string, get_directory, _new_folder
+from utils import get_directory, _new_folder
 
 
 def _get_preamble() -> str:
@@ -50,160 +54,107 @@ def _get_begin(run: Run) -> str:
     return begin
 
 
-def _get_table_1(run: Run) -> str:
+def _get_records(run: Run, run_id: str | None = None, records_location: str | None = None) -> str:
     """
-    Generate the first part of the table for the LaTeX document.
+    Generate the list of personal records the run holds for the LaTeX document.
 
     Args:
         run (Run): The run instance.
+        run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        './LaTeX/records.jsonl'.
 
     Returns:
-        str: The first part of the table of the LaTeX document as a string.
+        str: The personal records as a string. Empty if the run holds no personal record.
     """
-    string_1: str = (r"\begin{center}"
-                     "\n"
-                     r"\begin{tabularx}{0.5\linewidth}{l l}"
-                     "\n"
-                     r"Distance & $"
-                     f"{to_string(run.distance.to_meters())}"
-                     r" \,\unit{\meter}$\\"
-                     "\n"
-                     r"Duration & $"
-                     f"{to_string(run.duration.hours)}"
-                     r" \,\unit{\hour}~ "
-                     f"{to_string(run.duration.minutes)}"
-                     r" \,\unit{\minute}~ "
-                     f"{to_string(run.duration.seconds)}"
-                     r" \,\unit{\second}$\\"
-                     "\n"
-                     r"Speed & $"
-                     f"{to_string(run.speed().to_kmh())}"
-                     r" \,\unit{\kilo\meter\per\hour}$\\"
-                     "\n"
-                     r"Pace & $"
-                     f"{to_string(run.speed().to_pace().__str__(short=True))}"
-                     r" \,\unit{\minute\per\kilo\meter}$\\"
-                     "\n")
-    return string_1
-
-
-def _get_table_2(run: Run) -> str:
-    """
-    Generate the second part of the table for the LaTeX document.
+    records: list[str] = PersonalRecords.import_from_file(records_location).get_records(run, run_id)
+    if not records:
+        return ''
+    string_records: str = (r"\textbf{Personal record:} "
+                           f"{', '.join(records)}"
+                           "\n\n")
+    return string_records
 
-    Args:
-        run (Run): The run instance.
 
-    Returns:
-        str: The second part of the table of the LaTeX document as a string.
+def _get_table_rows(run: Run) -> str:
     """
-    string_2: str = (r"Heartbeat & $"
-                     f"{to_string(run.avg_heartbeats_per_minute.integer)}"
-                     r" \,\unit{\per\minute}$\\"
-                     "\n"
-                     r"Cadence & $"
-                     f"{to_string(run.cadence.integer)}"
-                     r" \,\unit{\per\minute}$\\"
-                     "\n"
-                     r"Energy & $"
-                     f"{to_string(run.energy.kcal)}"
-                     r" \,\unit{\kilo cal}$\\"
-                     "\n"
-                     r"Ascent & $"
-                     f"{to_string(run.ascent.to_meters())}"
-                     r" \,\unit{\meter}$\\"
-                     "\n"
-                     r"Descent & $"
-                     f"{to_string(run.descent.to_meters())}"
-                     r" \,\unit{\meter}$\\"
-                     "\n"
-                     r"Steps & $"
-                     f"{to_string(run.total_steps())}"
-                     r"$\\"
-                     "\n")
-    return string_2
+    Generate the table of the values of a run for the LaTeX document from report.get_rows.
 
-
-def _get_table_3(run: Run) -> str:
-    """
-    Generate the third part of the table for the LaTeX document.
+    Text fields are set in text mode, all other values in math mode.
 
     Args:
         run (Run): The run instance.
 
     Returns:
-        str: The third part of the table of the LaTeX document as a string.
+        str: The table of the LaTeX document as a string.
     """
-    string_3: str = (r"Temperature & $"
-                     f"{to_string(run.avg_temperature.integer)}"
-                     r" \,\unit{\degreeCelsius}$\\"
-                     "\n"
-                     r"Sweat & $"
-                     f"{to_string(run.sweat.integer)}"
-                     r" \,\unit{\milli\liter}$\\"
-                     "\n"
-                     r"Power & $"
-                     f"{to_string(run.avg_power.integer)}"
-                     r" \,\unit{\watt}$\\"
-                     "\n"
-                     r"Training Effect & "
-                     f"{to_string(run.effect)}"
-                     r"\\"
-                     "\n"
-                     r"Aerob & $"
-                     f"{to_string(run.aerob.floating)}"
-                     r"$\\"
-                     "\n"
-                     r"Anaerob & $"
-                     f"{to_string(run.anaerob.floating)}"
-                     r"$\\"
-                     "\n")
-    return string_3
+    lines: list[str] = []
+    for (label, value, unit) in get_rows(run):
+        string: str = format_value(value, unit, latex=True)
+        lines.append(f'{label} & {string}' if isinstance(value, str) else f'{label} & ${string}$')
+    string_rows: str = (r"\begin{center}"
+                        "\n"
+                        r"\begin{tabularx}{0.5\linewidth}{l l}"
+                        "\n"
+                        + "\\\\\n".join(lines)
+                        + "\n"
+                        r"\end{tabularx}"
+                        "\n"
+                        r"\end{center}"
+                        "\n")
+    return string_rows
 
 
-def _get_table_4(run: Run) -> str:
+def _get_table_splits(run: Run, split_meters: float = 1000) -> str:
     """
-    Generate the fourth part of the table for the LaTeX document.
+    Generate the table of splits for the LaTeX document.
 
     Args:
         run (Run): The run instance.
+        split_meters (float, optional): The length of a split in meters. Defaults to 1000.
 
     Returns:
-        str: The fourth part of the table of the LaTeX document as a string.
-    """
-    string_4: str = (r"Training & "
-                     f"{to_string(run.training)}"
-                     r"\\"
-                     "\n"
-                     r"Location & "
-                     f"{to_string(run.location)}"
-                     r"\\"
-                     "\n"
-                     r"Notes & "
-                     f"{to_string(run.notes)}"
-                     "\n"
-                     r"\end{tabularx}"
-                     "\n"
-                     r"\end{center}"
-                     "\n")
-    return string_4
-
-
-def _get_table(run: Run) -> str:
+        str: The table of splits of the LaTeX document as a string. Empty if the run has no trackpoints.
+    """
+    split_rows: list[tuple[str, str, str]] = get_split_rows(run, split_meters)
+    if not split_rows:
+        return ''
+    string_splits: str = (r"\begin{center}"
+                          "\n"
+                          r"\begin{tabularx}{0.5\linewidth}{l l l}"
+                          "\n"
+                          r"Split & Duration & Pace\\"
+                          "\n")
+    for (number, duration, pace) in split_rows:
+        string_splits += (r"$"
+                          f"{number}"
+                          r"$ & $"
+                          f"{duration}"
+                          r"$ & $"
+                          f"{format_value(pace, 'min/km', latex=True)}"
+                          r"$\\"
+                          "\n")
+    string_splits += (r"\end{tabularx}"
+                      "\n"
+                      r"\end{center}"
+                      "\n")
+    return string_splits
+
+
+def _get_table(run: Run, splits: bool = True) -> str:
     """
     Generate the complete table for the LaTeX document.
 
     Args:
         run (Run): The run instance.
+        splits (bool, optional): If True, a table of splits is added for runs with trackpoints. Defaults to True.
 
     Returns:
         str: The complete table of the LaTeX document as a string.
     """
-    string_1: str = _get_table_1(run)
-    string_2: str = _get_table_2(run)
-    string_3: str = _get_table_3(run)
-    string_4: str = _get_table_4(run)
-    string: str = string_1 + string_2 + string_3 + string_4
+    string: str = _get_table_rows(run)
+    if splits:
+        string += _get_table_splits(run)
     return string
 
 
@@ -219,24 +170,30 @@ def _get_end() -> str:
     return end
 
 
-def _get_text(run: Run) -> str:
+@timed('latex._get_text')
+def _get_text(run: Run, run_id: str | None = None, records_location: str | None = None) -> str:
     """
     Generate the complete LaTeX document as a string.
 
     Args:
         run (Run): The run instance.
+        run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        './LaTeX/records.jsonl'.
 
     Returns:
         str: The complete LaTeX document as a string.
     """
     preamble: str = _get_preamble()
     begin: str = _get_begin(run)
+    records: str = _get_records(run, run_id, records_location)
     table: str = _get_table(run)
     end: str = _get_end()
-    text: str = preamble + begin + table + end
+    text: str = preamble + begin + records + table + end
     return text
 
 
+@timed('latex._make_pdf')
 def _make_pdf(folder: str, file_location: str) -> None:
     """
     Generate a PDF from the LaTeX file.
@@ -246,20 +203,40 @@ def _make_pdf(folder: str, file_location: str) -> None:
         file_location (str): The LaTeX file location.
     """
     command = ['pdflatex', '-output-directory', folder, file_location]
-    subprocess.run(command)
+    try:
+        with span('latex.pdflatex'):
+            process: subprocess.CompletedProcess = subprocess.run(command)
+    except OSError:
+        count('pdflatex_failures')
+        raise
+    if process.returncode != 0:
+        count('pdflatex_failures')
 
 
-def safe_to_file(run: Run) -> None:
+@timed('latex.safe_to_file')
+def safe_to_file(run: Run, file_location: str | None = None, text: str | None = None) -> None:
     """
     Save the run data to a LaTeX file and generate a PDF.
 
     Args:
         run (Run): The run instance.
-    """
-    directory: str = get_directory(run)
-    file_location: str = directory + f'{run.date.__str__(reversed=True, short=True)} Run.tex'
-    _new_folder(directory)
-    text: str = _get_text(run)
+        file_location (str | None, optional): The location of the LaTeX file. Defaults to None, which uses
+        './LaTeX/yy.mm.dd Run/yy.mm.dd Run.tex' and asks before reusing an existing folder.
+        text (str | None, optional): The LaTeX document, e.g. generated by _get_text on another thread. Defaults to
+        None, which generates it from the run and the records journal.
+    """
+    if file_location is None:
+        directory: str = get_directory(run)
+        file_location: str = directory + f'{run.date.__str__(reversed=True, short=True)} Run.tex'
+        _new_folder(directory)
+        records_location: str | None = None
+    else:
+        directory: str = os.path.dirname(file_location)
+        os.makedirs(directory, exist_ok=True)
+        records_location: str | None = get_records_location(os.path.dirname(directory))
+    if text is None:
+        run_id: str = os.path.splitext(os.path.basename(file_location))[0]
+        text: str = _get_text(run, run_id, records_location)
     with open(file_location, 'w') as file:
         file.write(text)
     _make_pdf(directory, file_location)
@@ -1,9 +1,470 @@
-from input_run import input_run
-from latex import safe_to_file
-from run import Run
-
-run: Run = input_run()
-print("\nSaving run to json file.")
-run.export_to_file()
-print("\nExporting run to pdf file.")
-safe_to_file(run)
+import argparse
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fingerprints import FingerprintIndex
+    from run import Run
+
+
+def _parse_date_range(namespace: argparse.Namespace) -> tuple[int, int]:
+    """
+    Get the date range of a command as ordinals.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments with 'start' and 'end' in the format 'dd.mm.yyyy'.
+
+    Returns:
+        tuple[int, int]: The ordinals of the first and the last date, both included.
+    """
+    from date import Date
+    start: int = Date.from_string(namespace.start).to_ordinal() if namespace.start else 1
+    end: int = Date.from_string(namespace.end).to_ordinal() if namespace.end else 10 ** 7
+    return start, end
+
+
+def _select_files(namespace: argparse.Namespace) -> list[str]:
+    """
+    Get the json files of the runs in the date range of a command.
+
+    The dates are taken from the history cache, so only the json files that changed since its last update are parsed.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        list[str]: The locations of the json files.
+    """
+    from diary import get_run_files, get_run_id_from_file
+    from history import History
+    if not namespace.start and not namespace.end:
+        return get_run_files(namespace.root)
+    (start, end) = _parse_date_range(namespace)
+    history: History = History.update_cache(namespace.root)
+    selected: set[str] = {run_id for (run_id, date) in zip(history.run_ids, history.date.tolist())
+                          if start <= date <= end}
+    file_locations: list[str] = [file_location for file_location in get_run_files(namespace.root)
+                                 if get_run_id_from_file(file_location) in selected]
+    return file_locations
+
+
+def command_add(namespace: argparse.Namespace) -> None:
+    """
+    Input a run interactively, save it to a json file and export it to a pdf file.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    import os
+    from diary import get_new_file_location
+    from input_run import input_run
+    from latex import safe_to_file
+    from run import Run
+    run: Run = input_run()
+    file_location: str = get_new_file_location(run, namespace.root)
+    print("\nSaving run to json file.")
+    run.export_to_file(file_location=file_location)
+    print("\nExporting run to pdf file.")
+    safe_to_file(run, os.path.splitext(file_location)[0] + '.tex')
+
+
+def _import_run(run: 'Run', namespace: argparse.Namespace, fingerprints: 'FingerprintIndex') -> str | None:
+    """
+    Import one run into the diary, unless it duplicates a run of the diary.
+
+    Args:
+        run (Run): The run.
+        namespace (argparse.Namespace): The parsed arguments.
+        fingerprints (FingerprintIndex): The fingerprints of the runs of the diary, the run is added to them.
+
+    Returns:
+        str | None: The location of the json file of the run, or None if it was skipped.
+    """
+    import os
+    from diary import get_new_file_location
+    duplicate: str | None = None if namespace.duplicates else fingerprints.find(run)
+    if duplicate is not None:
+        print(f"Skipped the run of {run.date}, it duplicates '{duplicate}'.")
+        return None
+    file_location: str = get_new_file_location(run, namespace.root)
+    run.export_to_file(file_location=file_location)
+    fingerprints.add(run, os.path.splitext(os.path.basename(file_location))[0])
+    return file_location
+
+
+def command_import(namespace: argparse.Namespace) -> None:
+    """
+    Import runs from json files or newline-delimited json files into the diary, skipping duplicates of its runs.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from fingerprints import FingerprintIndex
+    from history import History
+    from ndjson import import_ndjson, is_ndjson
+    from run import Run
+    fingerprints: FingerprintIndex = FingerprintIndex.from_history(History.update_cache(namespace.root))
+    for file_name in namespace.files:
+        if is_ndjson(file_name):
+            number_of_runs: int = sum(_import_run(run, namespace, fingerprints) is not None
+                                      for run in import_ndjson(file_name))
+            print(f"Imported {number_of_runs} runs from '{file_name}'.")
+            continue
+        file_location: str | None = _import_run(Run.import_from_file(file_name), namespace, fingerprints)
+        if file_location is not None:
+            print(f"Imported '{file_name}' to '{file_location}'.")
+
+
+def command_build(namespace: argparse.Namespace) -> None:
+    """
+    Export the runs in a date range to pdf files.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    import os
+    from run import Run
+    if namespace.builtin:
+        from pdf import safe_to_file
+        for file_location in _select_files(namespace):
+            safe_to_file(Run.import_from_file(file_location), os.path.splitext(file_location)[0] + '.pdf')
+        return
+    from latex import safe_to_file
+    for file_location in _select_files(namespace):
+        safe_to_file(Run.import_from_file(file_location), os.path.splitext(file_location)[0] + '.tex')
+
+
+def command_stats(namespace: argparse.Namespace) -> None:
+    """
+    Print the totals per year and the race predictions of the runs in a date range.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    import numpy as np
+    from date import Date
+    from duration import Duration
+    from history import History
+    from prediction import RacePredictor
+    (start, end) = _parse_date_range(namespace)
+    history: History = History.update_cache(namespace.root)
+    history: History = history.select((history.date >= start) & (history.date <= end))
+    print(f"Runs: {len(history)}")
+    if not len(history):
+        return
+    years: np.ndarray = np.array([Date.from_ordinal(ordinal).year for ordinal in history.date.tolist()])
+    for year in np.unique(years).tolist():
+        in_year: np.ndarray = years == year
+        meters: float = float(np.nansum(history.meters[in_year]))
+        seconds: float = float(np.nansum(history.seconds[in_year]))
+        pace: Duration = Duration.from_seconds(int(seconds / (meters / 1000))) if meters else Duration(0, 0, 0)
+        print(f"{year}: {int(in_year.sum())} runs, {meters / 1000:.1f} km, "
+              f"{Duration.from_seconds(int(seconds))}, {pace.__str__(short=True)} min/km")
+    for (race, duration) in RacePredictor().fit(history).predict_races().items():
+        print(f"Prediction {race}: {duration if duration is not None else '-'}")
+
+
+def command_book(namespace: argparse.Namespace) -> None:
+    """
+    Export the runs in a date range to one pdf file with the built-in pdf writer.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from pdf import export_diary
+    number_of_pages: int = export_diary(namespace.file, namespace.root, _select_files(namespace))
+    print(f"Exported {number_of_pages} pages to '{namespace.file}'.")
+
+
+def command_html(namespace: argparse.Namespace) -> None:
+    """
+    Export the runs in a date range to html files and write an index of them.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from html_report import export_diary
+    number_of_pages: int = export_diary(namespace.root, _select_files(namespace))
+    print(f"Exported {number_of_pages} runs to html files.")
+
+
+def command_query(namespace: argparse.Namespace) -> None:
+    """
+    Print the runs in a date range, optionally filtered by training.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from run import Run
+    from utils import to_string
+    for file_location in _select_files(namespace):
+        run: Run = Run.import_from_file(file_location, lazy=True)
+        if namespace.training is not None and run.training != namespace.training:
+            continue
+        print(f"{run.date}  {to_string(run.distance.to_kilometers())} km  {run.duration}  "
+              f"{run.speed().to_pace().__str__(short=True)} min/km  {run.training}")
+
+
+def command_validate(namespace: argparse.Namespace) -> None:
+    """
+    Print the implausible values of files of runs, or of the runs of the diary in a date range.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from history import History
+    from importers import import_file
+    from validation import ValidationReport, validate, validate_runs
+    if namespace.files:
+        report: ValidationReport = validate_runs(run for file_name in namespace.files
+                                                 for run in import_file(file_name))
+    else:
+        (start, end) = _parse_date_range(namespace)
+        history: History = History.update_cache(namespace.root)
+        report: ValidationReport = validate(history.select((history.date >= start) & (history.date <= end)))
+    if len(report):
+        print(report)
+    print(f"Validated {len(report.run_ids)} runs, {int((~report.is_valid()).sum())} with implausible values.")
+
+
+def command_anomalies(namespace: argparse.Namespace) -> None:
+    """
+    Print the runs in a date range whose heart rate, cadence or energy is far off the runs at a similar pace before.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from anomalies import AnomalyDetector
+    from history import History
+    (start, end) = _parse_date_range(namespace)
+    history: History = History.update_cache(namespace.root)
+    dates: dict[str, int] = dict(zip(history.run_ids, history.date.tolist()))
+    for (run_id, name, value, median, score) in AnomalyDetector().scan(history):
+        if start <= dates[run_id] <= end:
+            print(f"{run_id}: {name} {value:.1f}, usually {median:.1f} (score {score:+.1f})")
+
+
+def command_export(namespace: argparse.Namespace) -> None:
+    """
+    Export the runs in a date range to one newline-delimited json, Parquet or Arrow file.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from diary import get_run_id_from_file
+    from ndjson import export_ndjson, is_ndjson
+    from run import Run
+    file_locations: list[str] = _select_files(namespace)
+    if is_ndjson(namespace.file):
+        export_ndjson((Run.import_from_file(file_location, lazy=True) for file_location in file_locations),
+                      namespace.file)
+        print(f"Exported {len(file_locations)} runs to '{namespace.file}'.")
+        return
+    from columnar import export_to_file
+    export_to_file((Run.import_from_file(file_location) for file_location in file_locations), namespace.file,
+                   [get_run_id_from_file(file_location) for file_location in file_locations])
+    print(f"Exported {len(file_locations)} runs to '{namespace.file}'.")
+
+
+def command_migrate(namespace: argparse.Namespace) -> None:
+    """
+    Rewrite the json files of all runs in the current schema version.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from schema import migrate_folder
+    number_of_files: int = migrate_folder(namespace.root)
+    print(f"Migrated {number_of_files} files.")
+
+
+def command_watch(namespace: argparse.Namespace) -> None:
+    """
+    Watch a folder and ingest every run file dropped into it.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from watch import Watcher
+    watcher: Watcher = Watcher(namespace.folder, namespace.root, namespace.interval, namespace.workers,
+                               not namespace.no_pdf)
+    print(f"Watching '{namespace.folder}'. Press Ctrl+C to stop.")
+    watcher.run_forever(once=namespace.once)
+
+
+def command_serve(namespace: argparse.Namespace) -> None:
+    """
+    Serve the runs and statistics of the diary over http.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    import asyncio
+    from server import serve
+    try:
+        asyncio.run(serve(namespace.root, namespace.host, namespace.port))
+    except KeyboardInterrupt:
+        pass
+
+
+def command_search(namespace: argparse.Namespace) -> None:
+    """
+    Print the runs whose notes, location, training or effect match a query.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    from date import Date
+    from search import SearchIndex, get_search_location
+    index: SearchIndex = SearchIndex.import_from_file(get_search_location(namespace.root))
+    if namespace.rebuild or not index.is_current(namespace.root):
+        index: SearchIndex = SearchIndex.import_from_folder(namespace.root)
+    for run_id in index.search(' '.join(namespace.query)):
+        print(f"{Date.from_ordinal(index.dates[run_id])}  {run_id}")
+
+
+def command_route(namespace: argparse.Namespace) -> None:
+    """
+    Print all runs on the course of a route or of a run, fastest first.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+    """
+    import numpy as np
+    from date import Date
+    from duration import Duration
+    from history import History
+    if namespace.rebuild:
+        from routes import RouteIndex
+        RouteIndex.import_from_folder(namespace.root)
+    history: History = History.update_cache(namespace.root)
+    routes: list[str] = history.get_strings('route')
+    route: str = namespace.route
+    if route in history.run_ids:
+        route: str = routes[history.run_ids.index(route)]
+    if not route:
+        print(f"Run '{namespace.route}' has no route.")
+        return
+    on_route: History = history.select(np.array([run_route == route for run_route in routes], dtype=bool))
+    pace: np.ndarray = on_route.pace()
+    print(f"Route {route}: {len(on_route)} runs")
+    for index in np.argsort(pace, kind='stable').tolist():
+        pace_string: str = '-'
+        if np.isfinite(pace[index]):
+            pace_string: str = Duration.from_seconds(int(pace[index])).__str__(short=True)
+        print(f"{Date.from_ordinal(int(on_route.date[index]))}  {on_route.run_ids[index]}  "
+              f"{on_route.meters[index] / 1000:.2f} km  {pace_string} min/km")
+
+
+def command_bench(namespace: argparse.Namespace) -> None:
+    """
+    Run the benchmark suite.
+
+    Args:
+        namespace (argparse.Namespace): The parsed arguments.
+
+    Raises:
+        SystemExit: If the benchmark found a regression.
+    """
+    from benchmark import main as benchmark_main
+    exit_code: int = benchmark_main(namespace.arguments)
+    if exit_code:
+        raise SystemExit(exit_code)
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line interface.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog='diary',
+        description="Runner's diary. Several commands can be chained with '+' to run them in one process.")
+    parser.add_argument('--root', default='./LaTeX/', help="The folder of the diary.")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('add', help="Input a run interactively.").set_defaults(function=command_add)
+    parser_import: argparse.ArgumentParser = subparsers.add_parser('import', help="Import runs from files.")
+    parser_import.add_argument('files', nargs='+', help="The files to import.")
+    parser_import.add_argument('--duplicates', action='store_true', help="Also import runs that duplicate a run.")
+    parser_import.set_defaults(function=command_import)
+    for (name, function, help_text) in [('build', command_build, "Export runs to pdf files."),
+                                        ('book', command_book, "Export runs to one pdf file."),
+                                        ('html', command_html, "Export runs to html files."),
+                                        ('stats', command_stats, "Print statistics and predictions."),
+                                        ('query', command_query, "Print runs."),
+                                        ('validate', command_validate, "Print implausible values of runs."),
+                                        ('anomalies', command_anomalies, "Print anomalous runs."),
+                                        ('export', command_export, "Export runs to one file.")]:
+        subparser: argparse.ArgumentParser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument('--from', dest='start', help="The first date [dd.mm.yyyy].")
+        subparser.add_argument('--to', dest='end', help="The last date [dd.mm.yyyy].")
+        subparser.set_defaults(function=function)
+        if name == 'query':
+            subparser.add_argument('--training', help="Only print runs of this training.")
+        if name == 'validate':
+            subparser.add_argument('files', nargs='*', help="The files to validate instead of the diary.")
+        if name == 'build':
+            subparser.add_argument('--builtin', action='store_true',
+                                   help="Use the built-in pdf writer instead of pdflatex.")
+        if name == 'book':
+            subparser.add_argument('file', help="The pdf file.")
+        if name == 'export':
+            subparser.add_argument('file', help="The file, '.ndjson' or '.ndjson.gz' for newline-delimited json, "
+                                                   "'.parquet' for Parquet, else Arrow IPC.")
+    subparsers.add_parser('migrate', help="Rewrite all runs in the current json schema.").set_defaults(
+        function=command_migrate)
+    parser_watch: argparse.ArgumentParser = subparsers.add_parser('watch', help="Ingest files dropped into a folder.")
+    parser_watch.add_argument('folder', help="The folder to watch for json, csv, gpx and ndjson files.")
+    parser_watch.add_argument('--interval', type=float, default=2.0, help="The seconds between two scans.")
+    parser_watch.add_argument('--workers', type=int, default=2, help="The number of workers rendering pdf files.")
+    parser_watch.add_argument('--no-pdf', action='store_true', help="Do not render pdf files.")
+    parser_watch.add_argument('--once', action='store_true', help="Ingest the present files and stop.")
+    parser_watch.set_defaults(function=command_watch)
+    parser_serve: argparse.ArgumentParser = subparsers.add_parser('serve', help="Serve the diary over http.")
+    parser_serve.add_argument('--host', default='127.0.0.1', help="The address to listen on.")
+    parser_serve.add_argument('--port', type=int, default=8080, help="The port to listen on.")
+    parser_serve.set_defaults(function=command_serve)
+    parser_search: argparse.ArgumentParser = subparsers.add_parser('search', help="Search the text of runs.")
+    parser_search.add_argument('query', nargs='*', help="Words that must all match, 'OR' between alternatives, "
+                                                        "'field:word' for one field and 'word*' for prefixes.")
+    parser_search.add_argument('--rebuild', action='store_true', help="Rebuild the index from all runs first.")
+    parser_search.set_defaults(function=command_search)
+    parser_route: argparse.ArgumentParser = subparsers.add_parser('route', help="Print the runs of a course.")
+    parser_route.add_argument('route', help="The route, e.g. 'R1', or a run on it, e.g. '24.05.01 Run'.")
+    parser_route.add_argument('--rebuild', action='store_true', help="Match the routes of all runs anew first.")
+    parser_route.set_defaults(function=command_route)
+    parser_bench: argparse.ArgumentParser = subparsers.add_parser('bench', help="Run the benchmark suite.")
+    parser_bench.add_argument('arguments', nargs=argparse.REMAINDER, help="The arguments of the benchmark.")
+    parser_bench.set_defaults(function=command_bench)
+    return parser
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """
+    Run one or several chained commands of the command line interface. Without a command, a run is added.
+
+    Args:
+        arguments (list[str] | None, optional): The command line arguments. Defaults to None, which uses sys.argv.
+    """
+    if arguments is None:
+        arguments: list[str] = sys.argv[1:]
+    parser: argparse.ArgumentParser = _get_parser()
+    commands: list[list[str]] = [[]]
+    for argument in arguments:
+        if argument == '+':
+            commands.append([])
+        else:
+            commands[-1].append(argument)
+    options: list[str] = []
+    for command in commands:
+        namespace: argparse.Namespace = parser.parse_args(options + command)
+        if namespace.command is None:
+            namespace: argparse.Namespace = parser.parse_args(options + command + ['add'])
+        options: list[str] = ['--root', namespace.root]
+        namespace.function(namespace)
+
+
+if __name__ == '__main__':
+    main()
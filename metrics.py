@@ -0,0 +1,280 @@
+from typing import Any, Callable, Iterable, TYPE_CHECKING
+
+from constants import _get_grade_adjustment, _get_temperature_adjustment
+from duration import Duration
+from speed import Speed
+
+if TYPE_CHECKING:
+    from run import Run
+
+_METRICS: dict[str, Callable[['Run'], Any]] = {}
+
+
+def register_metric(name: str) -> Callable[[Callable[['Run'], Any]], Callable[['Run'], Any]]:
+    """
+    Create a decorator that registers a function as derived metric of a run.
+
+    Args:
+        name (str): The name of the metric.
+
+    Returns:
+        Callable[[Callable[[Run], Any]], Callable[[Run], Any]]: The decorator.
+    """
+    def decorator(function: Callable[['Run'], Any]) -> Callable[['Run'], Any]:
+        _METRICS[name] = function
+        return function
+    return decorator
+
+
+def get_metric_names() -> list[str]:
+    """
+    Get the names of all registered metrics.
+
+    Returns:
+        list[str]: The names of the metrics.
+    """
+    names: list[str] = list(_METRICS)
+    return names
+
+
+def get_metric(run: 'Run', name: str) -> Any:
+    """
+    Get a derived metric of a run, computing it only once.
+
+    The result is cached on the run and the cache is cleared whenever a field of the run is set.
+
+    Args:
+        run (Run): The run.
+        name (str): The name of the metric.
+
+    Returns:
+        Any: The value of the metric.
+
+    Raises:
+        KeyError: If no metric with the name is registered.
+    """
+    cache: dict[str, Any] | None = run._metrics
+    if cache is None:
+        cache: dict[str, Any] = {}
+        object.__setattr__(run, '_metrics', cache)
+    elif name in cache:
+        return cache[name]
+    if name not in _METRICS:
+        raise KeyError(f"Metric '{name}' is not registered. Use one of {get_metric_names()}.")
+    value: Any = _METRICS[name](run)
+    cache[name] = value
+    return value
+
+
+def get_metrics(runs: Iterable['Run'], name: str) -> list[Any]:
+    """
+    Get a derived metric for every run of a collection.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        name (str): The name of the metric.
+
+    Returns:
+        list[Any]: The value of the metric for every run.
+    """
+    values: list[Any] = [get_metric(run, name) for run in runs]
+    return values
+
+
+@register_metric('speed')
+def _speed(run: 'Run') -> Speed:
+    """
+    Calculate the Speed of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        Speed: The speed of the run.
+    """
+    speed: Speed = Speed(run.distance, run.duration)
+    return speed
+
+
+@register_metric('pace')
+def _pace(run: 'Run') -> Duration:
+    """
+    Calculate the pace of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        Duration: The pace per kilometer.
+    """
+    pace: Duration = get_metric(run, 'speed').to_pace()
+    return pace
+
+
+@register_metric('num_of_steps')
+def _num_of_steps(run: 'Run') -> float | None:
+    """
+    Calculate the number of steps of a run from its cadence and duration.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The number of steps, or None if the cadence is not available.
+    """
+    if run.cadence.integer is None:
+        return None
+    num_of_steps: float = run.cadence * run.duration.to_minutes()
+    return num_of_steps
+
+
+@register_metric('total_steps')
+def _total_steps(run: 'Run') -> int | None:
+    """
+    Calculate the whole number of steps of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        int | None: The number of steps, or None if the cadence is not available.
+    """
+    num_of_steps: float | None = get_metric(run, 'num_of_steps')
+    if num_of_steps is None:
+        return None
+    return int(num_of_steps)
+
+
+@register_metric('step_length')
+def _step_length(run: 'Run') -> float | None:
+    """
+    Calculate the average step length of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The step length in meters, or None if the cadence is not available.
+    """
+    num_of_steps: float | None = get_metric(run, 'num_of_steps')
+    if not num_of_steps:
+        return None
+    meters_per_step: float = run.distance.to_meters() / num_of_steps
+    return meters_per_step
+
+
+@register_metric('num_of_heartbeats')
+def _num_of_heartbeats(run: 'Run') -> float | None:
+    """
+    Calculate the number of heartbeats of a run from its average heart rate and duration.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The number of heartbeats, or None if the heart rate is not available.
+    """
+    if run.avg_heartbeats_per_minute.integer is None:
+        return None
+    num_of_heartbeats: float = run.avg_heartbeats_per_minute * run.duration.to_minutes()
+    return num_of_heartbeats
+
+
+@register_metric('heartbeats_per_kilometer')
+def _heartbeats_per_kilometer(run: 'Run') -> float | None:
+    """
+    Calculate the number of heartbeats per kilometer of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The heartbeats per kilometer, or None if the heart rate or distance is not available.
+    """
+    num_of_heartbeats: float | None = get_metric(run, 'num_of_heartbeats')
+    if num_of_heartbeats is None or not run.distance.to_meters():
+        return None
+    heartbeats_per_kilometer: float = num_of_heartbeats / run.distance.to_kilometers()
+    return heartbeats_per_kilometer
+
+
+@register_metric('kcal_per_kilometer')
+def _kcal_per_kilometer(run: 'Run') -> float | None:
+    """
+    Calculate the energy per kilometer of a run.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The kilocalories per kilometer, or None if the energy or distance is not available.
+    """
+    if run.energy.kcal is None or not run.distance.to_meters():
+        return None
+    kcal_per_kilometer: float = run.energy.to_kilocalories() / run.distance.to_kilometers()
+    return kcal_per_kilometer
+
+
+@register_metric('flat_meters')
+def _flat_meters(run: 'Run') -> float | None:
+    """
+    Calculate the distance on flat ground that costs as much energy as a run.
+
+    The elevation series of the trackpoints is used if present, else the ascent and descent of the whole run. Both
+    have to be known, an unknown descent is not taken as 0 m.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        float | None: The flat distance in meters, or None if the distance is not available, or neither the elevation
+        series nor both the ascent and descent are.
+    """
+    if not run.distance.to_meters():
+        return None
+    if run.trackpoints is not None and run.trackpoints.elevation is not None:
+        return run.trackpoints.flat_distance(run.distance.to_meters())
+    if run.ascent.to_meters() is None or run.descent.to_meters() is None:
+        return None
+    grade_adjustment: dict[str, float] = _get_grade_adjustment()
+    flat_meters: float = (run.distance.to_meters()
+                          + grade_adjustment['ascent'] * run.ascent.to_meters()
+                          - grade_adjustment['descent'] * run.descent.to_meters())
+    return flat_meters
+
+
+@register_metric('grade_adjusted_pace')
+def _grade_adjusted_pace(run: 'Run') -> Duration | None:
+    """
+    Calculate the pace a run would have had on flat ground with the same effort.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        Duration | None: The pace per kilometer, or None if the distance or the elevation is not available.
+    """
+    flat_meters: float | None = get_metric(run, 'flat_meters')
+    if not flat_meters or flat_meters < 0:
+        return None
+    pace: Duration = Duration.from_minutes(run.duration.to_minutes() / (flat_meters / 1000))
+    return pace
+
+
+@register_metric('temperature_adjusted_pace')
+def _temperature_adjusted_pace(run: 'Run') -> Duration | None:
+    """
+    Calculate the pace a run would have had at a mild temperature with the same effort.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        Duration | None: The pace per kilometer, or None if the distance or the temperature is not available.
+    """
+    if run.avg_temperature.integer is None or not run.distance.to_meters():
+        return None
+    (temperature, slowdown) = _get_temperature_adjustment()
+    factor: float = 1 + slowdown * max(run.avg_temperature.integer - temperature, 0)
+    pace: Duration = Duration.from_minutes(run.duration.to_minutes() / run.distance.to_kilometers() / factor)
+    return pace
@@ -0,0 +1,113 @@
+import gzip
+from typing import IO, Any, Iterable, Iterator
+
+from run import Run, LazyRun
+from schema import loads, dumps
+
+
+def _is_compressed(file_location: str, compress: bool | None) -> bool:
+    """
+    Check whether a newline-delimited JSON file is gzip compressed.
+
+    Args:
+        file_location (str): The location of the file.
+        compress (bool | None): True or False to decide explicitly, None to decide by the ending '.gz'.
+
+    Returns:
+        bool: True if the file is gzip compressed.
+    """
+    if compress is None:
+        return file_location.endswith('.gz')
+    return compress
+
+
+def _open(file_location: str, mode: str, compress: bool | None) -> IO[str]:
+    """
+    Open a newline-delimited JSON file as text, with gzip if it is compressed.
+
+    Args:
+        file_location (str): The location of the file.
+        mode (str): Either 'r' or 'w'.
+        compress (bool | None): True or False to decide explicitly, None to decide by the ending '.gz'.
+
+    Returns:
+        IO[str]: The opened file.
+    """
+    if _is_compressed(file_location, compress):
+        return gzip.open(file_location, mode + 't', encoding='utf-8', compresslevel=6)
+    return open(file_location, mode, encoding='utf-8')
+
+
+def is_ndjson(file_location: str) -> bool:
+    """
+    Check whether a file is a newline-delimited JSON file by its ending.
+
+    Args:
+        file_location (str): The location of the file.
+
+    Returns:
+        bool: True if the file ends with '.ndjson' or '.ndjson.gz'.
+    """
+    return file_location.endswith('.ndjson') or file_location.endswith('.ndjson.gz')
+
+
+def export_ndjson(runs: Iterable[Run], file_location: str, compress: bool | None = None,
+                  batch_size: int = 1000) -> int:
+    """
+    Write runs to one newline-delimited JSON file, one Run.__dict__ per line.
+
+    The runs are consumed one after another and written in batches, so a generator of runs is exported in constant
+    memory and with few write calls.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        file_location (str): The location of the file.
+        compress (bool | None, optional): If True, the file is gzip compressed. Defaults to None, which compresses
+        files ending with '.gz'.
+        batch_size (int, optional): The number of lines per write call. Defaults to 1000.
+
+    Returns:
+        int: The number of exported runs.
+    """
+    number_of_runs: int = 0
+    lines: list[str] = []
+    with _open(file_location, 'w', compress) as file:
+        for run in runs:
+            lines.append(dumps(run.__dict__()) + '\n')
+            if len(lines) >= batch_size:
+                file.writelines(lines)
+                number_of_runs += len(lines)
+                lines.clear()
+        file.writelines(lines)
+        number_of_runs += len(lines)
+    return number_of_runs
+
+
+def import_ndjson(file_location: str, compress: bool | None = None, lazy: bool = False) -> Iterator[Run]:
+    """
+    Read runs from a newline-delimited JSON file one after another.
+
+    Only one line is held in memory at a time. Empty lines are skipped.
+
+    Args:
+        file_location (str): The location of the file.
+        compress (bool | None, optional): If True, the file is read as gzip compressed. Defaults to None, which
+        decompresses files ending with '.gz'.
+        lazy (bool, optional): If True, LazyRun objects are returned, which parse every field only on first access.
+        Defaults to False.
+
+    Yields:
+        Run: The runs in the order of the file.
+
+    Raises:
+        ValueError: If a line is not valid JSON.
+    """
+    with _open(file_location, 'r', compress) as file:
+        for (number, line) in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                data: dict[str, Any] = loads(line)
+            except ValueError as error:
+                raise ValueError(f"Line {number} of '{file_location}' is not valid JSON: {error}.") from error
+            yield LazyRun(data) if lazy else Run.from_dict(data)
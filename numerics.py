@@ -1,3 +1,5 @@
+from profiling import timed
+
 
 class Integer:
     def __init__(self, integer: int | None) -> None:
@@ -49,6 +51,7 @@ class Integer:
         return self.integer * other
 
     @staticmethod
+    @timed('Integer.from_string')
     def from_string(string: str) -> 'Integer':
         """
         Convert a string to an Integer object.
@@ -118,6 +121,7 @@ class Floating:
         return self.floating * other
 
     @staticmethod
+    @timed('Floating.from_string')
     def from_string(string: str) -> 'Floating':
         """
         Convert a string to a Floating object.
@@ -0,0 +1,223 @@
+import os
+import zlib
+from typing import BinaryIO
+
+from constants import _get_page_size, _get_page_margins
+from diary import get_run_files, get_run_id_from_file
+from profiling import timed
+from records import get_records_location
+from report import get_rows, get_split_rows, get_records, format_value
+from run import Run
+
+
+class PdfWriter:
+    """
+    A class to write a pdf file page by page with the standard Helvetica fonts, without any TeX installation.
+
+    Every page is written to the file as soon as it is added, and only the byte offsets of the objects are kept, so a
+    diary of any length is written in constant memory. The page tree, the catalog and the cross-reference table are
+    written on close.
+
+    Attributes:
+        file (BinaryIO): The file the pdf is written to.
+        compress (bool): Whether the page contents are compressed.
+        offsets (dict[int, int]): The byte offset of every written object.
+        pages (list[int]): The object numbers of the written pages.
+        position (int): The number of bytes written so far.
+    """
+
+    def __init__(self, file: BinaryIO, compress: bool = True) -> None:
+        """
+        Initialize the PdfWriter object and write the header and the fonts.
+
+        Args:
+            file (BinaryIO): The file opened for binary writing.
+            compress (bool, optional): If True, the page contents are compressed. Defaults to True.
+        """
+        self.file: BinaryIO = file
+        self.compress: bool = compress
+        self.offsets: dict[int, int] = {}
+        self.pages: list[int] = []
+        self.position: int = 0
+        self._next_object: int = 5
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._write_object(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        self._write_object(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold '
+                              b'/Encoding /WinAnsiEncoding >>')
+
+    def _write(self, data: bytes) -> None:
+        """
+        Write bytes to the file and advance the position.
+
+        Args:
+            data (bytes): The bytes.
+        """
+        self.file.write(data)
+        self.position += len(data)
+
+    def _write_object(self, number: int, data: bytes) -> None:
+        """
+        Write an indirect object and remember its offset.
+
+        Args:
+            number (int): The object number.
+            data (bytes): The body of the object.
+        """
+        self.offsets[number] = self.position
+        self._write(b'%d 0 obj\n' % number + data + b'\nendobj\n')
+
+    def add_page(self, content: bytes) -> None:
+        """
+        Write a page with a content stream.
+
+        Args:
+            content (bytes): The content stream of the page, e.g. made with get_text.
+        """
+        (width, height) = _get_page_size()
+        content_number: int = self._next_object
+        page_number: int = self._next_object + 1
+        self._next_object += 2
+        if self.compress:
+            content: bytes = zlib.compress(content)
+            stream_header: bytes = b'<< /Length %d /Filter /FlateDecode >>' % len(content)
+        else:
+            stream_header: bytes = b'<< /Length %d >>' % len(content)
+        self._write_object(content_number, stream_header + b'\nstream\n' + content + b'\nendstream')
+        self._write_object(page_number, (b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+                                         b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+                                         % (width, height, content_number)))
+        self.pages.append(page_number)
+
+    def close(self) -> None:
+        """
+        Write the page tree, the catalog and the cross-reference table. The file itself is not closed.
+        """
+        kids: bytes = b' '.join(b'%d 0 R' % page for page in self.pages)
+        self._write_object(2, b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % len(self.pages))
+        self._write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref_position: int = self.position
+        lines: list[bytes] = [b'xref\n0 %d\n' % self._next_object, b'0000000000 65535 f \n']
+        for number in range(1, self._next_object):
+            lines.append(b'%010d 00000 n \n' % self.offsets[number])
+        self._write(b''.join(lines))
+        self._write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                    % (self._next_object, xref_position))
+
+
+def get_text(x: float, y: float, string: str, size: float = 10, bold: bool = False) -> bytes:
+    """
+    Generate the content stream operators that draw a line of text.
+
+    Args:
+        x (float): The left position in points.
+        y (float): The position of the baseline in points from the bottom of the page.
+        string (str): The text. Characters outside of the Windows-1252 encoding are replaced by '?'.
+        size (float, optional): The font size in points. Defaults to 10.
+        bold (bool, optional): If True, Helvetica-Bold is used instead of Helvetica. Defaults to False.
+
+    Returns:
+        bytes: The operators.
+    """
+    encoded: bytes = string.encode('cp1252', errors='replace')
+    encoded: bytes = encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    text: bytes = b'BT /F%d %.1f Tf %.2f %.2f Td (' % (2 if bold else 1, size, x, y) + encoded + b') Tj ET\n'
+    return text
+
+
+def get_run_pages(run: Run, run_id: str | None = None, records_location: str | None = None) -> list[bytes]:
+    """
+    Lay out the sheet of a run like latex._get_text, continuing on further pages if the splits do not fit.
+
+    Args:
+        run (Run): The run.
+        run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        './LaTeX/records.jsonl'.
+
+    Returns:
+        list[bytes]: The content stream of every page.
+    """
+    (width, height) = _get_page_size()
+    (top, bottom, side) = _get_page_margins()
+    table_width: float = (width - 2 * side) / 2
+    table_left: float = side + table_width / 2
+    row_height: float = 20
+    pages: list[bytes] = []
+    content: bytes = get_text(side, height - top - 14, f'Run of {run.date}', size=14, bold=True)
+    y: float = height - top - 14 - 28
+    records: list[str] = get_records(run, run_id, records_location)
+    if records:
+        content += (get_text(side, y, 'Personal record:', bold=True)
+                    + get_text(side + 85, y, ', '.join(records)))
+        y -= row_height
+    rows: list[tuple[str, ...]] = [(label, format_value(value, unit)) for (label, value, unit) in get_rows(run)]
+    split_rows: list[tuple[str, ...]] = get_split_rows(run)
+    header: tuple[str, ...] = ('Split', 'Duration', 'Pace')
+    if split_rows:
+        rows.append(())
+        rows.append(header)
+        rows.extend((number, duration, f'{pace} min/km') for (number, duration, pace) in split_rows)
+    for row in rows:
+        kept_rows: int = 2 if row == header else 1
+        if y - row_height * (kept_rows - 1) < bottom:
+            pages.append(content)
+            content: bytes = b''
+            y: float = height - top - 14
+            if not row:
+                continue
+        for (column, string) in enumerate(row):
+            if len(row) == 3:
+                content += get_text(table_left + table_width / 2 * column, y, string)
+            else:
+                content += get_text(side + 20 + 135 * column, y, string)
+        y -= row_height
+    pages.append(content)
+    return pages
+
+
+@timed('pdf.safe_to_file')
+def safe_to_file(run: Run, file_location: str, records_location: str | None = None) -> None:
+    """
+    Save the sheet of a run to a pdf file with the built-in writer.
+
+    Args:
+        run (Run): The run.
+        file_location (str): The location of the pdf file.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        the journal of the diary two folders above the file.
+    """
+    if records_location is None:
+        records_location: str = get_records_location(os.path.dirname(os.path.dirname(file_location)))
+    run_id: str = os.path.splitext(os.path.basename(file_location))[0]
+    with open(file_location, 'wb') as file:
+        writer: PdfWriter = PdfWriter(file)
+        for page in get_run_pages(run, run_id, records_location):
+            writer.add_page(page)
+        writer.close()
+
+
+@timed('pdf.export_diary')
+def export_diary(file_location: str, root: str = './LaTeX/', file_locations: list[str] | None = None) -> int:
+    """
+    Save the sheets of many runs to one pdf file, streaming one run after another.
+
+    Args:
+        file_location (str): The location of the pdf file.
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        file_locations (list[str] | None, optional): The json files of the runs. Defaults to None, which uses all runs
+        of the diary.
+
+    Returns:
+        int: The number of written pages.
+    """
+    if file_locations is None:
+        file_locations: list[str] = get_run_files(root)
+    records_location: str = get_records_location(root)
+    with open(file_location, 'wb') as file:
+        writer: PdfWriter = PdfWriter(file)
+        for run_location in file_locations:
+            run: Run = Run.import_from_file(run_location)
+            for page in get_run_pages(run, get_run_id_from_file(run_location), records_location):
+                writer.add_page(page)
+        writer.close()
+    return len(writer.pages)
@@ -0,0 +1,256 @@
+from collections import deque
+
+import numpy as np
+
+from constants import _get_race_distances, _get_heart_rate_range
+from duration import Duration
+from history import History
+from run import Run
+
+
+class RacePredictor:
+    """
+    A class to predict race times from recent runs with the Riegel formula.
+
+    The Riegel formula predicts the time t for a distance d from a run over distance d_0 in time t_0 as
+    t = t_0 * (d / d_0) ** exponent = (t_0 / d_0 ** exponent) * d ** exponent. So the best recent run is the one
+    with the lowest score t_0 / d_0 ** exponent for every distance. The lowest score of the window is kept in a
+    monotonic queue, so adding a run and predicting take constant time.
+
+    Attributes:
+        days (int): The number of days a run stays in the window.
+        exponent (float): The exponent of the Riegel formula.
+        minimum_meters (int): The minimal distance of a run to be used.
+        scores (deque[tuple[int, float]]): The dates and increasing scores of the candidates in the window.
+    """
+
+    def __init__(self, days: int = 90, exponent: float = 1.06, minimum_meters: int = 3000) -> None:
+        """
+        Initialize an empty RacePredictor object.
+
+        Args:
+            days (int, optional): The number of days a run stays in the window. Defaults to 90.
+            exponent (float, optional): The exponent of the Riegel formula. Defaults to 1.06.
+            minimum_meters (int, optional): The minimal distance of a run to be used. Defaults to 3000.
+        """
+        self.days: int = days
+        self.exponent: float = exponent
+        self.minimum_meters: int = minimum_meters
+        self.scores: deque[tuple[int, float]] = deque()
+
+    def _add(self, ordinal: int, meters: float, seconds: float) -> None:
+        """
+        Add the values of a run. Runs have to be added in the order of their dates.
+
+        Args:
+            ordinal (int): The date of the run as ordinal.
+            meters (float): The distance in meters.
+            seconds (float): The duration in seconds.
+        """
+        if not meters >= self.minimum_meters or not seconds > 0:
+            return
+        score: float = seconds / meters ** self.exponent
+        while self.scores and self.scores[-1][1] >= score:
+            self.scores.pop()
+        self.scores.append((ordinal, score))
+        while self.scores[0][0] <= ordinal - self.days:
+            self.scores.popleft()
+
+    def add(self, run: Run) -> None:
+        """
+        Add a run. Runs have to be added in the order of their dates.
+
+        Args:
+            run (Run): The run to add.
+        """
+        if run.distance.to_meters() is None:
+            return
+        self._add(run.date.to_ordinal(), run.distance.to_meters(), run.duration.to_seconds())
+
+    def fit(self, history: History) -> 'RacePredictor':
+        """
+        Fit the predictor to the last days of a history.
+
+        Args:
+            history (History): The runs sorted by date.
+
+        Returns:
+            RacePredictor: The fitted predictor itself.
+        """
+        self.scores.clear()
+        if not len(history):
+            return self
+        start: int = int(np.searchsorted(history.date, history.date[-1] - self.days, side='right'))
+        recent: History = history.select(slice(start, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores: np.ndarray = recent.seconds / recent.meters ** self.exponent
+        valid: np.ndarray = (recent.meters >= self.minimum_meters) & (recent.seconds > 0) & np.isfinite(scores)
+        dates: np.ndarray = recent.date[valid]
+        scores: np.ndarray = scores[valid]
+        if not len(scores):
+            return self
+        suffix_minima: np.ndarray = np.minimum.accumulate(scores[::-1])[::-1]
+        is_candidate: np.ndarray = np.append(scores[:-1] < suffix_minima[1:], True)
+        self.scores.extend(zip(dates[is_candidate].tolist(), scores[is_candidate].tolist()))
+        return self
+
+    def predict(self, meters: int) -> Duration | None:
+        """
+        Predict the time for a distance.
+
+        Args:
+            meters (int): The distance in meters.
+
+        Returns:
+            Duration | None: The predicted time, or None if there is no run in the window.
+        """
+        if not self.scores:
+            return None
+        seconds: float = self.scores[0][1] * meters ** self.exponent
+        duration: Duration = Duration.from_seconds(int(round(seconds)))
+        return duration
+
+    def predict_races(self) -> dict[str, Duration | None]:
+        """
+        Predict the times for 5 km, 10 km, half marathon and marathon.
+
+        Returns:
+            dict[str, Duration | None]: The predicted times per race.
+        """
+        predictions: dict[str, Duration | None] = {race: self.predict(meters)
+                                                   for (race, meters) in _get_race_distances().items()}
+        return predictions
+
+
+class FitnessTrend:
+    """
+    A class to represent the fitness and fatigue of an athlete as exponentially weighted moving averages of the daily
+    training load.
+
+    Attributes:
+        fitness_days (int): The time constant of the fitness in days.
+        fatigue_days (int): The time constant of the fatigue in days.
+        day (int | None): The date of the last added run as ordinal.
+        fitness (float): The fitness at the end of the last day.
+        fatigue (float): The fatigue at the end of the last day.
+    """
+
+    def __init__(self, fitness_days: int = 42, fatigue_days: int = 7) -> None:
+        """
+        Initialize a FitnessTrend object without any training.
+
+        Args:
+            fitness_days (int, optional): The time constant of the fitness in days. Defaults to 42.
+            fatigue_days (int, optional): The time constant of the fatigue in days. Defaults to 7.
+        """
+        self.fitness_days: int = fitness_days
+        self.fatigue_days: int = fatigue_days
+        self.day: int | None = None
+        self.fitness: float = 0.0
+        self.fatigue: float = 0.0
+
+    def _add(self, ordinal: int, load: float) -> None:
+        """
+        Add the training load of a run. Runs have to be added in the order of their dates.
+
+        Args:
+            ordinal (int): The date of the run as ordinal.
+            load (float): The training load of the run.
+        """
+        fitness_alpha: float = 1 / self.fitness_days
+        fatigue_alpha: float = 1 / self.fatigue_days
+        if self.day is None or ordinal > self.day:
+            gap: int = 1 if self.day is None else ordinal - self.day
+            self.fitness *= (1 - fitness_alpha) ** gap
+            self.fatigue *= (1 - fatigue_alpha) ** gap
+            self.day = ordinal
+        self.fitness += fitness_alpha * load
+        self.fatigue += fatigue_alpha * load
+
+    def add(self, run: Run) -> None:
+        """
+        Add a run. Runs have to be added in the order of their dates.
+
+        Args:
+            run (Run): The run to add.
+        """
+        if run.avg_heartbeats_per_minute.integer is None:
+            heartbeats: float = np.nan
+        else:
+            heartbeats: float = run.avg_heartbeats_per_minute.integer
+        load: float = float(get_training_load(np.array([run.duration.to_minutes()]), np.array([heartbeats]))[0])
+        self._add(run.date.to_ordinal(), load)
+
+    def fit(self, history: History) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate the fitness and fatigue for every day of a history and keep the state of the last day.
+
+        Args:
+            history (History): The runs sorted by date.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: The days as ordinals, the fitness and the fatigue at the end of
+            every day.
+        """
+        self.__init__(self.fitness_days, self.fatigue_days)
+        if not len(history):
+            return np.array([], dtype='int32'), np.array([]), np.array([])
+        loads: np.ndarray = get_training_load(history.seconds / 60, history.heartbeats)
+        first_day: int = int(history.date[0])
+        days: np.ndarray = np.arange(first_day, int(history.date[-1]) + 1)
+        daily_loads: list[float] = np.bincount(history.date - first_day, weights=loads, minlength=len(days)).tolist()
+        fitness: np.ndarray = _get_moving_average(daily_loads, 1 / self.fitness_days)
+        fatigue: np.ndarray = _get_moving_average(daily_loads, 1 / self.fatigue_days)
+        self.day = int(days[-1])
+        self.fitness = float(fitness[-1])
+        self.fatigue = float(fatigue[-1])
+        return days, fitness, fatigue
+
+    def form(self) -> float:
+        """
+        Calculate the form as the difference between fitness and fatigue.
+
+        Returns:
+            float: The form at the end of the last day.
+        """
+        form: float = self.fitness - self.fatigue
+        return form
+
+
+def get_training_load(minutes: np.ndarray, heartbeats: np.ndarray) -> np.ndarray:
+    """
+    Calculate the training impulse (TRIMP) of runs from their durations and average heart rates.
+
+    Runs without heart rate are counted with half of the heart rate reserve.
+
+    Args:
+        minutes (np.ndarray): The durations in minutes.
+        heartbeats (np.ndarray): The average heartbeats per minute, NaN if missing.
+
+    Returns:
+        np.ndarray: The training loads.
+    """
+    (resting, maximal) = _get_heart_rate_range()
+    reserve: np.ndarray = np.clip((heartbeats - resting) / (maximal - resting), 0, 1)
+    reserve: np.ndarray = np.where(np.isnan(reserve), 0.5, reserve)
+    loads: np.ndarray = minutes * reserve * 0.64 * np.exp(1.92 * reserve)
+    return loads
+
+
+def _get_moving_average(values: list[float], alpha: float) -> np.ndarray:
+    """
+    Calculate the exponentially weighted moving average of daily values, starting at zero.
+
+    Args:
+        values (list[float]): The values of every day.
+        alpha (float): The weight of a new value.
+
+    Returns:
+        np.ndarray: The moving average at the end of every day.
+    """
+    average: float = 0.0
+    averages: list[float] = []
+    for value in values:
+        average += alpha * (value - average)
+        averages.append(average)
+    return np.array(averages)
@@ -0,0 +1,281 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+_enabled: bool = os.environ.get('DIARY_PROFILE', '') not in ('', '0')
+_stages: dict[str, dict[str, Any]] = {}
+_counters: dict[str, int] = {}
+
+
+def _get_buckets() -> list[float]:
+    """
+    Get the upper bounds of the histogram buckets for stage durations.
+
+    Returns:
+        list[float]: The upper bounds in seconds, from 1 microsecond to 10 seconds.
+    """
+    buckets: list[float] = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0]
+    return buckets
+
+
+def enable() -> None:
+    """
+    Enable the instrumentation. It is also enabled if the environment variable 'DIARY_PROFILE' is set.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    Disable the instrumentation.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Check whether the instrumentation is enabled.
+
+    Returns:
+        bool: True if the instrumentation is enabled.
+    """
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Delete all recorded durations and counters.
+    """
+    _stages.clear()
+    _counters.clear()
+
+
+def record(stage: str, seconds: float) -> None:
+    """
+    Record the duration of a stage.
+
+    Args:
+        stage (str): The name of the stage.
+        seconds (float): The duration in seconds.
+    """
+    statistics: dict[str, Any] | None = _stages.get(stage)
+    if statistics is None:
+        statistics: dict[str, Any] = {'count': 0,
+                                      'seconds': 0.0,
+                                      'min': float('inf'),
+                                      'max': 0.0,
+                                      'buckets': [0] * (len(_get_buckets()) + 1)}
+        _stages[stage] = statistics
+    statistics['count'] += 1
+    statistics['seconds'] += seconds
+    statistics['min'] = min(statistics['min'], seconds)
+    statistics['max'] = max(statistics['max'], seconds)
+    statistics['buckets'][bisect_left(_get_buckets(), seconds)] += 1
+
+
+def count(counter: str, value: int = 1) -> None:
+    """
+    Increase a counter if the instrumentation is enabled.
+
+    Args:
+        counter (str): The name of the counter.
+        value (int, optional): The increase. Defaults to 1.
+    """
+    if _enabled:
+        _counters[counter] = _counters.get(counter, 0) + value
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time the code inside a with statement as a stage if the instrumentation is enabled.
+
+    Args:
+        stage (str): The name of the stage.
+    """
+    if not _enabled:
+        yield
+        return
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """
+    Create a decorator that times every call of a function as a stage if the instrumentation is enabled.
+
+    Args:
+        stage (str): The name of the stage.
+
+    Returns:
+        Callable[[Callable], Callable]: The decorator.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start: float = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def get_report() -> dict[str, Any]:
+    """
+    Get the recorded durations per stage and the counters.
+
+    Returns:
+        dict[str, Any]: The count, total, mean, min, max and histogram of every stage and the counters.
+    """
+    buckets: list[float] = _get_buckets()
+    stages: dict[str, Any] = {}
+    for (stage, statistics) in sorted(_stages.items()):
+        stages[stage] = {'count': statistics['count'],
+                         'seconds': statistics['seconds'],
+                         'mean': statistics['seconds'] / statistics['count'],
+                         'min': statistics['min'],
+                         'max': statistics['max'],
+                         'histogram': {str(bound): number
+                                       for (bound, number) in zip(buckets + ['+Inf'], statistics['buckets'])}}
+    report: dict[str, Any] = {'stages': stages, 'counters': dict(sorted(_counters.items()))}
+    return report
+
+
+def get_prometheus() -> str:
+    """
+    Get the recorded durations per stage and the counters in the Prometheus text format.
+
+    Returns:
+        str: The Prometheus text.
+    """
+    lines: list[str] = ['# TYPE diary_stage_seconds histogram']
+    buckets: list[float] = _get_buckets()
+    for (stage, statistics) in sorted(_stages.items()):
+        cumulative: int = 0
+        for (bound, number) in zip(buckets + ['+Inf'], statistics['buckets']):
+            cumulative += number
+            lines.append(f'diary_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'diary_stage_seconds_sum{{stage="{stage}"}} {statistics["seconds"]}')
+        lines.append(f'diary_stage_seconds_count{{stage="{stage}"}} {statistics["count"]}')
+    lines.append('# TYPE diary_events_total counter')
+    for (counter, value) in sorted(_counters.items()):
+        lines.append(f'diary_events_total{{event="{counter}"}} {value}')
+    string: str = '\n'.join(lines) + '\n'
+    return string
+
+
+def export_report(file_location: str) -> None:
+    """
+    Write the report to a file, in the Prometheus text format if the file ends with '.prom', else as json.
+
+    Args:
+        file_location (str): The location of the file.
+    """
+    if file_location.endswith('.prom'):
+        data: str = get_prometheus()
+    else:
+        data: str = json.dumps(get_report(), indent=2)
+    with open(file_location, 'w') as file:
+        file.write(data)
+
+
+@contextmanager
+def capture(mode: str, file_location: str | None = None) -> Iterator[None]:
+    """
+    Capture a cProfile or tracemalloc profile of the code inside a with statement.
+
+    Args:
+        mode (str): Either 'cprofile' or 'tracemalloc'.
+        file_location (str | None, optional): The file to write the cProfile statistics to. Defaults to None, which
+        prints the top entries instead. The tracemalloc top entries are always printed.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if file_location is None:
+                pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(30)
+            else:
+                profile.dump_stats(file_location)
+    elif mode == 'tracemalloc':
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            (current, peak) = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Current memory: {current / 1024:.1f} KiB, peak memory: {peak / 1024:.1f} KiB", file=sys.stderr)
+            for statistic in snapshot.statistics('lineno')[:30]:
+                print(statistic, file=sys.stderr)
+    else:
+        raise ValueError(f"Mode '{mode}' is not supported. Use 'cprofile' or 'tracemalloc'.")
+
+
+def _export_at_exit() -> None:
+    """
+    Write the report to the file given by the environment variable 'DIARY_PROFILE_REPORT', if it is set.
+    """
+    file_location: str = os.environ.get('DIARY_PROFILE_REPORT', '')
+    if file_location and (_stages or _counters):
+        export_report(file_location)
+
+
+atexit.register(_export_at_exit)
+
+
+def _main() -> None:
+    """
+    Run a python script with the instrumentation, a cProfile profile or a tracemalloc snapshot from the command line.
+    """
+    import argparse
+    import runpy
+    parser = argparse.ArgumentParser(description="Profile a single command.")
+    parser.add_argument('--mode', choices=['timing', 'cprofile', 'tracemalloc'], default='timing',
+                        help="Record stage timings, a cProfile profile or a tracemalloc snapshot.")
+    parser.add_argument('--output', help="The file for the report or the cProfile statistics.")
+    parser.add_argument('script', help="The python script to run.")
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help="The arguments of the script.")
+    namespace = parser.parse_args()
+    sys.argv = [namespace.script] + namespace.arguments
+    if namespace.mode == 'timing':
+        enable()
+        try:
+            runpy.run_path(namespace.script, run_name='__main__')
+        finally:
+            if namespace.output is None:
+                print(json.dumps(get_report(), indent=2), file=sys.stderr)
+            else:
+                export_report(namespace.output)
+    else:
+        with capture(namespace.mode, namespace.output):
+            runpy.run_path(namespace.script, run_name='__main__')
+
+
+if __name__ == '__main__':
+    import profiling
+    profiling._main()
@@ -0,0 +1,259 @@
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from typing import TYPE_CHECKING
+
+from constants import _get_distance_bands, _get_journal_compaction
+from profiling import count
+from utils import get_run_id, get_file_version
+
+if TYPE_CHECKING:
+    from run import Run
+
+
+class PersonalRecords:
+    """
+    A class to represent the personal records of all runs, ranked per category.
+
+    Every category holds a list of (key, run id) pairs sorted so the best run comes first. Lower keys are better, so
+    categories where higher values are better store the negated value. Adding a run finds its position with bisect in
+    O(log n), and inserting it shifts the worse runs of the list in O(n), a single memory move that is far cheaper
+    than rescanning the whole diary. It appends one line to a journal file instead of rewriting it.
+
+    Attributes:
+        file_location (str): The location of the journal file.
+        rankings (dict[str, list[tuple[float, str]]]): The sorted (key, run id) pairs per category.
+        keys (dict[str, dict[str, float]]): The keys per category for every run id.
+    """
+
+    _cache: dict[str, tuple[tuple[int, int], 'PersonalRecords']] = {}
+
+    def __init__(self, file_location: str) -> None:
+        """
+        Initialize an empty PersonalRecords object.
+
+        Args:
+            file_location (str): The location of the journal file.
+        """
+        self.file_location: str = file_location
+        self.rankings: dict[str, list[tuple[float, str]]] = {}
+        self.keys: dict[str, dict[str, float]] = {}
+
+    def _insert(self, run_id: str, keys: dict[str, float]) -> None:
+        """
+        Insert the keys of a run into the rankings, replacing its previous keys.
+
+        Args:
+            run_id (str): The identifier of the run.
+            keys (dict[str, float]): The keys per category.
+        """
+        for (category, key) in self.keys.pop(run_id, {}).items():
+            ranking: list[tuple[float, str]] = self.rankings[category]
+            index: int = bisect_left(ranking, (key, run_id))
+            if index < len(ranking) and ranking[index] == (key, run_id):
+                del ranking[index]
+        for (category, key) in keys.items():
+            insort(self.rankings.setdefault(category, []), (key, run_id))
+        self.keys[run_id] = keys
+
+    def add(self, run: 'Run', run_id: str | None = None) -> list[str]:
+        """
+        Add a run to the rankings and append it to the journal file.
+
+        Args:
+            run (Run): The run to add.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            list[str]: The categories in which the run is a new personal record.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        keys: dict[str, float] = _get_keys(run)
+        self._insert(run_id, keys)
+        folder: str = os.path.dirname(self.file_location)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.file_location, 'a') as file:
+            file.write(json.dumps({'run': run_id, 'keys': keys}) + '\n')
+        PersonalRecords._cache[self.file_location] = (get_file_version(self.file_location), self)
+        return self.get_records(run, run_id)
+
+    def rank(self, run: 'Run', category: str, run_id: str | None = None) -> int | None:
+        """
+        Get the rank of a run in a category.
+
+        Args:
+            run (Run): The run to rank.
+            category (str): The category.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            int | None: The rank starting at 1, or None if the run is not ranked in the category.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        key: float | None = self.keys.get(run_id, {}).get(category)
+        if key is None:
+            return None
+        rank: int = bisect_left(self.rankings[category], (key,)) + 1
+        return rank
+
+    def is_record(self, run: 'Run', category: str, run_id: str | None = None) -> bool:
+        """
+        Check whether a run would be a personal record in a category without adding it.
+
+        Args:
+            run (Run): The run to check.
+            category (str): The category.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            bool: True if no other run in the category is better than the run.
+        """
+        key: float | None = _get_keys(run).get(category)
+        if key is None:
+            return False
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        others: list[tuple[float, str]] = [pair for pair in self.rankings.get(category, [])[:2] if pair[1] != run_id]
+        is_record: bool = not others or key <= others[0][0]
+        return is_record
+
+    def get_records(self, run: 'Run', run_id: str | None = None) -> list[str]:
+        """
+        Get the categories in which a run holds the personal record.
+
+        Args:
+            run (Run): The run to check.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            list[str]: The categories in which the run is the best run.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        records: list[str] = [category for category in self.keys.get(run_id, {})
+                              if self.rankings[category][0][1] == run_id]
+        return records
+
+    def get_best(self, category: str) -> tuple[float, str] | None:
+        """
+        Get the best run of a category.
+
+        Args:
+            category (str): The category.
+
+        Returns:
+            tuple[float, str] | None: The value and the identifier of the best run, or None if the category is empty.
+        """
+        ranking: list[tuple[float, str]] = self.rankings.get(category, [])
+        if not ranking:
+            return None
+        (key, run_id) = ranking[0]
+        value: float = key if category.startswith('Fastest') else -key
+        return value, run_id
+
+    def _compact(self) -> None:
+        """
+        Rewrite the journal file with one line per run, dropping the lines superseded by adding a run again.
+
+        The new file is written next to the old one and then replaces it, so an interrupted rewrite keeps the old file.
+        """
+        with open(self.file_location + '.tmp', 'w') as file:
+            file.writelines(json.dumps({'run': run_id, 'keys': keys}) + '\n' for (run_id, keys) in self.keys.items())
+        os.replace(self.file_location + '.tmp', self.file_location)
+        count('records_compactions')
+
+    @staticmethod
+    def import_from_file(file_location: str | None = None) -> 'PersonalRecords':
+        """
+        Import the personal records from a journal file.
+
+        The records of the last import or add in this process are reused if the size and modification time of the file
+        have not changed since. A file with more than twice as many lines as runs is compacted.
+
+        Args:
+            file_location (str | None, optional): The location of the journal file. Defaults to None, which uses
+            './LaTeX/records.jsonl'.
+
+        Returns:
+            PersonalRecords: The personal records. Empty if the file does not exist.
+        """
+        if file_location is None:
+            file_location: str = get_records_location()
+        if not os.path.exists(file_location):
+            return PersonalRecords(file_location)
+        version: tuple[int, int] = get_file_version(file_location)
+        cached: tuple[tuple[int, int], PersonalRecords] | None = PersonalRecords._cache.get(file_location)
+        if cached is not None and cached[0] == version:
+            count('records_cache_hits')
+            return cached[1]
+        count('records_loads')
+        records: PersonalRecords = PersonalRecords(file_location)
+        number_of_lines: int = 0
+        with open(file_location, 'r') as file:
+            for line in file:
+                data: dict = json.loads(line)
+                records._insert(data['run'], data['keys'])
+                number_of_lines += 1
+        if number_of_lines > _get_journal_compaction() * len(records.keys):
+            records._compact()
+            version: tuple[int, int] = get_file_version(file_location)
+        PersonalRecords._cache[file_location] = (version, records)
+        return records
+
+
+def get_records_location(root: str = './LaTeX/') -> str:
+    """
+    Generate the location of the personal records journal file.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location of the journal file.
+    """
+    string: str = os.path.join(root, 'records.jsonl')
+    return string
+
+
+def _get_band(meters: int) -> str:
+    """
+    Get the name of the pace category of the distance band a distance falls into.
+
+    Args:
+        meters (int): The distance in meters.
+
+    Returns:
+        str: The name of the pace category.
+    """
+    bands: list[int] = _get_distance_bands()
+    index: int = bisect_right(bands, meters) - 1
+    lower: float = bands[index] / 1000
+    if index + 1 == len(bands):
+        return f'Fastest pace over {lower:g} km'
+    upper: float = bands[index + 1] / 1000
+    return f'Fastest pace {lower:g} km to {upper:g} km'
+
+
+def _get_keys(run: 'Run') -> dict[str, float]:
+    """
+    Get the ranking keys of a run per category. Lower keys are better.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        dict[str, float]: The keys per category. Categories without a value are left out.
+    """
+    keys: dict[str, float] = {}
+    meters: int | None = run.distance.to_meters()
+    if meters:
+        keys[_get_band(meters)] = run.speed().to_pace().to_seconds()
+        keys['Longest run'] = -meters
+    if run.ascent.to_meters() is not None:
+        keys['Most ascent'] = -run.ascent.to_meters()
+    if run.avg_power.integer is not None:
+        keys['Highest power'] = -run.avg_power.integer
+    return keys
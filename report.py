@@ -0,0 +1,136 @@
+from duration import Duration
+from metrics import get_metric
+from records import PersonalRecords
+from run import Run
+from utils import to_string
+
+
+def _get_units() -> dict[str, str]:
+    """
+    Get the siunitx macros of the units of the table of a run.
+
+    Returns:
+        dict[str, str]: The plain units mapped to their siunitx macros.
+    """
+    units: dict[str, str] = {'m': r'\meter',
+                             'km/h': r'\kilo\meter\per\hour',
+                             'min/km': r'\minute\per\kilo\meter',
+                             '1/min': r'\per\minute',
+                             'kcal': r'\kilo cal',
+                             '°C': r'\degreeCelsius',
+                             'ml': r'\milli\liter',
+                             'W': r'\watt'}
+    return units
+
+
+def format_value(value: Duration | int | float | str | None,
+                 unit: str = '',
+                 latex: bool = False,
+                 separator: str | None = None) -> str:
+    """
+    Convert a value of the table of a run and its unit to a string with utils.to_string.
+
+    A duration with unit is a pace and shown as 'mm:ss', a duration without unit is shown in hours, minutes and
+    seconds. Missing values keep their unit in LaTeX, like the tables always had, except for missing paces. In plain
+    text missing values are shown without unit.
+
+    Args:
+        value (Duration | int | float | str | None): The value.
+        unit (str, optional): The plain unit, e.g. 'km/h'. Defaults to ''.
+        latex (bool, optional): If True, the string is LaTeX math with siunitx units, else plain text. Defaults to
+        False.
+        separator (str | None, optional): The separator between groups of thousands. Defaults to None, see
+        utils.to_string.
+
+    Returns:
+        str: The value with unit.
+    """
+    if isinstance(value, Duration) and not unit:
+        parts: list[tuple[int, str]] = [(value.hours, 'h'), (value.minutes, 'min'), (value.seconds, 's')]
+        if latex:
+            return '~ '.join(f'{to_string(number)} \\,\\unit{{{macro}}}'
+                             for ((number, _), macro) in zip(parts, [r'\hour', r'\minute', r'\second']))
+        return ' '.join(f'{number} {part_unit}' for (number, part_unit) in parts)
+    if isinstance(value, Duration):
+        value: str = value.__str__(short=True)
+    string: str = to_string(value, latex, separator)
+    if not unit or ((value is None or value == '') and (not latex or unit == 'min/km')):
+        return string
+    if latex:
+        return f'{string} \\,\\unit{{{_get_units()[unit]}}}'
+    return f'{string} {unit}'
+
+
+def get_rows(run: Run) -> list[tuple[str, Duration | int | float | str | None, str]]:
+    """
+    Get the rows of the table of a run, shared by the LaTeX, html and pdf output.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        list[tuple[str, Duration | int | float | str | None, str]]: The label, the value and the plain unit of every
+        row, to be converted with format_value. Text fields are strings without unit.
+    """
+    rows: list[tuple[str, Duration | int | float | str | None, str]] = [
+        ('Distance', run.distance.to_meters(), 'm'),
+        ('Duration', run.duration, ''),
+        ('Speed', run.speed().to_kmh(), 'km/h'),
+        ('Pace', get_metric(run, 'pace'), 'min/km'),
+        ('Grade adjusted pace', get_metric(run, 'grade_adjusted_pace'), 'min/km'),
+        ('Temperature adjusted pace', get_metric(run, 'temperature_adjusted_pace'), 'min/km'),
+        ('Heartbeat', run.avg_heartbeats_per_minute.integer, '1/min'),
+        ('Cadence', run.cadence.integer, '1/min'),
+        ('Energy', run.energy.kcal, 'kcal'),
+        ('Ascent', run.ascent.to_meters(), 'm'),
+        ('Descent', run.descent.to_meters(), 'm'),
+        ('Steps', run.total_steps(), ''),
+        ('Temperature', run.avg_temperature.integer, '°C'),
+        ('Sweat', run.sweat.integer, 'ml'),
+        ('Power', run.avg_power.integer, 'W'),
+        ('Training Effect', run.effect, ''),
+        ('Aerob', run.aerob.floating, ''),
+        ('Anaerob', run.anaerob.floating, ''),
+        ('Training', run.training, ''),
+        ('Location', run.location, ''),
+        ('Notes', run.notes, '')]
+    return rows
+
+
+def get_split_rows(run: Run, split_meters: float = 1000) -> list[tuple[str, str, str]]:
+    """
+    Get the rows of the table of splits of a run, like latex._get_table_splits.
+
+    Args:
+        run (Run): The run.
+        split_meters (float, optional): The length of a split in meters. Defaults to 1000.
+
+    Returns:
+        list[tuple[str, str, str]]: The number, the duration and the pace in min/km of every split. Empty if the run
+        has no trackpoints.
+    """
+    if run.trackpoints is None:
+        return []
+    from splits import get_splits
+    rows: list[tuple[str, str, str]] = [(str(split.number),
+                                         split.duration.__str__(short=True),
+                                         split.speed().to_pace().__str__(short=True))
+                                        for split in get_splits(run.trackpoints, split_meters)]
+    return rows
+
+
+def get_records(run: Run, run_id: str | None = None, records_location: str | None = None) -> list[str]:
+    """
+    Get the categories in which a run holds the personal record, like latex._get_records.
+
+    Args:
+        run (Run): The run.
+        run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        records_location (str | None, optional): The location of the records journal. Defaults to None, which uses
+        './LaTeX/records.jsonl'.
+
+    Returns:
+        list[str]: The categories.
+    """
+    records: list[str] = PersonalRecords.import_from_file(records_location).get_records(run, run_id)
+    return records
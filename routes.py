@@ -0,0 +1,364 @@
+import json
+import os
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from constants import _get_route_hashing, _get_journal_compaction
+from profiling import count
+from utils import get_run_id, get_file_version
+
+if TYPE_CHECKING:
+    from run import Run
+    from trackpoints import Trackpoints
+
+
+class RouteIndex:
+    """
+    A class to group runs on the same course by their GPS tracks.
+
+    Every track is resampled at a fixed spacing and quantized to the cells of a geohash grid. Two runs on the same
+    course cover mostly the same cells, so the Jaccard similarity of their cell sets is high. The sets are compressed to
+    MinHash signatures, whose share of equal entries estimates the Jaccard similarity, and the signatures are split into
+    bands for locality sensitive hashing. A new run is only compared to the runs sharing a band with it instead of every
+    run of the diary. Adding a run appends one line to a journal file.
+
+    Attributes:
+        file_location (str): The location of the journal file.
+        signatures (dict[str, np.ndarray]): The MinHash signature of every run id.
+        routes (dict[str, str]): The route of every run id.
+        buckets (dict[tuple[int, bytes], set[str]]): The run ids per band and band signature.
+        last_route (int): The largest number of a route 'R<number>' of the index.
+    """
+
+    _cache: dict[str, tuple[tuple[int, int], 'RouteIndex']] = {}
+
+    def __init__(self, file_location: str) -> None:
+        """
+        Initialize an empty RouteIndex object.
+
+        Args:
+            file_location (str): The location of the journal file.
+        """
+        self.file_location: str = file_location
+        self.signatures: dict[str, np.ndarray] = {}
+        self.routes: dict[str, str] = {}
+        self.buckets: dict[tuple[int, bytes], set[str]] = {}
+        self.last_route: int = 0
+
+    def _insert(self, run_id: str, route: str, signature: np.ndarray) -> None:
+        """
+        Insert the signature and route of a run into the index, replacing its previous ones.
+
+        Args:
+            run_id (str): The identifier of the run.
+            route (str): The route of the run.
+            signature (np.ndarray): The MinHash signature of the run.
+        """
+        if run_id in self.signatures:
+            for key in _get_band_keys(self.signatures[run_id]):
+                self.buckets[key].discard(run_id)
+        for key in _get_band_keys(signature):
+            self.buckets.setdefault(key, set()).add(run_id)
+        self.signatures[run_id] = signature
+        self.routes[run_id] = route
+        if route[:1] == 'R' and route[1:].isdigit():
+            self.last_route: int = max(self.last_route, int(route[1:]))
+
+    def _new_route(self) -> str:
+        """
+        Generate a route that no run of the index has, even after runs were removed from a route.
+
+        Returns:
+            str: The route 'R<number>' after the largest route of the index.
+        """
+        route: str = f'R{self.last_route + 1}'
+        return route
+
+    def find(self, signature: np.ndarray) -> str | None:
+        """
+        Find the route of the most similar run sharing a band with a signature.
+
+        Args:
+            signature (np.ndarray): The MinHash signature.
+
+        Returns:
+            str | None: The route, or None if no run is similar enough.
+        """
+        candidates: set[str] = set()
+        for key in _get_band_keys(signature):
+            candidates |= self.buckets.get(key, set())
+        best: tuple[float, str] | None = None
+        for run_id in candidates:
+            similarity: float = float(np.mean(self.signatures[run_id] == signature))
+            if best is None or similarity > best[0]:
+                best: tuple[float, str] = (similarity, run_id)
+        if best is None or best[0] < _get_route_hashing()['threshold']:
+            return None
+        return self.routes[best[1]]
+
+    def add(self, run: 'Run', run_id: str | None = None) -> str:
+        """
+        Add a run with a GPS track to the index and append it to the journal file.
+
+        Args:
+            run (Run): The run.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+
+        Returns:
+            str: The route of the run, a new one if no run is on the same course.
+
+        Raises:
+            ValueError: If the run has no GPS track.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        signature: np.ndarray = get_signature(run.trackpoints)
+        route: str | None = self.find(signature)
+        if route is None:
+            route: str = self._new_route()
+        self._insert(run_id, route, signature)
+        folder: str = os.path.dirname(self.file_location)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.file_location, 'a') as file:
+            file.write(json.dumps({'run': run_id, 'route': route, 'signature': signature.tolist()}) + '\n')
+        RouteIndex._cache[self.file_location] = (get_file_version(self.file_location), self)
+        return route
+
+    def get_runs(self, route: str) -> list[str]:
+        """
+        Get the runs of a route.
+
+        Args:
+            route (str): The route.
+
+        Returns:
+            list[str]: The run ids, sorted.
+        """
+        run_ids: list[str] = sorted(run_id for (run_id, run_route) in self.routes.items() if run_route == route)
+        return run_ids
+
+    def _compact(self) -> None:
+        """
+        Rewrite the journal file with one line per run, dropping the lines superseded by adding a run again.
+
+        The new file is written next to the old one and then replaces it, so an interrupted rewrite keeps the old file.
+        """
+        with open(self.file_location + '.tmp', 'w') as file:
+            file.writelines(json.dumps({'run': run_id, 'route': self.routes[run_id], 'signature': signature.tolist()})
+                            + '\n' for (run_id, signature) in self.signatures.items())
+        os.replace(self.file_location + '.tmp', self.file_location)
+        count('routes_compactions')
+
+    @staticmethod
+    def import_from_file(file_location: str | None = None) -> 'RouteIndex':
+        """
+        Import the route index from a journal file.
+
+        The index of the last import or add in this process is reused if the size and modification time of the file
+        have not changed since. A file with more than twice as many lines as runs is compacted.
+
+        Args:
+            file_location (str | None, optional): The location of the journal file. Defaults to None, which uses
+            './LaTeX/routes.jsonl'.
+
+        Returns:
+            RouteIndex: The route index. Empty if the file does not exist.
+        """
+        if file_location is None:
+            file_location: str = get_routes_location()
+        if not os.path.exists(file_location):
+            return RouteIndex(file_location)
+        version: tuple[int, int] = get_file_version(file_location)
+        cached: tuple[tuple[int, int], RouteIndex] | None = RouteIndex._cache.get(file_location)
+        if cached is not None and cached[0] == version:
+            count('routes_cache_hits')
+            return cached[1]
+        count('routes_loads')
+        index: RouteIndex = RouteIndex(file_location)
+        number_of_lines: int = 0
+        with open(file_location, 'r') as file:
+            for line in file:
+                data: dict = json.loads(line)
+                index._insert(data['run'], data['route'], np.array(data['signature'], dtype='uint32'))
+                number_of_lines += 1
+        if number_of_lines > _get_journal_compaction() * len(index.routes):
+            index._compact()
+            version: tuple[int, int] = get_file_version(file_location)
+        RouteIndex._cache[file_location] = (version, index)
+        return index
+
+    @staticmethod
+    def import_from_folder(root: str = './LaTeX/') -> 'RouteIndex':
+        """
+        Match the routes of all runs of the diary with GPS tracks anew and replace the journal file.
+
+        The runs are matched in the order of their dates, and the json files of runs whose route changed are rewritten.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+        Returns:
+            RouteIndex: The route index.
+        """
+        from diary import get_run_files, get_run_id_from_file
+        from schema import dumps, loads, upgrade
+        from trackpoints import Trackpoints
+        from utils import touch_stamp
+        file_location: str = get_routes_location(root)
+        if os.path.exists(file_location):
+            os.remove(file_location)
+        RouteIndex._cache.pop(file_location, None)
+        index: RouteIndex = RouteIndex(file_location)
+        changed: bool = False
+        for run_location in get_run_files(root):
+            trackpoints: Trackpoints | None = Trackpoints.import_from_file(run_location, ['latitude', 'longitude'])
+            if trackpoints is None or trackpoints.latitude is None:
+                continue
+            run_id: str = get_run_id_from_file(run_location)
+            signature: np.ndarray = get_signature(trackpoints)
+            route: str = index.find(signature) or index._new_route()
+            index._insert(run_id, route, signature)
+            with open(run_location, 'rb') as file:
+                data: dict = loads(file.read())
+            if data.get('route') == route:
+                continue
+            data: dict = upgrade(data)
+            data['route'] = route
+            with open(run_location + '.tmp', 'w') as file:
+                file.write(dumps(data))
+            os.replace(run_location + '.tmp', run_location)
+            changed: bool = True
+        os.makedirs(root, exist_ok=True)
+        with open(file_location, 'w') as file:
+            file.writelines(json.dumps({'run': run_id, 'route': index.routes[run_id], 'signature': signature.tolist()})
+                            + '\n' for (run_id, signature) in index.signatures.items())
+        RouteIndex._cache[file_location] = (get_file_version(file_location), index)
+        if changed:
+            touch_stamp(root)
+        return index
+
+
+def get_routes_location(root: str = './LaTeX/') -> str:
+    """
+    Generate the location of the route index journal file.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location of the journal file.
+    """
+    string: str = os.path.join(root, 'routes.jsonl')
+    return string
+
+
+def get_geohashes(latitudes: np.ndarray, longitudes: np.ndarray, precision: int = 7) -> np.ndarray:
+    """
+    Calculate the geohash cells of coordinates as integers, whose bits are the bits of the geohash strings.
+
+    Args:
+        latitudes (np.ndarray): The latitudes in degrees.
+        longitudes (np.ndarray): The longitudes in degrees.
+        precision (int, optional): The number of characters of the geohash strings, 7 are cells of about 150 m.
+        Defaults to 7.
+
+    Returns:
+        np.ndarray: The cells.
+    """
+    number_of_bits: int = 5 * precision
+    longitude_bits: int = (number_of_bits + 1) // 2
+    latitude_bits: int = number_of_bits // 2
+    longitude_cells: np.ndarray = np.clip(((np.asarray(longitudes) + 180) / 360 * 2 ** longitude_bits).astype('int64'),
+                                          0, 2 ** longitude_bits - 1)
+    latitude_cells: np.ndarray = np.clip(((np.asarray(latitudes) + 90) / 180 * 2 ** latitude_bits).astype('int64'),
+                                         0, 2 ** latitude_bits - 1)
+    cells: np.ndarray = np.zeros(len(longitude_cells), dtype='int64')
+    for bit in range(number_of_bits):
+        if bit % 2 == 0:
+            value: np.ndarray = (longitude_cells >> (longitude_bits - 1 - bit // 2)) & 1
+        else:
+            value: np.ndarray = (latitude_cells >> (latitude_bits - 1 - bit // 2)) & 1
+        cells: np.ndarray = (cells << 1) | value
+    return cells
+
+
+def get_cells(trackpoints: 'Trackpoints') -> np.ndarray:
+    """
+    Simplify a GPS track to the set of geohash cells it passes through.
+
+    The track is resampled at a fixed spacing along its distance, so pauses and the recording interval do not change
+    the cells, and the spacing is small enough that no cell along the way is skipped.
+
+    Args:
+        trackpoints (Trackpoints): The trackpoints with latitude and longitude.
+
+    Returns:
+        np.ndarray: The distinct cells, sorted.
+
+    Raises:
+        ValueError: If the trackpoints have no GPS track.
+    """
+    if trackpoints.latitude is None or trackpoints.longitude is None:
+        raise ValueError("The trackpoints have no GPS track.")
+    route_hashing: dict[str, int | float] = _get_route_hashing()
+    valid: np.ndarray = (np.isfinite(trackpoints.latitude) & np.isfinite(trackpoints.longitude)
+                         & np.isfinite(trackpoints.distance))
+    distance: np.ndarray = np.maximum.accumulate(np.asarray(trackpoints.distance)[valid])
+    if not len(distance):
+        raise ValueError("The trackpoints have no GPS track.")
+    samples: np.ndarray = np.arange(distance[0], distance[-1] + route_hashing['spacing'], route_hashing['spacing'])
+    latitudes: np.ndarray = np.interp(samples, distance, np.asarray(trackpoints.latitude)[valid])
+    longitudes: np.ndarray = np.interp(samples, distance, np.asarray(trackpoints.longitude)[valid])
+    cells: np.ndarray = np.unique(get_geohashes(latitudes, longitudes, route_hashing['precision']))
+    return cells
+
+
+def _get_hash_parameters() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the fixed random parameters of the MinHash functions h(x) = (a * x + b) >> 32 modulo 2 ** 64.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The odd multipliers a and the offsets b.
+    """
+    generator: np.random.Generator = np.random.default_rng(20240601)
+    number_of_hashes: int = _get_route_hashing()['hashes']
+    multipliers: np.ndarray = generator.integers(0, 2 ** 63, number_of_hashes, dtype='uint64') * 2 + 1
+    offsets: np.ndarray = generator.integers(0, 2 ** 63, number_of_hashes, dtype='uint64')
+    return multipliers, offsets
+
+
+def get_signature(trackpoints: 'Trackpoints') -> np.ndarray:
+    """
+    Calculate the MinHash signature of the cells of a GPS track, all hash functions at once.
+
+    Args:
+        trackpoints (Trackpoints): The trackpoints with latitude and longitude.
+
+    Returns:
+        np.ndarray: The minimal hash of every hash function.
+
+    Raises:
+        ValueError: If the trackpoints have no GPS track.
+    """
+    cells: np.ndarray = get_cells(trackpoints).astype('uint64')
+    (multipliers, offsets) = _get_hash_parameters()
+    hashes: np.ndarray = (multipliers[:, None] * cells[None, :] + offsets[:, None]) >> np.uint64(32)
+    signature: np.ndarray = hashes.min(axis=1).astype('uint32')
+    return signature
+
+
+def _get_band_keys(signature: np.ndarray) -> list[tuple[int, bytes]]:
+    """
+    Split a signature into the bands of the locality sensitive hashing.
+
+    Args:
+        signature (np.ndarray): The MinHash signature.
+
+    Returns:
+        list[tuple[int, bytes]]: The number and the bytes of every band.
+    """
+    keys: list[tuple[int, bytes]] = [(band, rows.tobytes())
+                                     for (band, rows) in enumerate(np.split(signature, _get_route_hashing()['bands']))]
+    return keys
@@ -1,13 +1,22 @@
-import json
-from typing import Any
+import os
+from typing import Any, Callable, TYPE_CHECKING
 
+from constants import _get_schema_version
 from date import Date
 from distance import Distance
 from energy import Energy
+from metrics import get_metric
 from numerics import Integer, Floating
+from profiling import count, timed
+from records import PersonalRecords, get_records_location
+from schema import loads, dumps, get_version
+from search import SearchIndex, get_search_location
 from speed import Speed
 from duration import Duration
-from utils import _round, get_directory, file_exists, _new_folder
+from utils import _round, get_directory, file_exists, _new_folder, get_column_location, get_run_id, touch_stamp
+
+if TYPE_CHECKING:
+    from trackpoints import Trackpoints
 
 
 class Run:
@@ -32,8 +41,12 @@ class Run:
         training (str): The type of training during the run.
         location (str): The location where the run took place.
         notes (str): Additional notes about the run.
+        route (str): The identifier of the course of the run, shared by all runs on the same course.
+        trackpoints (Trackpoints | None): The samples recorded during the run.
     """
 
+    _metrics: dict[str, Any] | None = None
+
     # Konvert to all kwargs?
     def __init__(self,
                  date: Date,
@@ -52,7 +65,9 @@ class Run:
                  effect: str,
                  training: str,
                  location: str,
-                 notes: str) -> None:
+                 notes: str,
+                 route: str = '',
+                 trackpoints: 'Trackpoints | None' = None) -> None:
         """
         Initialize a Run object with the specified attributes.
 
@@ -74,6 +89,8 @@ class Run:
             training (str): The type of training performed.
             location (str): The location where the run took place.
             notes (str): Additional notes or observations about the run.
+            route (str, optional): The identifier of the course of the run. Defaults to '', which means unknown.
+            trackpoints (Trackpoints | None, optional): The samples recorded during the run. Defaults to None.
         """
         self.date: Date = date
         self.distance: Distance = distance
@@ -92,31 +109,49 @@ class Run:
         self.training: str = training
         self.location: str = location
         self.notes: str = notes
+        self.route: str = route
+        self.trackpoints: Trackpoints | None = trackpoints
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Set an attribute and clear the cached derived metrics.
+
+        Args:
+            name (str): The name of the attribute.
+            value (Any): The value of the attribute.
+        """
+        object.__setattr__(self, name, value)
+        if self._metrics is not None:
+            object.__setattr__(self, '_metrics', None)
 
     def __dict__(self):
         """
-        Convert the Run instance to a dictionary representation.
+        Convert the Run instance to a dictionary representation in the current schema version.
+
+        Numbers are stored natively with None for missing values and the duration in seconds.
 
         Returns:
             dict[str, Any]: A dictionary with the Run attributes as key-value pairs.
         """
-        dictionary: dict[str, Any] = {'date': self.date.__str__(),
-                                      'distance': self.distance.__str__(),
-                                      'duration': self.duration.__str__(),
-                                      'energy': self.energy.__str__(),
-                                      'ascent': self.ascent.__str__(),
-                                      'descent': self.descent.__str__(),
-                                      'sweat': str(self.sweat),
-                                      'avg_heartbeats_per_minute': str(self.avg_heartbeats_per_minute),
-                                      'avg_power': str(self.avg_power),
-                                      'cadence': str(self.cadence),
-                                      'avg_temperature': str(self.avg_temperature),
-                                      'aerob': str(self.aerob),
-                                      'anaerob': str(self.anaerob),
+        dictionary: dict[str, Any] = {'schema_version': _get_schema_version(),
+                                      'date': self.date.__str__(),
+                                      'distance': self.distance.distance_meters,
+                                      'duration': self.duration.to_seconds(),
+                                      'energy': self.energy.kcal,
+                                      'ascent': self.ascent.distance_meters,
+                                      'descent': self.descent.distance_meters,
+                                      'sweat': self.sweat.integer,
+                                      'avg_heartbeats_per_minute': self.avg_heartbeats_per_minute.integer,
+                                      'avg_power': self.avg_power.integer,
+                                      'cadence': self.cadence.integer,
+                                      'avg_temperature': self.avg_temperature.integer,
+                                      'aerob': self.aerob.floating,
+                                      'anaerob': self.anaerob.floating,
                                       'effect': str(self.effect),
                                       'training': str(self.training),
                                       'location': str(self.location),
-                                      'notes': str(self.notes)}
+                                      'notes': str(self.notes),
+                                      'route': str(self.route)}
         return dictionary
 
     def speed(self) -> Speed:
@@ -126,7 +161,7 @@ class Run:
         Returns:
             Speed: An instance of the Speed class representing the run's speed.
         """
-        speed: Speed = Speed(self.distance, self.duration)
+        speed: Speed = get_metric(self, 'speed')
         return speed
 
     def num_of_steps(self, number_of_digits: int | None = None) -> float | None:
@@ -143,9 +178,7 @@ class Run:
             float | None: The calculated number of steps rounded to the specified number of digits, or None if
             cadence is not available.
         """
-        if self.cadence.integer is None:
-            return None
-        num_of_steps: float = self.cadence * self.duration.to_minutes()
+        num_of_steps: float | None = get_metric(self, 'num_of_steps')
         return _round(num_of_steps, number_of_digits)
 
     def step_length(self, number_of_digits: int | None = None) -> float | None:
@@ -162,10 +195,7 @@ class Run:
             float | None: The calculated step length in meters, rounded to the specified number of digits,
             or None if cadence is not available.
         """
-        if self.cadence.integer is None:
-            return None
-        num_of_steps: float = self.num_of_steps()
-        meters_per_step: float = self.distance.to_meters() / num_of_steps
+        meters_per_step: float | None = get_metric(self, 'step_length')
         return _round(meters_per_step, number_of_digits)
 
     def num_of_heartbeats(self) -> float | None:
@@ -180,9 +210,7 @@ class Run:
             float | None: The total number of heartbeats, rounded to the nearest whole number, or None if
             average heartbeats per minute is not available.
         """
-        if self.avg_heartbeats_per_minute.integer is None:
-            return None
-        num_of_heartbeats: float = self.avg_heartbeats_per_minute * self.duration.to_minutes()
+        num_of_heartbeats: float | None = get_metric(self, 'num_of_heartbeats')
         return _round(num_of_heartbeats)
 
     def total_steps(self) -> int | None:
@@ -195,39 +223,113 @@ class Run:
         Returns:
             int | None: The total number of steps, or None if cadence is not available.
         """
-        if self.cadence.integer is None:
-            return None
-        total_steps: int = int(self.cadence * self.duration.to_minutes())
+        total_steps: int | None = get_metric(self, 'total_steps')
         return total_steps
 
-    def export_to_file(self) -> None:
+    @timed('Run.export_to_file')
+    def export_to_file(self, update_records: bool = True, file_location: str | None = None) -> None:
         """
         Export the Run instance data to a JSON file.
+
+        If the run has trackpoints, they are exported to binary column files next to the JSON file. Afterwards the
+        stamp file of the diary is touched, so caches of the diary know they are outdated.
+
+        Args:
+            update_records (bool, optional): If True, the run is added to the personal records and the search index,
+            and a run with a GPS track but without route gets the route of its course. Defaults to True.
+            file_location (str | None, optional): The location of the JSON file. Defaults to None, which uses
+            './LaTeX/yy.mm.dd Run/yy.mm.dd Run.json'.
         """
-        directory: str = get_directory(self)
-        file_location: str = directory + f'{self.date.__str__(reversed=True, short=True)} Run.json'
+        if file_location is None:
+            file_location: str = get_directory(self) + f'{get_run_id(self)}.json'
+        directory: str = os.path.dirname(file_location)
         file_exists(file_location)
-        data: str = json.dumps(self.__dict__())
+        root: str = os.path.dirname(directory)
+        run_id: str = os.path.splitext(os.path.basename(file_location))[0]
+        has_track: bool = self.trackpoints is not None and self.trackpoints.latitude is not None
+        if update_records and not self.route and has_track:
+            from routes import RouteIndex, get_routes_location
+            self.route: str = RouteIndex.import_from_file(get_routes_location(root)).add(self, run_id)
+        data: str = dumps(self.__dict__())
         try:
             with open(file_location, 'w') as file:
                 file.write(data)
         except FileNotFoundError:
             _new_folder(directory)
-            self.export_to_file()
+            with open(file_location, 'w') as file:
+                file.write(data)
+        if self.trackpoints is not None:
+            self.trackpoints.export_to_file(file_location)
+        if update_records:
+            PersonalRecords.import_from_file(get_records_location(root)).add(self, run_id)
+            SearchIndex.import_from_file(get_search_location(root)).add(self, run_id)
+        touch_stamp(root)
+        count('runs_exported')
 
     @staticmethod
-    def import_from_file(file_name: str) -> 'Run':
+    @timed('Run.import_from_file')
+    def import_from_file(file_name: str, lazy: bool = False) -> 'Run':
         """
-        Import a Run instance from a JSON file.
+        Import a Run instance from a JSON file of any supported schema version.
+
+        If there are trackpoints next to the JSON file, they are memory mapped and attached to the run.
 
         Args:
             file_name (str): The name of the JSON file to read data from.
+            lazy (bool, optional): If True, a LazyRun is returned, which parses every field only on first access.
+            Defaults to False.
 
         Returns:
             Run: A Run instance created from the data in the JSON file.
         """
-        with open(file_name, 'r') as file:
-            data = json.load(file)
+        with open(file_name, 'rb') as file:
+            data: dict[str, Any] = loads(file.read())
+        count('runs_parsed')
+        if lazy:
+            return LazyRun(data, file_name)
+        trackpoints: Trackpoints | None = None
+        if os.path.exists(get_column_location(file_name, 'timestamp')):
+            from trackpoints import Trackpoints
+            trackpoints: Trackpoints | None = Trackpoints.import_from_file(file_name)
+        run: Run = Run.from_dict(data, trackpoints)
+        return run
+
+    @staticmethod
+    def from_dict(data: dict[str, Any], trackpoints: 'Trackpoints | None' = None) -> 'Run':
+        """
+        Create a Run instance from its dictionary representation.
+
+        Version 2 data holds native values, so only the date is parsed. Version 1 data, where every field is a string,
+        is parsed field by field.
+
+        Args:
+            data (dict[str, Any]): The dictionary as returned by Run.__dict__, in any supported schema version.
+            trackpoints (Trackpoints | None, optional): The samples recorded during the run. Defaults to None.
+
+        Returns:
+            Run: A Run instance created from the dictionary.
+        """
+        if get_version(data) != 1:
+            run: Run = Run(date=Date.from_string(data['date']),
+                           distance=Distance(data['distance']),
+                           duration=Duration.from_seconds(data['duration']),
+                           energy=Energy(data['energy']),
+                           ascent=Distance(data['ascent']),
+                           descent=Distance(data['descent']),
+                           sweat=Integer(data['sweat']),
+                           avg_heartbeats_per_minute=Integer(data['avg_heartbeats_per_minute']),
+                           avg_power=Integer(data['avg_power']),
+                           cadence=Integer(data['cadence']),
+                           avg_temperature=Integer(data['avg_temperature']),
+                           aerob=Floating(data['aerob']),
+                           anaerob=Floating(data['anaerob']),
+                           effect=data['effect'],
+                           training=data['training'],
+                           location=data['location'],
+                           notes=data['notes'],
+                           route=data.get('route', ''),
+                           trackpoints=trackpoints)
+            return run
         date: Date = Date.from_string(data['date'])
         distance: Distance = Distance.from_string(data['distance'])
         duration: Duration = Duration.from_string(data['duration'])
@@ -245,6 +347,7 @@ class Run:
         training: str = data['training']
         location: str = data['location']
         notes: str = data['notes']
+        route: str = data.get('route', '')
         run: Run = Run(date=date,
                        distance=distance,
                        duration=duration,
@@ -261,5 +364,151 @@ class Run:
                        effect=effect,
                        training=training,
                        location=location,
-                       notes=notes)
+                       notes=notes,
+                       route=route,
+                       trackpoints=trackpoints)
         return run
+
+
+class LazyRun(Run):
+    """
+    Represents a recorded run whose fields are parsed from the raw JSON data only on first access.
+
+    Every field is parsed the same way as in Run.from_dict and cached afterwards, so scans that only touch a few fields
+    parse and allocate far less.
+
+    Attributes:
+        _data (dict[str, Any]): The raw JSON data of the run, in any supported schema version.
+        _file_location (str | None): The location of the JSON file, used to find the trackpoints.
+        _touched (bool): Whether any field has been set after the import.
+    """
+
+    def __init__(self, data: dict[str, Any], file_location: str | None = None) -> None:
+        """
+        Initialize a LazyRun object from raw JSON data without parsing any field.
+
+        Args:
+            data (dict[str, Any]): The raw JSON data of the run.
+            file_location (str | None, optional): The location of the JSON file. Defaults to None.
+        """
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_file_location', file_location)
+        object.__setattr__(self, '_touched', False)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Parse a field on first access and cache it.
+
+        Args:
+            name (str): The name of the field.
+
+        Returns:
+            Any: The parsed field.
+
+        Raises:
+            AttributeError: If the run has no field with the name.
+        """
+        if name == 'trackpoints':
+            value: Trackpoints | None = None
+            file_location: str | None = self._file_location
+            if file_location is not None and os.path.exists(get_column_location(file_location, 'timestamp')):
+                from trackpoints import Trackpoints
+                value: Trackpoints | None = Trackpoints.import_from_file(file_location)
+        elif name == 'route':
+            value: str = self._data.get('route', '')
+        elif name in _get_parsers(get_version(self._data)):
+            value: Any = _get_parsers(get_version(self._data))[name](self._data[name])
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        object.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Set a field and remember that the raw JSON data is no longer sufficient.
+
+        Args:
+            name (str): The name of the field.
+            value (Any): The value of the field.
+        """
+        object.__setattr__(self, '_touched', True)
+        super().__setattr__(name, value)
+
+    def __dict__(self):
+        """
+        Convert the LazyRun instance to a dictionary representation.
+
+        If no field has been set and the raw JSON data is in the current schema version, it is returned without parsing
+        anything.
+
+        Returns:
+            dict[str, Any]: A dictionary with the Run attributes as key-value pairs.
+        """
+        if not self._touched and get_version(self._data) == _get_schema_version():
+            return dict(self._data)
+        return super().__dict__()
+
+
+def _get_parsers(version: int = 1) -> dict[str, Callable[[Any], Any]]:
+    """
+    Get the functions that parse the fields of a run from their JSON values.
+
+    Args:
+        version (int, optional): The schema version of the JSON data. Defaults to 1.
+
+    Returns:
+        dict[str, Callable[[Any], Any]]: The names of the fields mapped to their parsers.
+    """
+    if version == 1:
+        return _PARSERS
+    return _PARSERS_V2
+
+
+def _keep_string(string: str) -> str:
+    """
+    Return a text field of a run unchanged.
+
+    Args:
+        string (str): The text.
+
+    Returns:
+        str: The same text.
+    """
+    return string
+
+
+_PARSERS: dict[str, Callable[[str], Any]] = {'date': Date.from_string,
+                                             'distance': Distance.from_string,
+                                             'duration': Duration.from_string,
+                                             'energy': Energy.from_string,
+                                             'ascent': Distance.from_string,
+                                             'descent': Distance.from_string,
+                                             'sweat': Integer.from_string,
+                                             'avg_heartbeats_per_minute': Integer.from_string,
+                                             'avg_power': Integer.from_string,
+                                             'cadence': Integer.from_string,
+                                             'avg_temperature': Integer.from_string,
+                                             'aerob': Floating.from_string,
+                                             'anaerob': Floating.from_string,
+                                             'effect': _keep_string,
+                                             'training': _keep_string,
+                                             'location': _keep_string,
+                                             'notes': _keep_string}
+
+_PARSERS_V2: dict[str, Callable[[Any], Any]] = {'date': Date.from_string,
+                                                'distance': Distance,
+                                                'duration': Duration.from_seconds,
+                                                'energy': Energy,
+                                                'ascent': Distance,
+                                                'descent': Distance,
+                                                'sweat': Integer,
+                                                'avg_heartbeats_per_minute': Integer,
+                                                'avg_power': Integer,
+                                                'cadence': Integer,
+                                                'avg_temperature': Integer,
+                                                'aerob': Floating,
+                                                'anaerob': Floating,
+                                                'effect': _keep_string,
+                                                'training': _keep_string,
+                                                'location': _keep_string,
+                                                'notes': _keep_string}
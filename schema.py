@@ -0,0 +1,151 @@
+import json
+import os
+from typing import Any
+
+from constants import _get_schema_version
+from duration import Duration
+from utils import touch_stamp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Parse json, with orjson if it is installed.
+
+    Args:
+        data (bytes | str): The json text.
+
+    Returns:
+        Any: The parsed data.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data: Any) -> str:
+    """
+    Serialize data to compact json, with orjson if it is installed.
+
+    Args:
+        data (Any): The data.
+
+    Returns:
+        str: The json text.
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'))
+
+
+def get_version(data: dict[str, Any]) -> int:
+    """
+    Get the schema version of the json data of a run. Files without the key 'schema_version' are version 1.
+
+    Args:
+        data (dict[str, Any]): The json data of a run.
+
+    Returns:
+        int: The schema version.
+    """
+    version: int = data.get('schema_version', 1)
+    return version
+
+
+def _get_integer_fields() -> list[str]:
+    """
+    Get the fields of a run that are stored as nullable integers in version 2.
+
+    Returns:
+        list[str]: The names of the fields.
+    """
+    integer_fields: list[str] = ['distance', 'energy', 'ascent', 'descent', 'sweat', 'avg_heartbeats_per_minute',
+                                 'avg_power', 'cadence', 'avg_temperature']
+    return integer_fields
+
+
+def _get_floating_fields() -> list[str]:
+    """
+    Get the fields of a run that are stored as nullable floats in version 2.
+
+    Returns:
+        list[str]: The names of the fields.
+    """
+    floating_fields: list[str] = ['aerob', 'anaerob']
+    return floating_fields
+
+
+def upgrade(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert the json data of a run to the current schema version.
+
+    Args:
+        data (dict[str, Any]): The json data of a run in any supported version.
+
+    Returns:
+        dict[str, Any]: The json data in the current version. Data that already is current is returned unchanged.
+
+    Raises:
+        ValueError: If the schema version is not supported.
+    """
+    version: int = get_version(data)
+    if version == _get_schema_version():
+        return data
+    if version != 1:
+        raise ValueError(f"Schema version {version} is not supported. Use 1 or {_get_schema_version()}.")
+    upgraded: dict[str, Any] = {'schema_version': _get_schema_version()}
+    for (field, value) in data.items():
+        if field == 'duration':
+            upgraded[field] = Duration.from_string(value).to_seconds()
+        elif field in _get_integer_fields():
+            upgraded[field] = None if value in ('', '-') else int(value)
+        elif field in _get_floating_fields():
+            upgraded[field] = None if value in ('', '-') else float(value)
+        else:
+            upgraded[field] = value
+    return upgraded
+
+
+def migrate_file(file_location: str) -> bool:
+    """
+    Rewrite the json file of a run in the current schema version.
+
+    The new file is written next to the old one and then replaces it, so an interrupted migration never leaves a
+    broken file.
+
+    Args:
+        file_location (str): The location of the json file.
+
+    Returns:
+        bool: True if the file was rewritten, False if it already was current.
+    """
+    with open(file_location, 'rb') as file:
+        data: dict[str, Any] = loads(file.read())
+    if get_version(data) == _get_schema_version():
+        return False
+    temporary_location: str = file_location + '.tmp'
+    with open(temporary_location, 'w') as file:
+        file.write(dumps(upgrade(data)))
+    os.replace(temporary_location, file_location)
+    return True
+
+
+def migrate_folder(root: str = './LaTeX/') -> int:
+    """
+    Rewrite the json files of all runs of the diary in the current schema version.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        int: The number of rewritten files.
+    """
+    from diary import get_run_files
+    number_of_files: int = sum(migrate_file(file_location) for file_location in get_run_files(root))
+    if number_of_files:
+        touch_stamp(root)
+    return number_of_files
@@ -0,0 +1,296 @@
+import json
+import os
+import re
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from constants import _get_journal_compaction
+from date import Date
+from profiling import count
+from utils import get_run_id, get_file_version
+
+if TYPE_CHECKING:
+    from run import Run
+
+
+class SearchIndex:
+    """
+    A class to represent an inverted index over the text fields of all runs.
+
+    Every token is stored per field as 'field:token' and maps to the set of run ids whose field contains it. The keys
+    are additionally kept in a sorted list, so prefix queries are a bisect and a short scan. Adding a run appends one
+    line to a journal file instead of rewriting or rescanning the whole diary.
+
+    Attributes:
+        file_location (str): The location of the journal file.
+        postings (dict[str, set[str]]): The run ids per key.
+        vocabulary (list[str]): The sorted keys.
+        keys (dict[str, list[str]]): The keys of every run id.
+        dates (dict[str, int]): The date of every run id as ordinal.
+    """
+
+    _cache: dict[str, tuple[tuple[int, int], 'SearchIndex']] = {}
+
+    def __init__(self, file_location: str) -> None:
+        """
+        Initialize an empty SearchIndex object.
+
+        Args:
+            file_location (str): The location of the journal file.
+        """
+        self.file_location: str = file_location
+        self.postings: dict[str, set[str]] = {}
+        self.vocabulary: list[str] = []
+        self.keys: dict[str, list[str]] = {}
+        self.dates: dict[str, int] = {}
+
+    def _insert(self, run_id: str, date: int, keys: list[str]) -> None:
+        """
+        Insert the keys of a run into the index, replacing its previous keys.
+
+        Args:
+            run_id (str): The identifier of the run.
+            date (int): The date of the run as ordinal.
+            keys (list[str]): The keys of the run.
+        """
+        for key in self.keys.pop(run_id, []):
+            run_ids: set[str] = self.postings[key]
+            run_ids.discard(run_id)
+            if not run_ids:
+                del self.postings[key]
+                del self.vocabulary[bisect_left(self.vocabulary, key)]
+        for key in keys:
+            run_ids: set[str] | None = self.postings.get(key)
+            if run_ids is None:
+                self.postings[key] = {run_id}
+                self.vocabulary.insert(bisect_left(self.vocabulary, key), key)
+            else:
+                run_ids.add(run_id)
+        self.keys[run_id] = keys
+        self.dates[run_id] = date
+
+    def add(self, run: 'Run', run_id: str | None = None) -> None:
+        """
+        Add a run to the index and append it to the journal file.
+
+        Args:
+            run (Run): The run to add.
+            run_id (str | None, optional): The identifier of the run. Defaults to None, which uses 'yy.mm.dd Run'.
+        """
+        if run_id is None:
+            run_id: str = get_run_id(run)
+        keys: list[str] = _get_keys(run)
+        date: int = run.date.to_ordinal()
+        self._insert(run_id, date, keys)
+        folder: str = os.path.dirname(self.file_location)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.file_location, 'a') as file:
+            file.write(json.dumps({'run': run_id, 'date': date, 'keys': keys}) + '\n')
+        SearchIndex._cache[self.file_location] = (get_file_version(self.file_location), self)
+
+    def _match(self, term: str) -> set[str]:
+        """
+        Get the run ids matching one term of a query.
+
+        A term is a token, optionally with a field like 'location:track' and optionally with a trailing '*' for a
+        prefix query like 'kne*'.
+
+        Args:
+            term (str): The term.
+
+        Returns:
+            set[str]: The matching run ids.
+        """
+        (field, _, token) = term.rpartition(':')
+        fields: list[str] = [field] if field else _get_fields()
+        prefix: bool = token.endswith('*')
+        token: str = token.rstrip('*').lower()
+        run_ids: set[str] = set()
+        for field in fields:
+            key: str = f'{field}:{token}'
+            if not prefix:
+                run_ids |= self.postings.get(key, set())
+                continue
+            index: int = bisect_left(self.vocabulary, key)
+            while index < len(self.vocabulary) and self.vocabulary[index].startswith(key):
+                run_ids |= self.postings[self.vocabulary[index]]
+                index += 1
+        return run_ids
+
+    def search(self, query: str) -> list[str]:
+        """
+        Get the run ids matching a query.
+
+        Terms separated by spaces must all match, groups of terms separated by 'OR' are alternatives, e.g.
+        'knee OR location:track* windy' finds runs mentioning knee or runs at a track that were windy.
+
+        Args:
+            query (str): The query.
+
+        Returns:
+            list[str]: The matching run ids sorted by date.
+        """
+        run_ids: set[str] = set()
+        for group in re.split(r'\s+OR\s+', query.strip()):
+            terms: list[str] = group.split()
+            if not terms:
+                continue
+            matches: list[set[str]] = sorted((self._match(term) for term in terms), key=len)
+            run_ids |= matches[0].intersection(*matches[1:])
+        sorted_run_ids: list[str] = sorted(run_ids, key=lambda run_id: (self.dates[run_id], run_id))
+        return sorted_run_ids
+
+    def search_dates(self, query: str) -> list[Date]:
+        """
+        Get the dates of the runs matching a query.
+
+        Args:
+            query (str): The query, see search.
+
+        Returns:
+            list[Date]: The dates of the matching runs, sorted.
+        """
+        dates: list[Date] = [Date.from_ordinal(self.dates[run_id]) for run_id in self.search(query)]
+        return dates
+
+    def is_current(self, root: str = './LaTeX/') -> bool:
+        """
+        Check whether the index holds exactly the runs of the diary and no json file changed after the journal file.
+
+        Runs exported with update_records=False, deleted runs and json files edited by hand make the index outdated.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+        Returns:
+            bool: True if the index does not have to be rebuilt.
+        """
+        from diary import get_run_files, get_run_id_from_file
+        if not os.path.exists(self.file_location):
+            return False
+        run_locations: list[str] = get_run_files(root)
+        if {get_run_id_from_file(run_location) for run_location in run_locations} != set(self.dates):
+            return False
+        modified: int = os.stat(self.file_location).st_mtime_ns
+        is_current: bool = all(os.stat(run_location).st_mtime_ns <= modified for run_location in run_locations)
+        return is_current
+
+    def _compact(self) -> None:
+        """
+        Rewrite the journal file with one line per run, dropping the lines superseded by adding a run again.
+
+        The new file is written next to the old one and then replaces it, so an interrupted rewrite keeps the old file.
+        """
+        with open(self.file_location + '.tmp', 'w') as file:
+            file.writelines(json.dumps({'run': run_id, 'date': self.dates[run_id], 'keys': keys}) + '\n'
+                            for (run_id, keys) in self.keys.items())
+        os.replace(self.file_location + '.tmp', self.file_location)
+        count('search_compactions')
+
+    @staticmethod
+    def import_from_file(file_location: str | None = None) -> 'SearchIndex':
+        """
+        Import the search index from a journal file.
+
+        The index of the last import or add in this process is reused if the size and modification time of the file
+        have not changed since. A file with more than twice as many lines as runs is compacted.
+
+        Args:
+            file_location (str | None, optional): The location of the journal file. Defaults to None, which uses
+            './LaTeX/search.jsonl'.
+
+        Returns:
+            SearchIndex: The search index. Empty if the file does not exist.
+        """
+        if file_location is None:
+            file_location: str = get_search_location()
+        if not os.path.exists(file_location):
+            return SearchIndex(file_location)
+        version: tuple[int, int] = get_file_version(file_location)
+        cached: tuple[tuple[int, int], SearchIndex] | None = SearchIndex._cache.get(file_location)
+        if cached is not None and cached[0] == version:
+            count('search_cache_hits')
+            return cached[1]
+        count('search_loads')
+        index: SearchIndex = SearchIndex(file_location)
+        number_of_lines: int = 0
+        with open(file_location, 'r') as file:
+            for line in file:
+                data: dict = json.loads(line)
+                index._insert(data['run'], data['date'], data['keys'])
+                number_of_lines += 1
+        if number_of_lines > _get_journal_compaction() * len(index.dates):
+            index._compact()
+            version: tuple[int, int] = get_file_version(file_location)
+        SearchIndex._cache[file_location] = (version, index)
+        return index
+
+    @staticmethod
+    def import_from_folder(root: str = './LaTeX/') -> 'SearchIndex':
+        """
+        Build the search index of all runs of the diary and replace its journal file.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+        Returns:
+            SearchIndex: The search index.
+        """
+        from diary import get_run_files, get_run_id_from_file
+        from run import Run
+        file_location: str = get_search_location(root)
+        index: SearchIndex = SearchIndex(file_location)
+        lines: list[str] = []
+        for run_location in get_run_files(root):
+            run: Run = Run.import_from_file(run_location, lazy=True)
+            (run_id, date, keys) = (get_run_id_from_file(run_location), run.date.to_ordinal(), _get_keys(run))
+            index._insert(run_id, date, keys)
+            lines.append(json.dumps({'run': run_id, 'date': date, 'keys': keys}) + '\n')
+        os.makedirs(root, exist_ok=True)
+        with open(file_location, 'w') as file:
+            file.writelines(lines)
+        SearchIndex._cache[file_location] = (get_file_version(file_location), index)
+        return index
+
+
+def get_search_location(root: str = './LaTeX/') -> str:
+    """
+    Generate the location of the search index journal file.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location of the journal file.
+    """
+    string: str = os.path.join(root, 'search.jsonl')
+    return string
+
+
+def _get_fields() -> list[str]:
+    """
+    Get the text fields of a run that are indexed.
+
+    Returns:
+        list[str]: The names of the fields.
+    """
+    fields: list[str] = ['notes', 'location', 'training', 'effect']
+    return fields
+
+
+def _get_keys(run: 'Run') -> list[str]:
+    """
+    Get the keys of a run, every lower case word of every indexed field as 'field:word'.
+
+    Args:
+        run (Run): The run.
+
+    Returns:
+        list[str]: The distinct keys, sorted.
+    """
+    keys: set[str] = set()
+    for field in _get_fields():
+        for token in re.findall(r'\w+', getattr(run, field).lower()):
+            keys.add(f'{field}:{token}')
+    return sorted(keys)
@@ -0,0 +1,339 @@
+import asyncio
+import email.utils
+import os
+import zlib
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from date import Date
+from diary import get_run_files, get_run_id_from_file
+from history import History
+from run import Run
+from schema import dumps
+from utils import get_stamp_location
+
+
+class DiaryIndex:
+    """
+    A class to hold the runs of a diary in memory and to cache the responses of the http server.
+
+    The index is loaded once and reloaded only when the stamp file of the diary changed, which Run.export_to_file
+    touches after every write. Reloading and reading pdf files run in worker threads, so the event loop keeps serving
+    the other connections. Every response is computed once per state of the diary.
+
+    Attributes:
+        root (str): The folder of the diary.
+        stamp (int | None): The modification time of the stamp file when the index was loaded.
+        last_modified (float): The time of the last change of the diary as unix time.
+        history (History): The runs as columns, sorted by date.
+        runs (dict[str, dict[str, Any]]): The json data of every run by run identifier.
+        file_locations (dict[str, str]): The json file of every run by run identifier.
+        responses (dict[str, tuple[str, bytes]]): The cached ETag and body of every requested path.
+        lock (asyncio.Lock): The lock that lets only one request reload the diary.
+    """
+
+    def __init__(self, root: str = './LaTeX/') -> None:
+        """
+        Initialize the DiaryIndex object and load the diary.
+
+        Args:
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        """
+        self.root: str = root
+        self.stamp: int | None = None
+        self.responses: dict[str, tuple[str, bytes]] = {}
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self._load()
+
+    def _get_stamp(self) -> int | None:
+        """
+        Get the modification time of the stamp file.
+
+        Returns:
+            int | None: The modification time in nanoseconds, or None if the diary has never been written.
+        """
+        try:
+            return os.stat(get_stamp_location(self.root)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        """
+        Load all runs of the diary and clear the cached responses.
+        """
+        self.stamp: int | None = self._get_stamp()
+        self.file_locations: dict[str, str] = {get_run_id_from_file(file_location): file_location
+                                               for file_location in get_run_files(self.root)}
+        if self.stamp is not None:
+            self.last_modified: float = self.stamp / 1e9
+        else:
+            self.last_modified: float = max((os.path.getmtime(file_location)
+                                             for file_location in self.file_locations.values()), default=0.0)
+        self.history: History = History.update_cache(self.root)
+        self.runs: dict[str, dict[str, Any]] = {
+            run_id: Run.import_from_file(file_location, lazy=True).__dict__()
+            for (run_id, file_location) in self.file_locations.items()}
+        self.responses.clear()
+
+    async def refresh(self) -> None:
+        """
+        Reload the diary in a worker thread if the stamp file changed since the last load.
+
+        Requests arriving during the reload wait for it instead of starting another one.
+        """
+        async with self.lock:
+            if self._get_stamp() != self.stamp:
+                await asyncio.to_thread(self._load)
+
+    def select(self, query: dict[str, list[str]]) -> History:
+        """
+        Select the runs of the date range of a query.
+
+        Args:
+            query (dict[str, list[str]]): The parsed query with optional 'from' and 'to' in the format 'dd.mm.yyyy'.
+
+        Returns:
+            History: The runs in the date range, both dates included.
+        """
+        start: int = Date.from_string(query['from'][0]).to_ordinal() if 'from' in query else 1
+        end: int = Date.from_string(query['to'][0]).to_ordinal() if 'to' in query else 10 ** 7
+        lower: int = int(np.searchsorted(self.history.date, start, side='left'))
+        upper: int = int(np.searchsorted(self.history.date, end, side='right'))
+        return self.history.select(slice(lower, upper))
+
+    def get_runs(self, query: dict[str, list[str]]) -> list[dict[str, Any]]:
+        """
+        Get the json data of the runs of the date range of a query.
+
+        Args:
+            query (dict[str, list[str]]): The parsed query.
+
+        Returns:
+            list[dict[str, Any]]: The json data with the run identifier of every run, sorted by date.
+        """
+        runs: list[dict[str, Any]] = [{'run_id': run_id, **self.runs[run_id]}
+                                      for run_id in self.select(query).run_ids]
+        return runs
+
+    def get_stats(self, query: dict[str, list[str]]) -> list[dict[str, Any]]:
+        """
+        Get the number of runs, the distance and the duration per period of the date range of a query.
+
+        Args:
+            query (dict[str, list[str]]): The parsed query with optional 'by', one of 'year', 'month' or 'week'.
+            Defaults to 'year'.
+
+        Returns:
+            list[dict[str, Any]]: The totals of every period, sorted by period.
+
+        Raises:
+            ValueError: If the period is unknown.
+        """
+        history: History = self.select(query)
+        period: str = query.get('by', ['year'])[0]
+        days: np.ndarray = np.datetime64('0001-01-01') + (history.date.astype('int64') - 1).astype('timedelta64[D]')
+        if period == 'year':
+            keys: np.ndarray = days.astype('datetime64[Y]').astype(str)
+        elif period == 'month':
+            keys: np.ndarray = days.astype('datetime64[M]').astype(str)
+        elif period == 'week':
+            keys: np.ndarray = (np.datetime64('0001-01-01')
+                                + (history.week().astype('int64') - 1).astype('timedelta64[D]')).astype(str)
+        else:
+            raise ValueError(f"Period '{period}' is not supported. Use 'year', 'month' or 'week'.")
+        (periods, inverse) = np.unique(keys, return_inverse=True)
+        runs: np.ndarray = np.bincount(inverse, minlength=len(periods))
+        meters: np.ndarray = np.bincount(inverse, np.nan_to_num(history.meters), minlength=len(periods))
+        seconds: np.ndarray = np.bincount(inverse, np.nan_to_num(history.seconds), minlength=len(periods))
+        stats: list[dict[str, Any]] = [{'period': str(key), 'runs': int(number), 'meters': int(distance),
+                                        'seconds': int(duration)}
+                                       for (key, number, distance, duration) in zip(periods, runs, meters, seconds)]
+        return stats
+
+    def get_pdf_location(self, run_id: str) -> str | None:
+        """
+        Get the location of the pdf file of a run.
+
+        Args:
+            run_id (str): The identifier of the run.
+
+        Returns:
+            str | None: The location of the pdf file, or None if the run or its pdf file does not exist.
+        """
+        file_location: str | None = self.file_locations.get(run_id)
+        if file_location is None:
+            return None
+        pdf_location: str = os.path.splitext(file_location)[0] + '.pdf'
+        if not os.path.exists(pdf_location):
+            return None
+        return pdf_location
+
+    async def get_response(self, path: str, query: dict[str, list[str]]) -> tuple[int, str, str, bytes, float]:
+        """
+        Get the response to a request, from the cache if the diary did not change since it was computed.
+
+        Args:
+            path (str): The decoded path of the request, e.g. '/runs'.
+            query (dict[str, list[str]]): The parsed query.
+
+        Returns:
+            tuple[int, str, str, bytes, float]: The status, the content type, the ETag, the body and the time of the
+            last modification as unix time.
+        """
+        await self.refresh()
+        parts: list[str] = [part for part in path.split('/') if part]
+        if len(parts) == 3 and parts[0] == 'runs' and parts[2] == 'pdf':
+            pdf_location: str | None = self.get_pdf_location(parts[1])
+            if pdf_location is None:
+                return 404, 'application/json', '', dumps({'error': 'Not found'}).encode(), self.last_modified
+            status: os.stat_result = os.stat(pdf_location)
+            body: bytes = await asyncio.to_thread(_read_file, pdf_location)
+            return 200, 'application/pdf', f'"{status.st_mtime_ns:x}-{status.st_size:x}"', body, status.st_mtime
+        key: str = path + '?' + '&'.join(f'{name}={value}' for (name, values) in sorted(query.items())
+                                         for value in values)
+        cached: tuple[str, bytes] | None = self.responses.get(key)
+        if cached is not None:
+            return 200, 'application/json', cached[0], cached[1], self.last_modified
+        try:
+            if parts == ['runs']:
+                data: Any = self.get_runs(query)
+            elif len(parts) == 2 and parts[0] == 'runs':
+                if parts[1] not in self.runs:
+                    return 404, 'application/json', '', dumps({'error': 'Not found'}).encode(), self.last_modified
+                data: Any = {'run_id': parts[1], **self.runs[parts[1]]}
+            elif parts == ['stats']:
+                data: Any = self.get_stats(query)
+            else:
+                return 404, 'application/json', '', dumps({'error': 'Not found'}).encode(), self.last_modified
+        except ValueError as error:
+            return 400, 'application/json', '', dumps({'error': str(error)}).encode(), self.last_modified
+        body: bytes = dumps(data).encode()
+        etag: str = f'"{self.stamp or 0:x}-{zlib.crc32(body):x}"'
+        self.responses[key] = (etag, body)
+        return 200, 'application/json', etag, body, self.last_modified
+
+
+def _read_file(file_location: str) -> bytes:
+    """
+    Read a whole file, e.g. in a worker thread.
+
+    Args:
+        file_location (str): The location of the file.
+
+    Returns:
+        bytes: The content of the file.
+    """
+    with open(file_location, 'rb') as file:
+        data: bytes = file.read()
+    return data
+
+
+def _is_not_modified(headers: dict[str, str], etag: str, last_modified: float) -> bool:
+    """
+    Check whether the client already has the current response.
+
+    Args:
+        headers (dict[str, str]): The request headers with lower case names.
+        etag (str): The ETag of the response.
+        last_modified (float): The time of the last modification as unix time.
+
+    Returns:
+        bool: True if the client may reuse its cached response.
+    """
+    if 'if-none-match' in headers:
+        return etag in [tag.strip() for tag in headers['if-none-match'].split(',')] or headers['if-none-match'] == '*'
+    if 'if-modified-since' in headers:
+        try:
+            since: float = email.utils.parsedate_to_datetime(headers['if-modified-since']).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, index: DiaryIndex) -> None:
+    """
+    Answer the requests of one connection, keeping it open between requests.
+
+    Args:
+        reader (asyncio.StreamReader): The stream of the requests.
+        writer (asyncio.StreamWriter): The stream of the responses.
+        index (DiaryIndex): The index of the diary.
+    """
+    try:
+        while True:
+            request_line: bytes = await reader.readline()
+            if not request_line.strip():
+                break
+            (method, target, version) = request_line.decode('latin-1').split(maxsplit=2)
+            headers: dict[str, str] = {}
+            while True:
+                line: bytes = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                (name, _, value) = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            url = urlsplit(target)
+            if method not in ('GET', 'HEAD'):
+                (status, content_type, etag, body, last_modified) = (405, 'application/json', '',
+                                                                     dumps({'error': 'Method not allowed'}).encode(),
+                                                                     index.last_modified)
+            else:
+                (status, content_type, etag, body, last_modified) = await index.get_response(unquote(url.path),
+                                                                                             parse_qs(url.query))
+            if status == 200 and _is_not_modified(headers, etag, last_modified):
+                (status, body) = (304, b'')
+            keep_alive: bool = (headers.get('connection', '').lower() != 'close'
+                                and version.strip().upper() == 'HTTP/1.1')
+            response_headers: list[str] = [f'HTTP/1.1 {status} {_get_reasons()[status]}',
+                                           f'Content-Type: {content_type}',
+                                           f'Content-Length: {len(body)}',
+                                           f'Last-Modified: {email.utils.formatdate(last_modified, usegmt=True)}',
+                                           'Cache-Control: no-cache',
+                                           f'Connection: {"keep-alive" if keep_alive else "close"}']
+            if etag:
+                response_headers.append(f'ETag: {etag}')
+            writer.write(('\r\n'.join(response_headers) + '\r\n\r\n').encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def _get_reasons() -> dict[int, str]:
+    """
+    Get the reason phrases of the http status codes the server answers with.
+
+    Returns:
+        dict[int, str]: The status codes mapped to their reason phrases.
+    """
+    reasons: dict[int, str] = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                               405: 'Method Not Allowed'}
+    return reasons
+
+
+async def serve(root: str = './LaTeX/', host: str = '127.0.0.1', port: int = 8080) -> None:
+    """
+    Serve the diary over http until the process is interrupted.
+
+    The endpoints are '/runs' and '/stats' with the optional query parameters 'from' and 'to' in the format
+    'dd.mm.yyyy' and 'by' for the stats, '/runs/<run id>' and '/runs/<run id>/pdf'.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+        host (str, optional): The address to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): The port to listen on. Defaults to 8080.
+    """
+    index: DiaryIndex = DiaryIndex(root)
+    server: asyncio.Server = await asyncio.start_server(lambda reader, writer: _handle(reader, writer, index),
+                                                        host, port)
+    print(f"Serving {len(index.runs)} runs on http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
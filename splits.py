@@ -0,0 +1,131 @@
+from typing import Iterable
+
+import numpy as np
+
+from constants import _get_best_effort_distances
+from distance import Distance
+from duration import Duration
+from speed import Speed
+from trackpoints import Trackpoints
+
+
+class Split:
+    """
+    A class to represent one split of a run.
+
+    Attributes:
+        number (int): The number of the split, starting at 1.
+        distance (Distance): The distance of the split.
+        duration (Duration): The duration of the split.
+    """
+
+    def __init__(self, number: int, distance: Distance, duration: Duration) -> None:
+        """
+        Initialize the Split object.
+
+        Args:
+            number (int): The number of the split, starting at 1.
+            distance (Distance): The distance of the split.
+            duration (Duration): The duration of the split.
+        """
+        self.number: int = number
+        self.distance: Distance = distance
+        self.duration: Duration = duration
+
+    def speed(self) -> Speed:
+        """
+        Calculate the Speed of the split.
+
+        Returns:
+            Speed: An instance of the Speed class representing the split's speed.
+        """
+        speed: Speed = Speed(self.distance, self.duration)
+        return speed
+
+
+def get_splits(trackpoints: Trackpoints, split_meters: float = 1000) -> list[Split]:
+    """
+    Calculate the splits of a run.
+
+    The times at the split boundaries are interpolated from the cumulative distance, so all splits are computed in
+    one vectorized pass. The last split is shorter if the run does not end on a boundary.
+
+    Args:
+        trackpoints (Trackpoints): The trackpoints of the run.
+        split_meters (float, optional): The length of a split in meters. Defaults to 1000 (use 1609.344 for miles).
+
+    Returns:
+        list[Split]: The splits of the run.
+    """
+    distance: np.ndarray = np.asarray(trackpoints.distance)
+    timestamp: np.ndarray = np.asarray(trackpoints.timestamp)
+    if len(distance) < 2:
+        return []
+    boundaries: np.ndarray = np.arange(distance[0], distance[-1], split_meters)
+    boundaries: np.ndarray = np.append(boundaries, distance[-1])
+    times: np.ndarray = np.interp(boundaries, distance, timestamp)
+    split_distances: list[float] = np.diff(boundaries).tolist()
+    split_durations: list[float] = np.diff(times).tolist()
+    splits: list[Split] = []
+    for (index, (meters, seconds)) in enumerate(zip(split_distances, split_durations)):
+        if round(meters) == 0 or round(seconds) == 0:
+            continue
+        split: Split = Split(number=index + 1,
+                             distance=Distance(int(round(meters))),
+                             duration=Duration.from_seconds(int(round(seconds))))
+        splits.append(split)
+    return splits
+
+
+def get_best_efforts(trackpoints: Trackpoints, distances: list[int] | None = None) -> dict[int, Duration]:
+    """
+    Find the fastest segments of a run for the given distances.
+
+    A two-pointer sliding window walks over the cumulative distance, so every distance is found in linear time.
+
+    Args:
+        trackpoints (Trackpoints): The trackpoints of the run.
+        distances (list[int] | None, optional): The distances in meters. Defaults to None, which uses 400 m, 1 km,
+        5 km, 10 km and half marathon.
+
+    Returns:
+        dict[int, Duration]: The fastest duration for every distance covered by the run.
+    """
+    if distances is None:
+        distances: list[int] = _get_best_effort_distances()
+    distance: list[float] = np.asarray(trackpoints.distance).tolist()
+    timestamp: list[float] = np.asarray(trackpoints.timestamp).tolist()
+    best_efforts: dict[int, Duration] = {}
+    for target in distances:
+        if len(distance) < 2 or distance[-1] - distance[0] < target:
+            continue
+        best_seconds: float = float('inf')
+        start: int = 0
+        for end in range(1, len(distance)):
+            while distance[end] - distance[start + 1] >= target:
+                start += 1
+            if distance[end] - distance[start] >= target:
+                best_seconds: float = min(best_seconds, timestamp[end] - timestamp[start])
+        best_efforts[target] = Duration.from_seconds(int(round(best_seconds)))
+    return best_efforts
+
+
+def get_archive_best_efforts(trackpoints_list: Iterable[Trackpoints],
+                             distances: list[int] | None = None) -> dict[int, Duration]:
+    """
+    Find the fastest segments over many runs for the given distances.
+
+    Args:
+        trackpoints_list (Iterable[Trackpoints]): The trackpoints of the runs.
+        distances (list[int] | None, optional): The distances in meters. Defaults to None, which uses 400 m, 1 km,
+        5 km, 10 km and half marathon.
+
+    Returns:
+        dict[int, Duration]: The fastest duration for every distance covered by any run.
+    """
+    best_efforts: dict[int, Duration] = {}
+    for trackpoints in trackpoints_list:
+        for (target, duration) in get_best_efforts(trackpoints, distances).items():
+            if target not in best_efforts or duration.to_seconds() < best_efforts[target].to_seconds():
+                best_efforts[target] = duration
+    return best_efforts
@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+
+from constants import _get_trackpoint_columns, _get_grade_costs, _get_grade_smoothing
+from utils import get_column_location
+
+
+class Trackpoints:
+    """
+    A class to represent the samples recorded during a run as columns of equal length.
+
+    Every column is stored in its own binary '.npy' file next to the json file of the run, so analyses can memory map
+    only the columns they need. Missing values inside a column are stored as NaN, missing columns are None.
+
+    Attributes:
+        timestamp (np.ndarray): The seconds since the start of the run.
+        distance (np.ndarray): The cumulative distance in meters.
+        elevation (np.ndarray | None): The elevation in meters.
+        heartbeats (np.ndarray | None): The heartbeats per minute.
+        cadence (np.ndarray | None): The cadence in steps per minute.
+        power (np.ndarray | None): The power in watts.
+        latitude (np.ndarray | None): The latitude in degrees.
+        longitude (np.ndarray | None): The longitude in degrees.
+    """
+
+    def __init__(self,
+                 timestamp: np.ndarray | list[float],
+                 distance: np.ndarray | list[float],
+                 elevation: np.ndarray | list[float] | None = None,
+                 heartbeats: np.ndarray | list[float] | None = None,
+                 cadence: np.ndarray | list[float] | None = None,
+                 power: np.ndarray | list[float] | None = None,
+                 latitude: np.ndarray | list[float] | None = None,
+                 longitude: np.ndarray | list[float] | None = None) -> None:
+        """
+        Initialize the Trackpoints object with its columns.
+
+        Args:
+            timestamp (np.ndarray | list[float]): The seconds since the start of the run.
+            distance (np.ndarray | list[float]): The cumulative distance in meters.
+            elevation (np.ndarray | list[float] | None, optional): The elevation in meters. Defaults to None.
+            heartbeats (np.ndarray | list[float] | None, optional): The heartbeats per minute. Defaults to None.
+            cadence (np.ndarray | list[float] | None, optional): The cadence in steps per minute. Defaults to None.
+            power (np.ndarray | list[float] | None, optional): The power in watts. Defaults to None.
+            latitude (np.ndarray | list[float] | None, optional): The latitude in degrees. Defaults to None.
+            longitude (np.ndarray | list[float] | None, optional): The longitude in degrees. Defaults to None.
+
+        Raises:
+            ValueError: If the columns do not have the same length.
+        """
+        values: dict[str, np.ndarray | list[float] | None] = {'timestamp': timestamp,
+                                                             'distance': distance,
+                                                             'elevation': elevation,
+                                                             'heartbeats': heartbeats,
+                                                             'cadence': cadence,
+                                                             'power': power,
+                                                             'latitude': latitude,
+                                                             'longitude': longitude}
+        for (column, dtype) in _get_trackpoint_columns().items():
+            value: np.ndarray | list[float] | None = values[column]
+            if value is not None:
+                value: np.ndarray = np.asarray(value, dtype=dtype)
+                if len(value) != len(values['timestamp']):
+                    raise ValueError(f"Column '{column}' has {len(value)} samples. "
+                                     f"Use {len(values['timestamp'])} like 'timestamp'.")
+            setattr(self, column, value)
+
+    def __len__(self) -> int:
+        """
+        Return the number of samples.
+
+        Returns:
+            int: The number of samples.
+        """
+        return len(self.timestamp)
+
+    def flat_distance(self, meters: float | None = None) -> float | None:
+        """
+        Calculate the distance on flat ground that costs as much energy as the run, from the grade along the track.
+
+        The elevation is resampled at a fixed spacing along the distance, like routes.get_cells resamples the track,
+        and averaged over windows of fixed length. The grades between the windows are weighted with the grade costs
+        relative to the cost on flat ground, so the noise of single samples averages out instead of adding costs.
+        Grades are clipped to the valid range of the grade costs. Tracks shorter than two windows count as flat.
+
+        Args:
+            meters (float | None, optional): The distance of the run the flat distance is scaled to, so it agrees with
+            the distance of the run. Defaults to None, which uses the distance of the track.
+
+        Returns:
+            float | None: The flat distance in meters, or None if there is no elevation.
+        """
+        if self.elevation is None:
+            return None
+        valid: np.ndarray = np.isfinite(self.distance) & np.isfinite(self.elevation)
+        distance: np.ndarray = np.maximum.accumulate(np.asarray(self.distance, dtype='float64')[valid])
+        if not len(distance):
+            return None
+        if meters is None:
+            meters: float = float(distance[-1] - distance[0])
+        grade_smoothing: dict[str, float] = _get_grade_smoothing()
+        samples_per_window: int = int(grade_smoothing['window'] // grade_smoothing['spacing'])
+        number_of_windows: int = int((distance[-1] - distance[0]) // grade_smoothing['window'])
+        if number_of_windows < 2:
+            return meters
+        samples: np.ndarray = (distance[0] + grade_smoothing['spacing'] / 2
+                               + grade_smoothing['spacing'] * np.arange(number_of_windows * samples_per_window))
+        elevations: np.ndarray = np.interp(samples, distance, np.asarray(self.elevation, dtype='float64')[valid])
+        means: np.ndarray = elevations.reshape(number_of_windows, samples_per_window).mean(axis=1)
+        grade: np.ndarray = np.clip(np.diff(means) / grade_smoothing['window'], -0.45, 0.45)
+        grade_costs: list[float] = _get_grade_costs()
+        flat_distance: float = meters * float(np.mean(np.polyval(grade_costs, grade))) / grade_costs[-1]
+        return flat_distance
+
+    def columns(self) -> list[str]:
+        """
+        Get the names of the columns that are present.
+
+        Returns:
+            list[str]: The names of the present columns.
+        """
+        columns: list[str] = [column for column in _get_trackpoint_columns() if getattr(self, column) is not None]
+        return columns
+
+    def export_to_file(self, file_location: str) -> None:
+        """
+        Export every present column to its own '.npy' file next to the json file of the run.
+
+        Args:
+            file_location (str): The location of the json file of the run.
+        """
+        for column in self.columns():
+            np.save(get_column_location(file_location, column), getattr(self, column))
+
+    @staticmethod
+    def import_from_file(file_location: str,
+                         columns: list[str] | None = None,
+                         memory_map: bool = True) -> 'Trackpoints | None':
+        """
+        Import the trackpoints stored next to the json file of a run.
+
+        The columns 'timestamp' and 'distance' are always loaded. Columns that are not requested are left as None.
+
+        Args:
+            file_location (str): The location of the json file of the run.
+            columns (list[str] | None, optional): The columns to load. Defaults to None, which loads every column.
+            memory_map (bool, optional): If True, the columns are memory mapped instead of read. Defaults to True.
+
+        Returns:
+            Trackpoints | None: The trackpoints of the run, or None if the run has no trackpoints.
+        """
+        if not os.path.exists(get_column_location(file_location, 'timestamp')):
+            return None
+        mmap_mode: str | None = 'r' if memory_map else None
+        values: dict[str, np.ndarray | None] = {}
+        for column in _get_trackpoint_columns():
+            column_location: str = get_column_location(file_location, column)
+            requested: bool = columns is None or column in columns or column in ('timestamp', 'distance')
+            if requested and os.path.exists(column_location):
+                values[column] = np.load(column_location, mmap_mode=mmap_mode)
+            else:
+                values[column] = None
+        trackpoints: Trackpoints = Trackpoints(**values)
+        return trackpoints
+
@@ -76,24 +76,29 @@ def is_between(value: int | float,
         raise ValueError(f"Value {value} is not between {lower_value} and {upper_value}.")
 
 
-def to_string(value: int | float | str | None) -> str:
+def to_string(value: int | float | str | None, latex: bool = True, separator: str | None = None) -> str:
     """
     Convert a value to its string representation.
 
     Args:
         value (int | float | str | None): The value to convert.
+        latex (bool, optional): If True, the string is LaTeX, else plain text. Defaults to True.
+        separator (str | None, optional): The separator between groups of thousands. Defaults to None, which uses
+        ' \\, ' for LaTeX and ' ' for plain text.
 
     Returns:
         str: The string representation of the value. Returns '-' if the value is None.
     """
+    if separator is None:
+        separator: str = r' \, ' if latex else ' '
     if value is None:
         return '-'
     elif value == '':
-        return '$-$'
+        return '$-$' if latex else '-'
     elif isinstance(value, int):
-        return f'{_decimal_separator(value)}'
+        return f'{_decimal_separator(value, separator)}'
     elif isinstance(value, float):
-        return f'{_decimal_separator(round(value, _get_digits()))}'
+        return f'{_decimal_separator(round(value, _get_digits()), separator)}'
     elif isinstance(value, str):
         return f'{value}'
     try:
@@ -116,6 +121,80 @@ def get_directory(run: 'Run') -> str:
     return string
 
 
+def get_run_id(run: 'Run') -> str:
+    """
+    Generate the identifier of a run based on the run's date.
+
+    Args:
+        run (Run): An instance of the Run class, which contains a date attribute.
+
+    Returns:
+        str: The identifier in the format 'yy.mm.dd Run', which is also the name of the run's files.
+    """
+    string: str = f'{run.date.__str__(reversed=True, short=True)} Run'
+    return string
+
+
+def get_column_location(file_location: str, column: str) -> str:
+    """
+    Generate the location of a trackpoint column file based on the location of the json file of the run.
+
+    Args:
+        file_location (str): The location of the json file of the run.
+        column (str): The name of the trackpoint column.
+
+    Returns:
+        str: The location in the format './LaTeX/yy.mm.dd Run/yy.mm.dd Run.<column>.npy'.
+    """
+    stem: str = os.path.splitext(file_location)[0]
+    string: str = f'{stem}.{column}.npy'
+    return string
+
+
+def get_stamp_location(root: str = './LaTeX/') -> str:
+    """
+    Generate the location of the stamp file, whose modification time changes whenever a run of the diary is written.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+
+    Returns:
+        str: The location in the format './LaTeX/.stamp'.
+    """
+    string: str = os.path.join(root, '.stamp')
+    return string
+
+
+def touch_stamp(root: str = './LaTeX/') -> None:
+    """
+    Set the modification time of the stamp file of a diary to now, so caches of the diary know they are outdated.
+
+    Args:
+        root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+    """
+    stamp_location: str = get_stamp_location(root)
+    try:
+        os.utime(stamp_location)
+    except FileNotFoundError:
+        with open(stamp_location, 'w'):
+            pass
+
+
+def get_file_version(file_location: str) -> tuple[int, int]:
+    """
+    Get the size and modification time of a file, which change whenever the file is appended to or rewritten.
+
+    Args:
+        file_location (str): The file location.
+
+    Returns:
+        tuple[int, int]: The size in bytes and the modification time in nanoseconds.
+    """
+    status: os.stat_result = os.stat(file_location)
+    version: tuple[int, int] = (status.st_size, status.st_mtime_ns)
+    return version
+
+
 def file_exists(file_location: str) -> None:
     """
     Check if a file exists at the specified location and prompt the user to back up the file if it does.
@@ -127,12 +206,13 @@ def file_exists(file_location: str) -> None:
         input("There already is a file. Please back up the following file or it will be deleted:\n" + file_location)
 
 
-def _decimal_separator_int(integer: int) -> str:
+def _decimal_separator_int(integer: int, separator: str = r' \, ') -> str:
     """
     Format an integer with decimal separators for thousands.
 
     Args:
         integer (int): The integer to format.
+        separator (str, optional): The separator between groups of thousands. Defaults to ' \\, '.
 
     Returns:
         str: The formatted string with decimal separators.
@@ -142,32 +222,34 @@ def _decimal_separator_int(integer: int) -> str:
     for (index, character) in enumerate(string):
         formated_string += character
         if (index + 1) % 3 == 0 and index + 1 != len(string):
-            formated_string += r' ,\ '
+            formated_string += separator[::-1]
     return formated_string[::-1]
 
 
-def _decimal_separator_float(floating: float) -> str:
+def _decimal_separator_float(floating: float, separator: str = r' \, ') -> str:
     """
     Format a float with decimal separators for thousands and include the decimal part.
 
     Args:
         floating (float): The float to format.
+        separator (str, optional): The separator between groups of thousands. Defaults to ' \\, '.
 
     Returns:
         str: The formatted string with decimal separators and decimal part.
     """
     decimal_part: str = '.' + str(floating).split('.')[1]
-    formated_string = _decimal_separator_int(int(floating))
+    formated_string = _decimal_separator_int(int(floating), separator)
     formated_string += decimal_part
     return formated_string
 
 
-def _decimal_separator(number: int | float) -> str:
+def _decimal_separator(number: int | float, separator: str = r' \, ') -> str:
     """
     Format a number (int or float) with decimal separators.
 
     Args:
         number (int | float): The number to format.
+        separator (str, optional): The separator between groups of thousands. Defaults to ' \\, '.
 
     Returns:
         str: The formatted string with decimal separators.
@@ -176,10 +258,10 @@ def _decimal_separator(number: int | float) -> str:
         ValueError: If the input is neither an integer nor a float.
     """
     if isinstance(number, int):
-        string: str = _decimal_separator_int(number)
+        string: str = _decimal_separator_int(number, separator)
         return string
     elif isinstance(number, float):
-        string: str = _decimal_separator_float(number)
+        string: str = _decimal_separator_float(number, separator)
         return string
     else:
         raise ValueError(f"Can only convert 'int' or 'float'. Type '{type(number)}' was commited.")
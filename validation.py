@@ -0,0 +1,131 @@
+from typing import Callable, Iterable
+
+import numpy as np
+
+from constants import _get_plausible_ranges
+from history import History
+from run import Run
+
+
+class ValidationReport:
+    """
+    A class to represent the implausible values found in many runs.
+
+    Every rule is checked for all runs at once, and every violation is collected instead of stopping at the first one.
+    Missing values are not violations.
+
+    Attributes:
+        run_ids (list[str]): The identifiers of all validated runs.
+        violations (dict[str, tuple[np.ndarray, np.ndarray]]): The indices of the runs violating a rule and their
+        values, per rule.
+    """
+
+    def __init__(self, run_ids: list[str], violations: dict[str, tuple[np.ndarray, np.ndarray]]) -> None:
+        """
+        Initialize the ValidationReport object.
+
+        Args:
+            run_ids (list[str]): The identifiers of all validated runs.
+            violations (dict[str, tuple[np.ndarray, np.ndarray]]): The indices of the runs violating a rule and their
+            values, per rule.
+        """
+        self.run_ids: list[str] = run_ids
+        self.violations: dict[str, tuple[np.ndarray, np.ndarray]] = violations
+
+    def __len__(self) -> int:
+        """
+        Get the number of violations.
+
+        Returns:
+            int: The number of violations of all rules.
+        """
+        return sum(len(indices) for (indices, _) in self.violations.values())
+
+    def __str__(self) -> str:
+        """
+        Generate one line for every violation, ordered like the runs.
+
+        Returns:
+            str: The lines, e.g. "24.05.01 Run: pace 1500.0 is outside of 120 to 1200".
+        """
+        plausible_ranges: dict[str, tuple[float, float]] = _get_plausible_ranges()
+        lines: list[str] = [f"{run_id}: {rule} {round(value, 2)} is outside of "
+                            f"{plausible_ranges[rule][0]} to {plausible_ranges[rule][1]}"
+                            for (run_id, rule, value) in self.get_issues()]
+        return '\n'.join(lines)
+
+    def get_issues(self) -> list[tuple[str, str, float]]:
+        """
+        Get every violation, ordered like the runs.
+
+        Returns:
+            list[tuple[str, str, float]]: The run id, the rule and the implausible value of every violation.
+        """
+        issues: list[tuple[int, str, float]] = []
+        for (rule, (indices, values)) in self.violations.items():
+            issues.extend(zip(indices.tolist(), [rule] * len(indices), values.tolist()))
+        issues.sort(key=lambda issue: issue[0])
+        return [(self.run_ids[index], rule, value) for (index, rule, value) in issues]
+
+    def is_valid(self) -> np.ndarray:
+        """
+        Get which runs violate no rule.
+
+        Returns:
+            np.ndarray: A boolean mask over the validated runs.
+        """
+        valid: np.ndarray = np.ones(len(self.run_ids), dtype=bool)
+        for (indices, _) in self.violations.values():
+            valid[indices] = False
+        return valid
+
+
+def _get_rules() -> dict[str, Callable[[History], np.ndarray]]:
+    """
+    Get the values every rule checks against its plausible range.
+
+    Returns:
+        dict[str, Callable[[History], np.ndarray]]: The names of the rules mapped to functions calculating the values
+        of all runs of a history.
+    """
+    rules: dict[str, Callable[[History], np.ndarray]] = {'pace': History.pace,
+                                                         'heartbeats': lambda history: history.heartbeats,
+                                                         'step_length': History.step_length}
+    return rules
+
+
+def validate(history: History) -> ValidationReport:
+    """
+    Check all runs of a history against the plausible ranges.
+
+    Args:
+        history (History): The runs.
+
+    Returns:
+        ValidationReport: The violations.
+    """
+    plausible_ranges: dict[str, tuple[float, float]] = _get_plausible_ranges()
+    violations: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for (rule, function) in _get_rules().items():
+        (lowest, highest) = plausible_ranges[rule]
+        values: np.ndarray = function(history)
+        indices: np.ndarray = np.flatnonzero((values < lowest) | (values > highest))
+        violations[rule] = (indices, values[indices])
+    report: ValidationReport = ValidationReport(history.run_ids, violations)
+    return report
+
+
+def validate_runs(runs: Iterable[Run], run_ids: Iterable[str] | None = None) -> ValidationReport:
+    """
+    Check runs against the plausible ranges, e.g. before importing them.
+
+    Args:
+        runs (Iterable[Run]): The runs.
+        run_ids (Iterable[str] | None, optional): The identifiers of the runs. Defaults to None, which uses
+        'yy.mm.dd Run'.
+
+    Returns:
+        ValidationReport: The violations.
+    """
+    report: ValidationReport = validate(History.from_runs(runs, run_ids))
+    return report
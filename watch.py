@@ -0,0 +1,210 @@
+import os
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from anomalies import AnomalyDetector
+from diary import get_new_file_location
+from fingerprints import FingerprintIndex
+from history import History
+from importers import import_file, is_supported
+from records import get_records_location
+from run import Run
+
+
+class Watcher:
+    """
+    A class to ingest run files dropped into a folder into the diary, for as long as the process runs.
+
+    New files are imported and written to the diary, which also adds them to the personal records journal. After every
+    batch the history cache is updated incrementally. The LaTeX documents are generated on the main thread, which owns
+    the personal records, and the pdf files are rendered by a pool of background workers so the next files are not
+    held up by pdflatex. Imported files are moved to 'processed', files that fail to import to 'failed' inside the
+    watched folder. Runs that duplicate a run of the diary are skipped, and runs with anomalous values compared to the
+    runs before are reported.
+
+    Attributes:
+        folder (str): The watched folder.
+        root (str): The folder of the diary.
+        interval (float): The seconds between two scans of the folder.
+        pdf (bool): Whether pdf files are rendered.
+        executor (ThreadPoolExecutor): The pool of workers rendering pdf files.
+        jobs (list[Future]): The pending rendering jobs.
+        sizes (dict[str, tuple[int, int]]): The size and modification time of every file at the last scan.
+        fingerprints (FingerprintIndex): The fingerprints of the runs of the diary.
+        anomalies (AnomalyDetector): The statistics of the last runs of the diary.
+    """
+
+    def __init__(self,
+                 folder: str,
+                 root: str = './LaTeX/',
+                 interval: float = 2.0,
+                 workers: int = 2,
+                 pdf: bool = True) -> None:
+        """
+        Initialize the Watcher object and create the watched folder.
+
+        Args:
+            folder (str): The watched folder.
+            root (str, optional): The folder of the diary. Defaults to './LaTeX/'.
+            interval (float, optional): The seconds between two scans of the folder. Defaults to 2.0.
+            workers (int, optional): The number of workers rendering pdf files. Defaults to 2.
+            pdf (bool, optional): If True, a pdf file is rendered for every imported run. Defaults to True.
+        """
+        self.folder: str = folder
+        self.root: str = root
+        self.interval: float = interval
+        self.pdf: bool = pdf
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers)
+        self.jobs: list[Future] = []
+        self.sizes: dict[str, tuple[int, int]] = {}
+        self._inotify = None
+        os.makedirs(folder, exist_ok=True)
+        history: History = History.update_cache(root)
+        self.fingerprints: FingerprintIndex = FingerprintIndex.from_history(history)
+        self.anomalies: AnomalyDetector = AnomalyDetector()
+        self.anomalies.scan(history)
+
+    def scan(self) -> list[str]:
+        """
+        Get the files of the watched folder that are complete.
+
+        A file counts as complete once its size and modification time did not change between two scans, so files that
+        are still being copied are left for a later scan.
+
+        Returns:
+            list[str]: The locations of the complete files, sorted by name.
+        """
+        sizes: dict[str, tuple[int, int]] = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file() and is_supported(entry.name):
+                    status: os.stat_result = entry.stat()
+                    sizes[entry.path] = (status.st_size, status.st_mtime_ns)
+        complete: list[str] = sorted(file_location for (file_location, size) in sizes.items()
+                                     if self.sizes.get(file_location) == size)
+        self.sizes: dict[str, tuple[int, int]] = sizes
+        return complete
+
+    def ingest(self, file_location: str) -> list[str]:
+        """
+        Import all runs of a file into the diary and queue their pdf files.
+
+        Args:
+            file_location (str): The location of the file.
+
+        Returns:
+            list[str]: The locations of the json files of the imported runs, without the skipped duplicates.
+        """
+        runs: list[Run] = import_file(file_location)
+        json_locations: list[str] = []
+        for run in runs:
+            duplicate: str | None = self.fingerprints.find(run)
+            if duplicate is not None:
+                print(f"Skipped a run of '{file_location}' that duplicates '{duplicate}'.")
+                continue
+            json_location: str = get_new_file_location(run, self.root)
+            os.makedirs(os.path.dirname(json_location), exist_ok=True)
+            run.export_to_file(file_location=json_location)
+            run_id: str = os.path.splitext(os.path.basename(json_location))[0]
+            self.fingerprints.add(run, run_id)
+            for (_, name, value, median, score) in self.anomalies.check(run, run_id):
+                print(f"Run '{run_id}' has an anomalous {name} {value:.1f}, usually {median:.1f} "
+                      f"(score {score:+.1f}).")
+            self.anomalies.add(run)
+            json_locations.append(json_location)
+            if self.pdf:
+                from latex import _get_text, safe_to_file
+                text: str = _get_text(run, run_id, get_records_location(self.root))
+                self.jobs.append(self.executor.submit(safe_to_file, run,
+                                                      os.path.splitext(json_location)[0] + '.tex', text))
+        return json_locations
+
+    def _move(self, file_location: str, subfolder: str) -> None:
+        """
+        Move a file of the watched folder into a subfolder, so it is not imported twice.
+
+        Args:
+            file_location (str): The location of the file.
+            subfolder (str): The name of the subfolder, e.g. 'processed'.
+        """
+        folder: str = os.path.join(self.folder, subfolder)
+        os.makedirs(folder, exist_ok=True)
+        shutil.move(file_location, os.path.join(folder, os.path.basename(file_location)))
+        self.sizes.pop(file_location, None)
+
+    def poll(self) -> int:
+        """
+        Scan the watched folder once and ingest every complete file.
+
+        Returns:
+            int: The number of imported runs.
+        """
+        number_of_runs: int = 0
+        for file_location in self.scan():
+            try:
+                json_locations: list[str] = self.ingest(file_location)
+            except Exception as error:
+                print(f"Failed to import '{file_location}': {error}")
+                self._move(file_location, 'failed')
+                continue
+            if json_locations:
+                print(f"Imported '{file_location}' to {', '.join(repr(location) for location in json_locations)}.")
+            else:
+                print(f"Imported no new runs from '{file_location}'.")
+            number_of_runs += len(json_locations)
+            self._move(file_location, 'processed')
+        if number_of_runs:
+            History.update_cache(self.root)
+        self._collect()
+        return number_of_runs
+
+    def _collect(self) -> None:
+        """
+        Remove finished rendering jobs and report their errors.
+        """
+        pending: list[Future] = []
+        for job in self.jobs:
+            if not job.done():
+                pending.append(job)
+            elif job.exception() is not None:
+                print(f"Failed to render a pdf file: {job.exception()}")
+        self.jobs: list[Future] = pending
+
+    def _wait(self) -> None:
+        """
+        Wait until the watched folder changes or the interval has passed.
+
+        inotify is used if the optional package inotify_simple is installed, else the folder is polled.
+        """
+        if self._inotify is None:
+            time.sleep(self.interval)
+        else:
+            self._inotify.read(timeout=int(self.interval * 1000))
+
+    def run_forever(self, once: bool = False) -> None:
+        """
+        Watch the folder until the process is interrupted.
+
+        Args:
+            once (bool, optional): If True, the folder is scanned twice, every complete file is ingested and the
+            method returns once all pdf files are rendered. Defaults to False.
+        """
+        try:
+            import inotify_simple
+            self._inotify = inotify_simple.INotify()
+            self._inotify.add_watch(self.folder, inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MOVED_TO)
+        except (ImportError, OSError):
+            self._inotify = None
+        try:
+            self.scan()
+            while True:
+                self._wait()
+                self.poll()
+                if once:
+                    break
+        except KeyboardInterrupt:
+            print("\nStopping, waiting for pdf files to finish.")
+        finally:
+            self.executor.shutdown(wait=True)
+            self._collect()
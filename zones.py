@@ -0,0 +1,124 @@
+import numpy as np
+
+from constants import _get_heart_rate_zones, _get_pace_zones
+from history import History
+from trackpoints import Trackpoints
+
+
+def get_heart_rate_zones(history: History,
+                         zones: list[float] | None = None,
+                         trackpoints: dict[str, Trackpoints] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the time spent in every heart rate zone per week.
+
+    Runs are binned by their average heartbeats per minute and weighted by their duration. Runs with trackpoints are
+    binned sample by sample instead.
+
+    Args:
+        history (History): The runs.
+        zones (list[float] | None, optional): The lower bounds of the zones in beats per minute. Defaults to None,
+        which uses the default heart rate zones.
+        trackpoints (dict[str, Trackpoints] | None, optional): The trackpoints per run identifier. Defaults to None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The ordinals of the Mondays of every week and the seconds per week and zone.
+    """
+    if zones is None:
+        zones: list[float] = _get_heart_rate_zones()
+    (weeks, values, seconds) = _get_values(history, history.heartbeats, 'heartbeats', trackpoints)
+    return _get_weekly_zones(weeks, values, seconds, zones)
+
+
+def get_pace_zones(history: History,
+                   zones: list[float] | None = None,
+                   trackpoints: dict[str, Trackpoints] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the time spent in every pace zone per week.
+
+    Runs are binned by their pace, as Speed.to_pace computes it, and weighted by their duration. Runs with
+    trackpoints are binned sample by sample instead.
+
+    Args:
+        history (History): The runs.
+        zones (list[float] | None, optional): The lower bounds of the zones in seconds per kilometer. Defaults to
+        None, which uses the default pace zones.
+        trackpoints (dict[str, Trackpoints] | None, optional): The trackpoints per run identifier. Defaults to None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The ordinals of the Mondays of every week and the seconds per week and zone.
+    """
+    if zones is None:
+        zones: list[float] = _get_pace_zones()
+    (weeks, values, seconds) = _get_values(history, history.pace(), 'pace', trackpoints)
+    return _get_weekly_zones(weeks, values, seconds, zones)
+
+
+def _get_values(history: History,
+                values: np.ndarray,
+                column: str,
+                trackpoints: dict[str, Trackpoints] | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the week, value and duration of every run, replacing runs with trackpoints by their samples.
+
+    Args:
+        history (History): The runs.
+        values (np.ndarray): The value of every run.
+        column (str): The trackpoint column to use, 'heartbeats' or 'pace'.
+        trackpoints (dict[str, Trackpoints] | None): The trackpoints per run identifier.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The weeks, values and durations in seconds.
+    """
+    weeks: np.ndarray = history.week()
+    seconds: np.ndarray = history.seconds
+    if not trackpoints:
+        return weeks, values, seconds
+    use_run: np.ndarray = np.ones(len(history), dtype=bool)
+    all_weeks: list[np.ndarray] = []
+    all_values: list[np.ndarray] = []
+    all_seconds: list[np.ndarray] = []
+    for (index, run_id) in enumerate(history.run_ids):
+        samples: Trackpoints | None = trackpoints.get(run_id)
+        if samples is None or len(samples) < 2:
+            continue
+        sample_seconds: np.ndarray = np.diff(np.asarray(samples.timestamp))
+        if column == 'pace':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sample_values: np.ndarray = sample_seconds / (np.diff(np.asarray(samples.distance)) / 1000)
+        elif samples.heartbeats is not None:
+            sample_values: np.ndarray = np.asarray(samples.heartbeats[1:], dtype='float64')
+        else:
+            continue
+        use_run[index] = False
+        all_weeks.append(np.full(len(sample_seconds), weeks[index]))
+        all_values.append(sample_values)
+        all_seconds.append(sample_seconds)
+    all_weeks.append(weeks[use_run])
+    all_values.append(values[use_run])
+    all_seconds.append(seconds[use_run])
+    return np.concatenate(all_weeks), np.concatenate(all_values), np.concatenate(all_seconds)
+
+
+def _get_weekly_zones(weeks: np.ndarray,
+                      values: np.ndarray,
+                      seconds: np.ndarray,
+                      zones: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Bin values into zones and sum their durations per week.
+
+    Args:
+        weeks (np.ndarray): The week of every value.
+        values (np.ndarray): The values to bin.
+        seconds (np.ndarray): The duration of every value.
+        zones (list[float]): The lower bounds of the zones.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The ordinals of the Mondays of every week and the seconds per week and zone.
+    """
+    valid: np.ndarray = np.isfinite(values) & np.isfinite(seconds)
+    (unique_weeks, week_indices) = np.unique(weeks[valid], return_inverse=True)
+    zone_indices: np.ndarray = np.clip(np.digitize(values[valid], zones) - 1, 0, len(zones) - 1)
+    totals: np.ndarray = np.bincount(week_indices * len(zones) + zone_indices,
+                                     weights=seconds[valid],
+                                     minlength=len(unique_weeks) * len(zones))
+    return unique_weeks, totals.reshape(len(unique_weeks), len(zones))